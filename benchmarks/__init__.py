@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the Unolet API client.
+
+The suite runs against a local stub of the Unolet API (see `stub_server`), so
+results depend only on the client code and the machine running it.
+
+Example:
+    python -m benchmarks.run --output bench_results.json
+"""
@@ -0,0 +1,285 @@
+"""
+Realistic OPTIONS metadata and record payloads served by the stub server.
+
+The payloads mirror what the Unolet API returns: Django REST framework style
+OPTIONS responses and paginated lists with nested related objects.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from unolet import erp
+from unolet.models import BaseResource
+
+
+def _field(type, required=False, read_only=False, allow_null=True, **extra):
+    data = {"type": type, "required": required, "read_only": read_only, "allow_null": allow_null}
+    data.update(extra)
+    return data
+
+
+def _decimal(required=False, max_digits=17, decimal_places=2):
+    return _field("decimal", required=required, max_digits=max_digits, decimal_places=decimal_places)
+
+
+def _related(model, required=False):
+    return _field(
+        "nested object",
+        required=required,
+        related_model=model,
+        children={
+            "id": _field("integer", read_only=True, allow_null=False),
+            "name": _field("string", read_only=True),
+        },
+    )
+
+
+def _id():
+    return _field("integer", read_only=True, allow_null=False)
+
+
+def _timestamps():
+    return {
+        "created": _field("datetime", read_only=True),
+        "modified": _field("datetime", read_only=True),
+    }
+
+
+FIELDS = {
+    "company": {
+        "id": _id(),
+        "name": _field("string", required=True, max_length=100),
+        "identification": _field("string", max_length=20),
+    },
+    "person": {
+        "id": _id(),
+        "name": _field("string", required=True, max_length=100),
+        "identification": _field("string", max_length=20),
+        "email": _field("email", max_length=254),
+        "phone": _field("string", max_length=20),
+        "credit_limit": _decimal(),
+        **_timestamps(),
+    },
+    "warehouse": {
+        "id": _id(),
+        "code": _field("string", required=True, max_length=10),
+        "name": _field("string", required=True, max_length=50),
+        **_timestamps(),
+    },
+    "documenttype": {
+        "id": _id(),
+        "code": _field("string", required=True, max_length=5),
+        "name": _field("string", required=True, max_length=50),
+        "generic": _field("choice", choices=[{"value": "FC", "display_name": "Invoice"}]),
+    },
+    "product": {
+        "id": _id(),
+        "code": _field("string", required=True, max_length=30),
+        "barcode": _field("string", max_length=50),
+        "name": _field("string", required=True, max_length=100),
+        "category": _field("string", max_length=50),
+        "price": _decimal(required=True),
+        "cost": _decimal(),
+        "tax_rate": _decimal(max_digits=5, decimal_places=2),
+        "is_active": _field("boolean", allow_null=False),
+        **_timestamps(),
+    },
+    "invoice": {
+        "id": _id(),
+        "number": _field("string", read_only=True, max_length=20),
+        "date": _field("date", required=True),
+        "type": _related("DocumentType", required=True),
+        "person": _related("Person", required=True),
+        "warehouse": _related("Warehouse", required=True),
+        "note": _field("string", max_length=500),
+        "subtotal": _decimal(),
+        "tax": _decimal(),
+        "total": _decimal(),
+        "status": _field("choice", choices=[{"value": "O", "display_name": "Open"}, {"value": "C", "display_name": "Closed"}]),
+        **_timestamps(),
+    },
+    "movement": {
+        "id": _id(),
+        "document": _related("Invoice", required=True),
+        "product": _related("Product", required=True),
+        "warehouse": _related("Warehouse"),
+        "date": _field("date"),
+        "quantity": _decimal(required=True, max_digits=12, decimal_places=4),
+        "price": _decimal(required=True),
+        "tax": _decimal(),
+        "total": _decimal(),
+        **_timestamps(),
+    },
+    "transaction": {
+        "id": _id(),
+        "document": _related("Invoice"),
+        "person": _related("Person"),
+        "date": _field("date", required=True),
+        "amount": _decimal(required=True),
+        "note": _field("string", max_length=500),
+        **_timestamps(),
+    },
+    "authorizationncf": {
+        "id": _id(),
+        "prefix": _field("string", required=True, max_length=3),
+        "start": _field("integer", required=True),
+        "end": _field("integer", required=True),
+        "current": _field("integer"),
+        "expiration": _field("date"),
+    },
+}
+
+
+def options_payload(endpoint):
+    """Return the OPTIONS response body for `endpoint`."""
+    return {
+        "name": f"{endpoint.capitalize()} List",
+        "description": "",
+        "renders": ["application/json"],
+        "parses": ["application/json"],
+        "actions": {"POST": FIELDS[endpoint]},
+    }
+
+
+def reset_metadata():
+    """Forget the cached metadata of every resource class."""
+    for value in vars(erp).values():
+        if isinstance(value, type) and issubclass(value, BaseResource):
+            value._metadata = None
+
+
+class Dataset:
+    """
+    Deterministic in-memory records for every stub endpoint.
+
+    Args:
+        invoices (int): Number of invoices to generate.
+        movements (int): Number of movements to generate.
+        products (int): Number of products to generate.
+        seed (int): Seed for the random generator.
+    """
+    def __init__(self, invoices=1000, movements=10000, products=1000, seed=0):
+        self.random = random.Random(seed)
+        self.start = datetime(2024, 1, 1, 8, 0, 0)
+        self.records = {
+            "company": {1: {"id": 1, "name": "Unolet Demo", "identification": "101000001"}},
+        }
+        self.records["person"] = self._build(200, self._person)
+        self.records["warehouse"] = self._build(5, self._warehouse)
+        self.records["documenttype"] = self._build(4, self._documenttype)
+        self.records["product"] = self._build(products, self._product)
+        self.records["invoice"] = self._build(invoices, self._invoice)
+        self.records["movement"] = self._build(movements, self._movement)
+        self.records["transaction"] = self._build(invoices, self._transaction)
+        self.records["authorizationncf"] = {
+            1: {"id": 1, "prefix": "B01", "start": 1, "end": 5000, "current": 0, "expiration": "2099-12-31"},
+            2: {"id": 2, "prefix": "B02", "start": 1, "end": 100000, "current": 0, "expiration": "2099-12-31"},
+        }
+
+    def _build(self, count, factory):
+        return {pk: factory(pk) for pk in range(1, count + 1)}
+
+    def _timestamp(self, pk):
+        moment = self.start + timedelta(minutes=pk * 7)
+        return moment.isoformat()
+
+    def _money(self, low=1, high=5000):
+        return str(Decimal(self.random.randint(low * 100, high * 100)) / 100)
+
+    def _nested(self, endpoint, pk):
+        record = self.records[endpoint][pk]
+        return {"id": pk, "name": record["name"]}
+
+    def _pick(self, endpoint):
+        return self.random.randint(1, len(self.records[endpoint]))
+
+    def _person(self, pk):
+        return {
+            "id": pk,
+            "name": f"Customer {pk}",
+            "identification": f"{40200000000 + pk}",
+            "email": f"customer{pk}@example.com",
+            "phone": f"809-555-{pk:04d}",
+            "credit_limit": self._money(1000, 50000),
+            "created": self._timestamp(pk),
+            "modified": self._timestamp(pk),
+        }
+
+    def _warehouse(self, pk):
+        return {
+            "id": pk,
+            "code": f"W{pk:02d}",
+            "name": f"Warehouse {pk}",
+            "created": self._timestamp(pk),
+            "modified": self._timestamp(pk),
+        }
+
+    def _documenttype(self, pk):
+        return {"id": pk, "code": f"D{pk}", "name": f"Document type {pk}", "generic": "FC"}
+
+    def _product(self, pk):
+        return {
+            "id": pk,
+            "code": f"P{pk:06d}",
+            "barcode": f"{7460000000000 + pk}",
+            "name": f"Product {pk}",
+            "category": f"Category {pk % 25}",
+            "price": self._money(),
+            "cost": self._money(),
+            "tax_rate": "18.00",
+            "is_active": pk % 10 != 0,
+            "created": self._timestamp(pk),
+            "modified": self._timestamp(pk),
+        }
+
+    def _invoice(self, pk):
+        subtotal = Decimal(self._money(100, 100000))
+        tax = (subtotal * Decimal("0.18")).quantize(Decimal("0.01"))
+        return {
+            "id": pk,
+            "number": f"FC{pk:08d}",
+            "date": (date(2024, 1, 1) + timedelta(days=pk % 365)).isoformat(),
+            "type": self._nested("documenttype", self._pick("documenttype")),
+            "person": self._nested("person", self._pick("person")),
+            "warehouse": self._nested("warehouse", self._pick("warehouse")),
+            "note": f"Invoice note {pk}",
+            "subtotal": str(subtotal),
+            "tax": str(tax),
+            "total": str(subtotal + tax),
+            "status": "C",
+            "created": self._timestamp(pk),
+            "modified": self._timestamp(pk),
+        }
+
+    def _movement(self, pk):
+        invoice_id = self._pick("invoice")
+        invoice = self.records["invoice"][invoice_id]
+        quantity = Decimal(self.random.randint(1, 50000)) / 100
+        price = Decimal(self._money())
+        return {
+            "id": pk,
+            "document": {"id": invoice_id, "name": invoice["number"]},
+            "product": self._nested("product", self._pick("product")),
+            "warehouse": invoice["warehouse"],
+            "date": invoice["date"],
+            "quantity": f"{quantity:.4f}",
+            "price": str(price),
+            "tax": str((quantity * price * Decimal("0.18")).quantize(Decimal("0.01"))),
+            "total": str((quantity * price).quantize(Decimal("0.01"))),
+            "created": self._timestamp(pk),
+            "modified": self._timestamp(pk),
+        }
+
+    def _transaction(self, pk):
+        invoice = self.records["invoice"][pk]
+        return {
+            "id": pk,
+            "document": {"id": pk, "name": invoice["number"]},
+            "person": invoice["person"],
+            "date": invoice["date"],
+            "amount": invoice["total"],
+            "note": "",
+            "created": self._timestamp(pk),
+            "modified": self._timestamp(pk),
+        }
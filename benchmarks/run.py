@@ -0,0 +1,443 @@
+"""
+Run the benchmark suite and record the results as JSON.
+
+Usage:
+    python -m benchmarks.run [--output FILE] [--compare BASELINE] [--threshold 0.2]
+                             [--repeat N] [--records N] [--only NAME ...]
+                             [--transport requests|http2|memory]
+
+Every benchmark is timed `--repeat` times after one warm-up round. The output
+holds per-benchmark timing statistics and throughput figures. With `--compare`,
+medians are checked against a previous result file and the process exits with
+status 1 when any benchmark is slower than the allowed threshold.
+"""
+
+import argparse
+import json
+import platform
+import os
+import pickle
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import unolet
+from unolet import columnar, parallel
+from unolet.aggregation import Aggregator
+from unolet.cache import SharedCache
+from unolet.models import ResourceList
+
+from benchmarks.fixtures import Dataset, reset_metadata
+from benchmarks.stub_server import StubServer, memory_transport
+
+
+RESULTS_SCHEMA = 1
+BENCHMARKS = {}
+
+
+def benchmark(name, description=""):
+    """
+    Register a benchmark.
+
+    The decorated function receives a `Context` and returns a callable that
+    runs one timed round and returns the number of items it processed.
+    """
+    def decorator(func):
+        func.description = description or (func.__doc__ or "").strip()
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class Context:
+    def __init__(self, dataset: Dataset, records: int):
+        self.dataset = dataset
+        self.records = records
+
+
+def reset_cache():
+    """Remove the cache a benchmark set on the default client, and its file."""
+    cache = unolet.Unolet.cache
+    if cache is not None:
+        cache.close()
+        unolet.Unolet.set_cache(None)
+        if isinstance(cache, SharedCache):
+            shutil.rmtree(os.path.dirname(cache.path), ignore_errors=True)
+
+
+def warm_metadata():
+    for cls in (unolet.Invoice, unolet.Movement, unolet.Product, unolet.Person, unolet.Warehouse, unolet.DocumentType):
+        cls._initialize_metadata()
+
+
+@benchmark("import_cold_start")
+def bench_import_cold_start(ctx):
+    """Start a fresh interpreter that imports unolet and touches a resource class."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+
+    def run():
+        subprocess.run([sys.executable, "-c", "import unolet; unolet.Invoice"], env=env, check=True)
+        return 1
+    return run
+
+
+@benchmark("metadata_cold_start")
+def bench_metadata_cold_start(ctx):
+    """Load the OPTIONS metadata needed to build an invoice from scratch."""
+    payload = ctx.dataset.records["invoice"][1]
+
+    def run():
+        reset_metadata()
+        unolet.Invoice(**payload)
+        return 1
+    return run
+
+
+@benchmark("get")
+def bench_get(ctx):
+    """Fetch single invoices by id."""
+    warm_metadata()
+    ids = list(ctx.dataset.records["invoice"])[:50]
+
+    def run():
+        for pk in ids:
+            unolet.Invoice.get(pk)
+        return len(ids)
+    return run
+
+
+@benchmark("get_shared_cache")
+def bench_get_shared_cache(ctx):
+    """Fetch single products by id through a shared cache file."""
+    warm_metadata()
+    ids = list(ctx.dataset.records["product"])[:50]
+    directory = tempfile.mkdtemp()
+    unolet.Unolet.set_cache(SharedCache(os.path.join(directory, "unolet.cache"), size=1 << 24, slots=4096))
+
+    def run():
+        for pk in ids:
+            unolet.Product.get(pk)
+        return len(ids)
+    return run
+
+
+@benchmark("get_concurrent")
+def bench_get_concurrent(ctx):
+    """Fetch single invoices by id, concurrently through the transport."""
+    warm_metadata()
+    calls = [(f"invoice/{pk}",) for pk in list(ctx.dataset.records["invoice"])[:50]]
+
+    def run():
+        unolet.Unolet.request_many(calls)
+        return len(calls)
+    return run
+
+
+@benchmark("find")
+def bench_find(ctx):
+    """Fetch the first page of invoices and build its resources."""
+    warm_metadata()
+
+    def run():
+        result = unolet.Invoice.find(page=1)
+        # Resources are built lazily; iterate so they are part of the timing.
+        return len(result.results.items)
+    return run
+
+
+@benchmark("find_prefetch")
+def bench_find_prefetch(ctx):
+    """Fetch the first page of invoices with their people, warehouses and types."""
+    warm_metadata()
+
+    def run():
+        result = unolet.Invoice.find(page=1, prefetch=["person", "warehouse", "type"])
+        return len(result.results.items)
+    return run
+
+
+@benchmark("pagination")
+def bench_pagination(ctx):
+    """Walk every page of products, building the resources of each."""
+    warm_metadata()
+
+    def run():
+        page = unolet.Product.find(page=1)
+        items = len(page.results.items)
+        while page.next_url:
+            page = page.next()
+            items += len(page.results.items)
+        return items
+    return run
+
+
+@benchmark("save")
+def bench_save(ctx):
+    """Create products and update them."""
+    warm_metadata()
+    count = 50
+
+    def run():
+        for i in range(count):
+            product = unolet.Product(code=f"B{i:06d}", name=f"Bench {i}", price="10.50")
+            product.save()
+            product.price = "11.00"
+            product.save()
+        return count * 2
+    return run
+
+
+def _parse_benchmark(endpoint, model_name):
+    def setup(ctx):
+        warm_metadata()
+        model_class = getattr(unolet, model_name)
+        rows = list(ctx.dataset.records[endpoint].values())
+        rows = (rows * (10000 // max(len(rows), 1) + 1))[:10000]
+
+        def run():
+            for row in rows:
+                model_class(**row)
+            return len(rows)
+        return run
+
+    setup.__doc__ = f"Parse 10k {model_name} records into resources."
+    return setup
+
+
+for _endpoint, _model_name in (("invoice", "Invoice"), ("movement", "Movement"), ("product", "Product")):
+    benchmark(f"parse_{_endpoint}")(_parse_benchmark(_endpoint, _model_name))
+
+
+@benchmark("serialize_movement")
+def bench_serialize_movement(ctx):
+    """Validate and encode 10k Movement resources as one JSON request body."""
+    warm_metadata()
+    rows = list(ctx.dataset.records["movement"].values())
+    rows = (rows * (10000 // max(len(rows), 1) + 1))[:10000]
+    movements = [unolet.Movement(**row) for row in rows]
+
+    def run():
+        unolet.Movement.serialize_many(movements)
+        return len(movements)
+    return run
+
+
+def _load_benchmark(format):
+    def setup(ctx):
+        warm_metadata()
+        rows = list(ctx.dataset.records["movement"].values())
+        rows = (rows * (10000 // max(len(rows), 1) + 1))[:10000]
+        movements = ResourceList(unolet.Movement, rows)
+        if format == "snapshot":
+            data = movements.to_bytes()
+            load = ResourceList.from_bytes
+        elif format == "pickle":
+            data = pickle.dumps(movements.items)
+            load = pickle.loads
+        else:
+            data = json.dumps(rows).encode()
+
+            def load(data):
+                return ResourceList(unolet.Movement, json.loads(data)).items
+
+        def run():
+            return len(load(data))
+        return run
+
+    setup.__doc__ = f"Load 10k Movement resources from {format} bytes."
+    return setup
+
+
+for _format in ("snapshot", "pickle", "json"):
+    benchmark(f"{_format}_load_movement")(_load_benchmark(_format))
+
+
+@benchmark("parse_movement_parallel")
+def bench_parse_movement_parallel(ctx):
+    """Parse 10k Movement records into resources in a process pool."""
+    warm_metadata()
+    rows = list(ctx.dataset.records["movement"].values())
+    rows = (rows * (10000 // max(len(rows), 1) + 1))[:10000]
+    pages = [rows[i:i + 1000] for i in range(0, len(rows), 1000)]
+    executor = ProcessPoolExecutor()
+
+    def run():
+        return sum(1 for _ in parallel.parse_pages(unolet.Movement, pages, executor=executor))
+    return run
+
+
+@benchmark("columnar_movement")
+def bench_columnar_movement(ctx):
+    """Convert 10k raw Movement records to NumPy columns."""
+    columnar._require("numpy", "numpy")
+    warm_metadata()
+    rows = list(ctx.dataset.records["movement"].values())
+    rows = (rows * (10000 // max(len(rows), 1) + 1))[:10000]
+    pages = [rows[i:i + 1000] for i in range(0, len(rows), 1000)]
+
+    def run():
+        columnar.to_numpy(unolet.Movement._metadata, pages)
+        return len(rows)
+    return run
+
+
+@benchmark("aggregate_movement")
+def bench_aggregate_movement(ctx):
+    """Sum quantity and total of 10k raw Movement records by product and warehouse."""
+    warm_metadata()
+    rows = list(ctx.dataset.records["movement"].values())
+    rows = (rows * (10000 // max(len(rows), 1) + 1))[:10000]
+    pages = [rows[i:i + 1000] for i in range(0, len(rows), 1000)]
+
+    def run():
+        Aggregator(unolet.Movement._metadata, ["product", "warehouse"], ["quantity", "total"]).consume(pages)
+        return len(rows)
+    return run
+
+
+def measure(func, ctx, repeat):
+    try:
+        run = func(ctx)
+    except ImportError as e:
+        return {"description": func.description, "skipped": str(e)}
+    run()
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run()
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    result = {
+        "description": func.description,
+        "repeat": repeat,
+        "items": items,
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.mean(timings),
+        "median": median,
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "items_per_second": items / median if median else None,
+    }
+    if items:
+        result["seconds_per_10k"] = median / items * 10000
+    return result
+
+
+def run_benchmarks(names=None, repeat=5, records=10000, transport="requests"):
+    """
+    Run the selected benchmarks against a fresh stub dataset.
+
+    Args:
+        names (list, optional): Benchmark names to run. Runs all by default.
+        repeat (int): Timed rounds per benchmark.
+        records (int): Number of movements in the stub dataset.
+        transport (str): "requests" or "http2" to go through the stub HTTP
+            server, "memory" to serve the dataset in process.
+
+    Returns:
+        dict: The machine-readable results document.
+    """
+    names = names or list(BENCHMARKS)
+    dataset = Dataset(invoices=max(records // 10, 1), movements=records, products=max(records // 10, 1))
+    ctx = Context(dataset, records)
+    results = {}
+
+    def run_all():
+        for name in names:
+            reset_metadata()
+            try:
+                results[name] = measure(BENCHMARKS[name], ctx, repeat)
+            finally:
+                reset_cache()
+
+    try:
+        if transport == "memory":
+            unolet.Unolet.connect("benchmark-token", "http://memory", transport=memory_transport(dataset))
+            run_all()
+        else:
+            with StubServer(dataset) as server:
+                unolet.Unolet.connect("benchmark-token", server.base_url, transport=transport)
+                run_all()
+    finally:
+        unolet.Unolet.set_transport()
+        reset_metadata()
+
+    return {
+        "schema": RESULTS_SCHEMA,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "unolet_version": unolet.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "params": {"repeat": repeat, "records": records, "transport": transport},
+        "benchmarks": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """
+    Compare median timings against a baseline result document.
+
+    Returns:
+        list: `(name, baseline_median, current_median, ratio)` tuples for every
+        benchmark slower than `1 + threshold` times the baseline.
+    """
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if "median" not in result or not previous or not previous.get("median"):
+            continue
+        ratio = result["median"] / previous["median"]
+        if ratio > 1 + threshold:
+            regressions.append((name, previous["median"], result["median"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Unolet client benchmarks.")
+    parser.add_argument("--output", "-o", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio (default 0.2).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per benchmark (default 5).")
+    parser.add_argument("--records", type=int, default=10000, help="Movements in the stub dataset (default 10000).")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks.")
+    parser.add_argument("--transport", default="requests", choices=["requests", "http2", "memory"],
+                        help="Transport used by the client (default requests).")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, repeat=args.repeat, records=args.records, transport=args.transport)
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+    for name, result in results["benchmarks"].items():
+        if "skipped" in result:
+            print(f"{name:<24} skipped: {result['skipped']}", file=sys.stderr)
+            continue
+        print(f"{name:<24} median {result['median'] * 1000:10.2f} ms  items {result['items']}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Local HTTP stub of the Unolet API.
+
+Serves OPTIONS metadata and paginated list, detail, create, update and delete
+endpoints backed by a `fixtures.Dataset`, so the client can be exercised end to
+end without a real Unolet instance. The REST emulation itself is the one of
+`unolet.transports.InMemoryTransport`; this module only puts it behind a socket.
+
+Example:
+    with StubServer() as server:
+        Unolet.connect("token", server.base_url)
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from unolet.transports import InMemoryTransport
+
+from benchmarks.fixtures import Dataset, FIELDS, options_payload
+
+
+def memory_transport(dataset: Dataset = None) -> InMemoryTransport:
+    """Return an `InMemoryTransport` serving `dataset`."""
+    dataset = dataset or Dataset()
+    metadata = {endpoint: options_payload(endpoint) for endpoint in FIELDS}
+    return InMemoryTransport(records=dataset.records, metadata=metadata)
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        data = json.loads(self.rfile.read(length)) if length else None
+        url = urlparse(self.server.base_url + self.path)
+        params = dict(parse_qsl(url.query))
+        with self.server.lock:
+            status, payload = self.server.transport.handle(self.command, url, params, data)
+
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_OPTIONS = do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class StubServer:
+    """
+    Run the stub API in a background thread.
+
+    Args:
+        dataset (Dataset, optional): Records to serve. A default dataset is
+            generated when omitted.
+        host (str): Interface to bind.
+        port (int): Port to bind. `0` picks a free port.
+    """
+    def __init__(self, dataset: Dataset = None, host="127.0.0.1", port=0):
+        self.dataset = dataset or Dataset()
+        self.httpd = ThreadingHTTPServer((host, port), StubRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.transport = memory_transport(self.dataset)
+        self.httpd.lock = threading.Lock()
+        self.httpd.base_url = self.base_url
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,32 @@
+import unittest
+
+import unolet
+
+from benchmarks.fixtures import Dataset, reset_metadata
+from benchmarks.stub_server import memory_transport
+
+
+class MemoryAPITestCase(unittest.TestCase):
+    """
+    Connect the default client to an in-memory dataset for each test.
+
+    Subclasses size the dataset with `dataset_options` and may override
+    `make_transport`; `self.dataset`, `self.records` and `self.transport` are
+    set before their own `setUp` runs. The resource metadata is reset around
+    every test.
+    """
+    dataset_options = {"invoices": 10, "movements": 10, "products": 10}
+
+    def setUp(self):
+        reset_metadata()
+        self.dataset = Dataset(**self.dataset_options)
+        self.records = self.dataset.records
+        self.transport = self.make_transport(self.dataset)
+        unolet.Unolet.connect("test-token", "http://memory", transport=self.transport)
+
+    def tearDown(self):
+        unolet.Unolet.set_transport()
+        reset_metadata()
+
+    def make_transport(self, dataset):
+        return memory_transport(dataset)
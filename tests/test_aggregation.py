@@ -0,0 +1,99 @@
+import unittest
+from collections import defaultdict
+from decimal import Decimal
+from unittest import mock
+
+import unolet
+from unolet.aggregation import SumBuffer
+
+from tests.base import MemoryAPITestCase
+
+
+class TestAggregate(MemoryAPITestCase):
+    dataset_options = {"invoices": 40, "movements": 500, "products": 30}
+
+    def setUp(self):
+        super().setUp()
+        self.movements = list(self.records["movement"].values())
+
+    def expected(self, key, fields, rows=None):
+        groups = defaultdict(lambda: defaultdict(Decimal))
+        for row in rows or self.movements:
+            group = groups[key(row)]
+            group["count"] += 1
+            for field in fields:
+                if row[field] is not None:
+                    group[field] += Decimal(row[field])
+        return groups
+
+    def test_group_by_related(self):
+        result = unolet.Movement.aggregate(group_by=["product", "warehouse"], sums=["quantity", "total"], page_size=50)
+        expected = self.expected(lambda r: (r["product"]["id"], r["warehouse"]["id"]), ["quantity", "total"])
+
+        self.assertEqual(len(result), len(expected))
+        self.assertEqual(sum(row["count"] for row in result), 500)
+        for row in result:
+            group = expected[(row["product"], row["warehouse"])]
+            self.assertEqual(row["quantity"], group["quantity"])
+            self.assertEqual(row["total"], group["total"])
+            self.assertEqual(row["count"], group["count"])
+        self.assertEqual(result[0]["quantity"].as_tuple().exponent, -4)
+
+    def test_sorted_by_group(self):
+        result = unolet.Movement.aggregate(group_by=["product"], sums=["total"])
+        self.assertEqual([row["product"] for row in result], sorted(row["product"] for row in result))
+
+    def test_daily_and_monthly(self):
+        daily = unolet.Movement.aggregate(group_by=["created__date"], sums=["total"])
+        expected = self.expected(lambda r: r["created"][:10], ["total"])
+        self.assertEqual({row["created__date"]: row["total"] for row in daily}, {k: v["total"] for k, v in expected.items()})
+
+        monthly = unolet.Movement.aggregate(group_by=["created__month"], sums=["total"])
+        self.assertEqual(sum(row["total"] for row in monthly), sum(row["total"] for row in daily))
+
+    def test_filters_and_nulls(self):
+        self.dataset.records["movement"][2]["quantity"] = None
+        result = unolet.Movement.aggregate(sums=["quantity"], id__lte=10)
+        rows = [r for r in self.movements if r["id"] <= 10]
+        self.assertEqual(result, [{"quantity": self.expected(lambda r: (), ["quantity"], rows)[()]["quantity"], "count": 10}])
+
+    def test_invalid_fields(self):
+        with self.assertRaises(ValueError):
+            unolet.Movement.aggregate(sums=["date"])
+        with self.assertRaises(ValueError):
+            unolet.Movement.aggregate(group_by=["missing"])
+        with self.assertRaises(ValueError):
+            unolet.Movement.aggregate(group_by=["product__month"])
+
+
+class TestSumBuffer(unittest.TestCase):
+
+    def test_inferred_scale(self):
+        buffer = SumBuffer("decimal")
+        buffer.add([0, 0], ["1.5", "2"], 1)
+        buffer.add([0, 1], ["0.25", "3.125"], 2)
+        self.assertEqual(buffer.value(0), Decimal("3.75"))
+        self.assertEqual(buffer.value(1), Decimal("3.125"))
+
+    def test_overflow(self):
+        buffer = SumBuffer("decimal", 2)
+        big = "9" * 17 + ".99"
+        buffer.add([0] * 3, [big] * 3, 1)
+        self.assertEqual(buffer.value(0), Decimal(big) * 3)
+
+    def test_without_numpy(self):
+        with mock.patch("unolet.aggregation._numpy", return_value=None):
+            buffer = SumBuffer("decimal", 2)
+        buffer.add([0, 1, 0], ["1.10", "2.20", "3.30"], 2)
+        self.assertEqual([buffer.value(0), buffer.value(1)], [Decimal("4.40"), Decimal("2.20")])
+
+    def test_float_and_integer(self):
+        floats, integers = SumBuffer("float"), SumBuffer("integer")
+        floats.add([0, 0], [0.5, 0.25], 1)
+        integers.add([0, 0], [2, 3], 1)
+        self.assertEqual(floats.value(0), 0.75)
+        self.assertEqual(integers.value(0), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from benchmarks.run import BENCHMARKS, compare, run_benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_run_benchmarks(self):
+        names = ["metadata_cold_start", "get", "find", "pagination", "save"]
+        results = run_benchmarks(names, repeat=1, records=200)
+        self.assertEqual(set(results["benchmarks"]), set(names))
+        for result in results["benchmarks"].values():
+            self.assertGreater(result["items"], 0)
+            self.assertGreater(result["median"], 0)
+        self.assertEqual(results["benchmarks"]["pagination"]["items"], 20)
+
+    def test_registered_benchmarks(self):
+        for name in ["get", "find", "pagination", "save", "metadata_cold_start", "parse_movement"]:
+            self.assertIn(name, BENCHMARKS)
+
+    def test_compare(self):
+        baseline = {"benchmarks": {"get": {"median": 1.0}, "find": {"median": 1.0}}}
+        current = {"benchmarks": {"get": {"median": 1.5}, "find": {"median": 1.1}, "save": {"median": 9.0}}}
+        regressions = compare(current, baseline, threshold=0.2)
+        self.assertEqual([r[0] for r in regressions], ["get"])
+
+
+if __name__ == "__main__":
+    unittest.main()
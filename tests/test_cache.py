@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+
+import unolet
+from unolet.cache import LocalCache, SharedCache
+
+from benchmarks.fixtures import Dataset, reset_metadata
+from benchmarks.stub_server import memory_transport
+from tests.base import MemoryAPITestCase
+
+
+def _fill(path, start):
+    cache = SharedCache(path, size=1 << 20, slots=1024)
+    for i in range(start, start + 50):
+        cache.set(f"key-{i}", f"value-{i}".encode())
+    cache.close()
+
+
+class TestSharedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "unolet.cache")
+        self.cache = SharedCache(self.path, size=1 << 20, slots=1024)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_set_get_delete(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.assertTrue(self.cache.set("a", b"1"))
+        self.cache.set("b", b"2")
+        self.cache.set("a", b"3")
+        self.assertEqual(self.cache.get("a"), b"3")
+        self.assertEqual(self.cache.get("b"), b"2")
+        self.cache.delete("a")
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_ttl(self):
+        self.cache.set("a", b"1", ttl=0.05)
+        self.assertEqual(self.cache.get("a"), b"1")
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_bounded_size(self):
+        value = b"x" * 1000
+        for i in range(3000):
+            self.cache.set(f"key-{i}", value)
+        self.assertEqual(os.path.getsize(self.path), 64 + 1024 * 32 + (1 << 20))
+        self.assertEqual(self.cache.get("key-2999"), value)
+        self.assertIsNone(self.cache.get("key-0"))
+        self.assertFalse(self.cache.set("big", b"x" * (1 << 19)))
+
+    def test_shared_between_processes(self):
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=_fill, args=(self.path, start)) for start in (0, 50)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        for i in range(100):
+            self.assertEqual(self.cache.get(f"key-{i}"), f"value-{i}".encode())
+
+    def test_layout_change_resets_the_file(self):
+        self.cache.set("a", b"1")
+        self.cache.close()
+        other = SharedCache(self.path, size=1 << 21, slots=1024)
+        self.assertIsNone(other.get("a"))
+        other.close()
+
+
+class TestLocalCache(unittest.TestCase):
+
+    def test_lru_and_size(self):
+        cache = LocalCache(max_size=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        cache.get("a")
+        cache.set("c", b"1234")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1234")
+        self.assertEqual(cache.size, 8)
+
+    def test_ttl(self):
+        cache = LocalCache(ttl=0.05)
+        cache.set("a", b"1")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class TestResourceCache(MemoryAPITestCase):
+    dataset_options = {"invoices": 5, "movements": 5, "products": 10}
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = SharedCache(os.path.join(self.tmpdir.name, "unolet.cache"), size=1 << 20, slots=1024, models=["Product", "Warehouse"])
+        unolet.Unolet.set_cache(self.cache)
+
+    def tearDown(self):
+        unolet.Unolet.set_cache(None)
+        super().tearDown()
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def calls(self, method):
+        return [url for m, url, _, _ in self.transport.calls if m == method]
+
+    def test_metadata_loaded_once(self):
+        unolet.Product._initialize_metadata()
+        reset_metadata()
+        unolet.Product._initialize_metadata()
+        self.assertEqual(len(self.calls("OPTIONS")), 1)
+        self.assertIn("price", unolet.Product._metadata.fields)
+
+    def test_get_uses_the_cache(self):
+        product = unolet.Product.get(1)
+        cached = unolet.Product.get(1)
+        self.assertEqual(len(self.calls("GET")), 1)
+        self.assertIsNot(cached, product)
+        self.assertEqual(cached.price, product.price)
+
+        # A worker that starts later shares the entries.
+        reset_metadata()
+        other = SharedCache(self.cache.path, size=1 << 20, slots=1024, models=["Product"])
+        unolet.Unolet.set_cache(other)
+        self.assertEqual(unolet.Product.get(1).name, product.name)
+        self.assertEqual(len(self.calls("GET")), 1)
+        self.assertEqual(len(self.calls("OPTIONS")), 1)
+        other.close()
+
+    def test_only_listed_models(self):
+        unolet.Invoice.get(1)
+        unolet.Invoice.get(1)
+        self.assertEqual(len(self.calls("GET")), 2)
+
+    def test_save_and_delete_invalidate(self):
+        product = unolet.Product.get(2)
+        product.name = "Renamed"
+        product.save()
+        self.assertEqual(unolet.Product.get(2).name, "Renamed")
+        self.assertEqual(len(self.calls("GET")), 2)
+
+        self.transport.add_route("DELETE", "product/2", status=204)
+        unolet.Product.get(2).delete()
+        self.assertIsNone(self.cache.load_resource(unolet.Product, 2))
+
+    def test_projections_bypass_the_cache(self):
+        unolet.Product.get(3)
+        unolet.Product.get(3, fields=["name"])
+        self.assertEqual(len(self.calls("GET")), 2)
+
+    def test_tenants_do_not_mix(self):
+        unolet.Product.get(4)
+        client = unolet.Client("token", "http://tenant", transport=memory_transport(Dataset(products=10, seed=7)), cache=self.cache)
+        product = client.Product.get(4)
+        self.assertEqual(len(client.transport.calls), 2)
+        self.assertIsInstance(product, client.Product)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import unolet
+from unolet.transports import InMemoryTransport
+
+from benchmarks.fixtures import Dataset, reset_metadata
+from benchmarks.stub_server import memory_transport
+
+
+class TestClient(unittest.TestCase):
+
+    def setUp(self):
+        reset_metadata()
+        self.datasets = [Dataset(invoices=10, movements=10, products=5, seed=seed) for seed in (1, 2)]
+        self.clients = [
+            unolet.Client(f"token-{i}", f"http://tenant{i}", transport=memory_transport(dataset))
+            for i, dataset in enumerate(self.datasets)
+        ]
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        unolet.Unolet.set_transport()
+        reset_metadata()
+
+    def test_bound_resources(self):
+        first, second = self.clients
+        self.assertIs(first.Invoice, first.Invoice)
+        self.assertIsNot(first.Invoice, second.Invoice)
+        self.assertTrue(issubclass(first.Invoice, unolet.Invoice))
+
+        invoice = first.Invoice.get(1)
+        self.assertIsInstance(invoice, unolet.Invoice)
+        self.assertEqual(invoice.number, self.datasets[0].records["invoice"][1]["number"])
+        self.assertIsInstance(invoice.person, first.Person)
+
+    def test_separate_metadata_and_transports(self):
+        first, second = self.clients
+        first.Product.get(1)
+        self.assertIsNotNone(first.Product._metadata)
+        self.assertIsNone(second.Product._metadata)
+        self.assertIsNone(unolet.Product._metadata)
+        self.assertEqual(second.transport.calls, [])
+
+        calls = first.transport.calls
+        self.assertTrue(all(url.startswith("http://tenant0/api/v1/") for _, url, _, _ in calls))
+
+    def test_tenants_are_isolated(self):
+        first, second = self.clients
+        product = first.Product.get(1)
+        product.name = "Renamed"
+        product.save()
+        self.assertEqual(self.datasets[0].records["product"][1]["name"], "Renamed")
+        self.assertNotEqual(second.Product.get(1).name, "Renamed")
+
+    def test_concurrent_tenants(self):
+        clients = self.clients * 10
+
+        def load(client):
+            return client, [invoice.id for invoice in client.Invoice.stream(page_size=3)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for client, ids in executor.map(load, clients):
+                self.assertEqual(ids, list(range(1, 11)))
+
+    def test_default_client_untouched(self):
+        self.assertIsNot(unolet.Unolet.default, self.clients[0])
+        unolet.Unolet.connect("test-token", "http://memory", transport=memory_transport(self.datasets[1]))
+        self.assertEqual(unolet.Invoice.get(1).number, self.clients[1].Invoice.get(1).number)
+        self.assertEqual(self.clients[0].transport.calls, [])
+
+    def test_max_concurrency(self):
+        client = unolet.Client("token", "http://memory", transport="memory", max_concurrency=3)
+        self.clients.append(client)
+        self.assertIsInstance(client.transport, InMemoryTransport)
+        self.assertEqual(client.transport.max_concurrency, 3)
+
+    def test_unknown_resource(self):
+        with self.assertRaises(AttributeError):
+            self.clients[0].Nope
+        with self.assertRaises(AttributeError):
+            self.clients[0].Client
+
+
+if __name__ == "__main__":
+    unittest.main()
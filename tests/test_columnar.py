@@ -0,0 +1,113 @@
+import importlib.util
+import unittest
+from decimal import Decimal
+
+import unolet
+from unolet.columnar import to_arrow, to_numpy
+from unolet.models import Metadata
+from unolet.utils import scaled_int
+
+from tests.base import MemoryAPITestCase
+
+
+def installed(*modules):
+    return all(importlib.util.find_spec(module) for module in modules)
+
+
+class TestScaledInt(unittest.TestCase):
+
+    def test_strings(self):
+        self.assertEqual(scaled_int("12.5", 2), 1250)
+        self.assertEqual(scaled_int("-0.05", 2), -5)
+        self.assertEqual(scaled_int("7", 4), 70000)
+
+    def test_rounding_fallback(self):
+        self.assertEqual(scaled_int("1.005", 2), 100)
+        self.assertEqual(scaled_int("1.015", 2), 102)
+        self.assertEqual(scaled_int("1E+2", 1), 1000)
+        self.assertEqual(scaled_int(3, 2), 300)
+
+
+# A decimal field without `decimal_places`, whose scale is inferred from the data.
+LOOSE_DECIMAL = Metadata({"actions": {"POST": {"total": {"type": "decimal", "required": False, "read_only": False, "allow_null": True}}}})
+MIXED_SCALE_PAGES = [[{"total": "1.5"}], [{"total": "1.25"}, {"total": None}]]
+
+
+class ColumnarTestCase(MemoryAPITestCase):
+    dataset_options = {"invoices": 30, "movements": 250, "products": 20}
+
+    def setUp(self):
+        super().setUp()
+        self.records["movement"][2]["quantity"] = None
+        self.records["movement"][3]["created"] = "2024-01-01T12:00:00-04:00"
+
+
+@unittest.skipUnless(installed("numpy"), "numpy is not installed")
+class TestToNumpy(ColumnarTestCase):
+
+    def test_page(self):
+        page = unolet.Movement.find(page_size=10)
+        columns = page.to_numpy(fields=["id", "product", "quantity", "date"])
+        self.assertEqual(list(columns), ["id", "product", "quantity", "date"])
+        self.assertEqual(columns["id"].tolist(), list(range(1, 11)))
+        self.assertEqual(columns["product"][0], self.dataset.records["movement"][1]["product"]["id"])
+        self.assertEqual(str(columns["date"].dtype), "datetime64[D]")
+
+        quantity = columns["quantity"]
+        self.assertTrue(quantity.mask[1])
+        expected = Decimal(self.dataset.records["movement"][1]["quantity"]) * 10 ** 4
+        self.assertEqual(quantity[0], int(expected))
+
+    def test_resources_not_built(self):
+        page = unolet.Movement.find(page_size=10)
+        page.to_numpy()
+        self.assertNotIn("items", vars(page.results))
+
+    def test_stream_concatenates_pages(self):
+        columns = unolet.Movement.stream(page_size=100).to_numpy(fields=["id", "created"])
+        self.assertEqual(len(columns["id"]), 250)
+        self.assertEqual(str(columns["created"][2]), "2024-01-01T16:00:00.000000")
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            unolet.Movement.find().to_numpy(fields=["nope"])
+
+    def test_pages_with_different_scales(self):
+        total = to_numpy(LOOSE_DECIMAL, MIXED_SCALE_PAGES)["total"]
+        self.assertEqual(total[:2].tolist(), [150, 125])
+        self.assertTrue(total.mask[2])
+
+
+@unittest.skipUnless(installed("numpy", "pyarrow"), "pyarrow is not installed")
+class TestToArrow(ColumnarTestCase):
+
+    def test_types(self):
+        import pyarrow as pa
+        table = unolet.Movement.stream(page_size=100).to_arrow()
+        self.assertEqual(table.num_rows, 250)
+        self.assertEqual(table.schema.field("quantity").type, pa.decimal128(12, 4))
+        self.assertEqual(table.schema.field("total").type, pa.decimal128(17, 2))
+        self.assertEqual(table.schema.field("date").type, pa.date32())
+        self.assertEqual(table.schema.field("created").type, pa.timestamp("us", tz="UTC"))
+
+        record = self.dataset.records["movement"][1]
+        self.assertEqual(table.column("total")[0].as_py(), Decimal(record["total"]))
+        self.assertIsNone(table.column("quantity")[1].as_py())
+
+    def test_pages_with_different_scales(self):
+        table = to_arrow(LOOSE_DECIMAL, MIXED_SCALE_PAGES)
+        self.assertEqual(table.column("total").to_pylist(), [Decimal("1.50"), Decimal("1.25"), None])
+
+
+@unittest.skipUnless(installed("numpy", "pyarrow", "pandas"), "pandas is not installed")
+class TestToPandas(ColumnarTestCase):
+
+    def test_frame(self):
+        frame = unolet.Invoice.find().to_pandas(fields=["id", "total", "person"])
+        self.assertEqual(len(frame), 30)
+        self.assertEqual(frame["total"].iloc[0], Decimal(self.dataset.records["invoice"][1]["total"]))
+        self.assertEqual(frame["person"].iloc[0], self.dataset.records["invoice"][1]["person"]["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("requests", "urllib3", "dateutil", "unolet.models", "unolet.erp", "concurrent.futures", "dataclasses")
+
+
+def imported_modules(code):
+    """Return `{module: cumulative microseconds}` from `python -X importtime -c code`."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_import_is_light(self):
+        modules = imported_modules("import unolet")
+        self.assertIn("unolet", modules)
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules, f"`import unolet` imports {name}")
+
+    def test_resources_load_on_access(self):
+        modules = imported_modules("import unolet; unolet.Invoice; unolet.Client")
+        self.assertIn("unolet.models", modules)
+        for name in ("requests", "dateutil"):
+            self.assertNotIn(name, modules)
+
+    def test_public_names(self):
+        import unolet
+        for name in unolet.__all__:
+            self.assertTrue(hasattr(unolet, name), name)
+        self.assertIn("Invoice", dir(unolet))
+        with self.assertRaises(AttributeError):
+            unolet.Missing
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from decimal import Decimal
+
+import unolet
+from unolet.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from unolet.indexes import IndexedCollection
+
+from tests.base import MemoryAPITestCase
+
+
+class TestIndexedCollection(MemoryAPITestCase):
+    dataset_options = {"invoices": 50, "movements": 10, "products": 100}
+
+    def setUp(self):
+        super().setUp()
+        self.catalog = IndexedCollection(
+            unolet.Product.stream(page_size=30),
+            indexes={"code": "hash", "barcode": "hash", "category": "hash", "price": "sorted"},
+        )
+
+    def test_get_by(self):
+        product = self.catalog.get_by(barcode="7460000000022")
+        self.assertEqual(product.id, 22)
+        with self.assertRaises(ObjectDoesNotExist):
+            self.catalog.get_by(code="missing")
+        with self.assertRaises(MultipleObjectsReturned):
+            self.catalog.get_by(category="Category 1")
+
+    def test_filter(self):
+        products = self.catalog.filter(category="Category 3", price__lt=Decimal("2500"))
+        expected = [
+            p["id"] for p in self.dataset.records["product"].values()
+            if p["category"] == "Category 3" and Decimal(p["price"]) < 2500
+        ]
+        self.assertEqual(sorted(p.id for p in products), sorted(expected))
+
+    def test_filter_without_index(self):
+        self.assertEqual(len(self.catalog.filter(is_active=False)), 10)
+        self.assertEqual([p.id for p in self.catalog.filter(id__in=[3, 4])], [3, 4])
+
+    def test_range(self):
+        products = self.catalog.range("price", Decimal("100"), Decimal("1000"))
+        prices = [p.price for p in products]
+        self.assertEqual(prices, sorted(prices))
+        self.assertTrue(all(Decimal("100") <= price < Decimal("1000") for price in prices))
+        with self.assertRaises(ValueError):
+            self.catalog.range("code", "A", "B")
+
+    def test_group_by(self):
+        groups = self.catalog.group_by("category")
+        self.assertEqual(len(groups), 25)
+        self.assertEqual(sum(len(v) for v in groups.values()), 100)
+        self.assertEqual(set(self.catalog.group_by("is_active")), {True, False})
+
+    def test_related_field(self):
+        invoices = IndexedCollection(unolet.Invoice.stream(), indexes=["person"])
+        person = self.dataset.records["invoice"][1]["person"]["id"]
+        self.assertIn(1, [invoice.id for invoice in invoices.filter(person=person)])
+
+    def test_save_updates_indexes(self):
+        product = self.catalog.get_by(code="P000005")
+        product.code = "NEW-CODE"
+        product.price = Decimal("0.01")
+        product.save()
+
+        self.assertEqual(self.catalog.filter(code="P000005"), [])
+        self.assertIs(self.catalog.get_by(code="NEW-CODE"), product)
+        self.assertIs(self.catalog.range("price", high=Decimal("0.02"))[0], product)
+
+    def test_delete_removes_resource(self):
+        product = self.catalog.get_by(code="P000005")
+        product.delete()
+        self.assertNotIn(product, self.catalog)
+        self.assertEqual(self.catalog.filter(code="P000005"), [])
+        self.assertEqual(len(self.catalog), 99)
+
+    def test_add_index_later(self):
+        self.catalog.add_index("name")
+        self.assertEqual(self.catalog.get_by(name="Product 7").id, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import copy
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+import unolet
+from unolet.exceptions import ObjectDoesNotExist
+from unolet.services.mirror import Mirror
+from unolet.transports import InMemoryTransport
+
+from benchmarks.fixtures import reset_metadata
+from tests.base import MemoryAPITestCase
+
+
+class UnreachableTransport(InMemoryTransport):
+    """Fails every request, as when the API cannot be reached."""
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        self.calls.append((method, url, params, data))
+        raise ConnectionError(f"{method} {url}: connection refused")
+
+
+class TestMirror(MemoryAPITestCase):
+    dataset_options = {"invoices": 40, "movements": 10, "products": 120}
+
+    def setUp(self):
+        super().setUp()
+        self.mirror = Mirror()
+        self.products = self.mirror.register(unolet.Product, indexes=["code", "barcode"])
+        self.products.refresh(page_size=50)
+
+    def tearDown(self):
+        self.mirror.close()
+        super().tearDown()
+
+    def test_refresh(self):
+        self.assertEqual(self.products.count(), 120)
+        self.assertIsNotNone(self.products.last_refresh)
+        self.assertFalse(self.products.is_stale(60))
+
+    def test_indexes(self):
+        indexes = {row[1] for row in self.mirror.execute("PRAGMA index_list(product)")}
+        self.assertIn("product_code_idx", indexes)
+        self.assertIn("product_barcode_idx", indexes)
+
+    def test_get(self):
+        product = self.products.get(7)
+        self.assertIsInstance(product, unolet.Product)
+        self.assertEqual(product.price, Decimal(self.dataset.records["product"][7]["price"]))
+        with self.assertRaises(ObjectDoesNotExist):
+            self.products.get(999)
+
+    def test_lookups(self):
+        self.assertEqual(self.products.get_by(code="P000022").id, 22)
+        self.assertEqual(self.products.count(is_active=False), 12)
+        self.assertEqual(self.products.count(id__in=[1, 2, 999]), 2)
+        self.assertEqual(self.products.count(name__icontains="PRODUCT 11"), 11)
+        self.assertEqual(self.products.count(barcode__isnull=True), 0)
+
+        cheap = self.products.find(price__lt=Decimal("100"), order_by="price")
+        prices = [p.price for p in cheap]
+        self.assertEqual(prices, sorted(prices))
+        self.assertTrue(all(price < 100 for price in prices))
+
+    def test_order_and_limit(self):
+        results = self.products.find(order_by="-id", limit=3, offset=1)
+        self.assertEqual([p.id for p in results], [119, 118, 117])
+
+    def test_invalid_filters(self):
+        with self.assertRaises(ValueError):
+            self.products.find(nope=1)
+        with self.assertRaises(ValueError):
+            self.products.find(code__regex="x")
+
+    def test_prune(self):
+        del self.dataset.records["product"][5]
+        self.products.refresh()
+        self.assertEqual(self.products.count(), 119)
+
+    def test_related_lookup(self):
+        invoices = self.mirror.register(unolet.Invoice)
+        invoices.refresh()
+        person = self.dataset.records["invoice"][1]["person"]["id"]
+        results = invoices.find(person=person)
+        self.assertIn(1, [invoice.id for invoice in results])
+        self.assertEqual(results[0].person.id, person)
+
+    def test_offline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.sqlite3")
+            with Mirror(path) as mirror:
+                mirror.register(unolet.Invoice).refresh()
+
+            reset_metadata()
+            offline = UnreachableTransport()
+            unolet.Unolet.set_transport(offline)
+            with Mirror(path) as mirror:
+                invoice = mirror.register(unolet.Invoice).get(3)
+                self.assertEqual(invoice.number, "FC00000003")
+                self.assertIsInstance(invoice.person, unolet.Person)
+            self.assertEqual({call[0] for call in offline.calls}, {"OPTIONS"})
+
+    def test_client_bound_classes(self):
+        client = unolet.Client("token", "http://tenant", transport=self.make_transport(self.dataset))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.sqlite3")
+            with Mirror(path) as mirror:
+                mirror.register(client.Movement).refresh()
+            self.assertIsNone(unolet.Invoice._metadata)
+            self.assertIsNotNone(client.Invoice._metadata)
+
+            offline = unolet.Client("token", "http://tenant", transport=UnreachableTransport())
+            with Mirror(path) as mirror:
+                movement = mirror.register(offline.Movement).get(1)
+                self.assertIsInstance(movement.product, offline.Product)
+                self.assertIsNotNone(offline.Product._metadata)
+            self.assertEqual({call[0] for call in offline.transport.calls}, {"OPTIONS"})
+
+    def test_metadata_follows_the_api(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.sqlite3")
+            with Mirror(path) as mirror:
+                mirror.register(unolet.Product).refresh()
+
+            # The server adds a field.
+            reset_metadata()
+            metadata = copy.deepcopy(self.transport.metadata["product"])
+            metadata["actions"]["POST"]["tax_code"] = {"type": "string", "required": True, "read_only": False, "allow_null": False}
+            self.transport.metadata["product"] = metadata
+            with Mirror(path) as mirror:
+                products = mirror.register(unolet.Product)
+                self.assertIn("tax_code", unolet.Product._metadata.fields)
+                products.refresh()
+                self.assertIn("tax_code", mirror._stored_metadata(unolet.Product).fields)
+
+    def test_refresh_reloads_stored_metadata(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mirror.sqlite3")
+            with Mirror(path) as mirror:
+                mirror.register(unolet.Product).refresh()
+
+            reset_metadata()
+            unolet.Unolet.set_transport(UnreachableTransport())
+            with Mirror(path) as mirror:
+                products = mirror.register(unolet.Product)
+                self.assertEqual(len(products.find(code="P000001")), 1)
+
+                # Back online, and the server added a field meanwhile.
+                metadata = copy.deepcopy(self.transport.metadata["product"])
+                metadata["actions"]["POST"]["tax_code"] = {"type": "string", "required": False, "read_only": False, "allow_null": True}
+                self.transport.metadata["product"] = metadata
+                unolet.Unolet.set_transport(self.transport)
+                products.refresh()
+                self.assertIn("tax_code", unolet.Product._metadata.fields)
+                self.assertIn("tax_code", products.kinds)
+                self.assertIn("tax_code", mirror._stored_metadata(unolet.Product).fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+import unolet
+from unolet.services.ncf import NCFAllocator, NCFExhausted, NCFExpired
+
+from benchmarks.fixtures import Dataset
+from benchmarks.stub_server import memory_transport
+from tests.base import MemoryAPITestCase
+
+
+def _allocate(path, count, queue):
+    # The numbers come from the block reserved by the parent process.
+    unolet.Unolet.connect("test-token", "http://memory", transport=memory_transport(Dataset(invoices=1, movements=1, products=1)))
+    with NCFAllocator(1, path, block_size=100, refill_threshold=0) as allocator:
+        queue.put([allocator.allocate() for _ in range(count)])
+
+
+class TestNCFAllocator(MemoryAPITestCase):
+    dataset_options = {"invoices": 1, "movements": 1, "products": 1}
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "ncf.json")
+        self.authorization = self.records["authorizationncf"][1]
+
+    def tearDown(self):
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def patches(self):
+        return [data for method, _, _, data in self.transport.calls if method == "PATCH"]
+
+    def test_allocates_from_a_block(self):
+        with NCFAllocator(1, self.path, block_size=10, refill_threshold=2) as allocator:
+            numbers = [allocator.allocate() for _ in range(7)]
+            self.assertEqual(numbers[0], "B0100000001")
+            self.assertEqual(numbers[-1], "B0100000007")
+            self.assertEqual(allocator.remaining, 3)
+        self.assertEqual(self.patches(), [{"current": 10}])
+        self.assertEqual(self.authorization["current"], 10)
+
+    def test_refills_ahead(self):
+        with NCFAllocator(1, self.path, block_size=10, refill_threshold=3) as allocator:
+            for _ in range(7):
+                allocator.allocate()
+            allocator._refill_thread.join()
+            self.assertEqual(allocator.remaining, 13)
+            self.assertEqual(len(self.patches()), 2)
+            numbers = [allocator.allocate() for _ in range(13)]
+        self.assertEqual(numbers[-1], "B0100000020")
+
+    def test_survives_restarts(self):
+        with NCFAllocator(1, self.path, block_size=10) as allocator:
+            allocator.allocate()
+            allocator.allocate()
+        with NCFAllocator(1, self.path, block_size=10) as allocator:
+            self.assertEqual(allocator.allocate(), "B0100000003")
+        self.assertEqual(len(self.patches()), 1)
+
+    def test_continues_after_the_current_sequence(self):
+        self.authorization["current"] = 41
+        with NCFAllocator(unolet.AuthorizationNCF.get(1), self.path, digits=10) as allocator:
+            self.assertEqual(allocator.allocate(), "B010000000042")
+
+    def test_respects_the_end_of_the_range(self):
+        self.authorization["current"] = 4995
+        with NCFAllocator(1, self.path, block_size=10) as allocator:
+            numbers = [allocator.allocate() for _ in range(5)]
+            self.assertEqual(numbers[-1], "B0100005000")
+            with self.assertRaises(NCFExhausted):
+                allocator.allocate()
+            self.assertIsInstance(allocator.last_error, NCFExhausted)
+
+    def test_respects_the_expiration(self):
+        self.authorization["expiration"] = "2020-12-31"
+        with NCFAllocator(1, self.path) as allocator:
+            with self.assertRaises(NCFExpired):
+                allocator.allocate()
+        self.assertEqual(self.patches(), [])
+
+    def test_threads_get_distinct_numbers(self):
+        numbers = []
+        with NCFAllocator(1, self.path, block_size=25) as allocator:
+            def work():
+                for _ in range(50):
+                    numbers.append(allocator.allocate())
+
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(set(numbers)), 200)
+        self.assertGreaterEqual(self.authorization["current"], 200)
+
+    def test_processes_get_distinct_numbers(self):
+        with NCFAllocator(1, self.path, block_size=100) as allocator:
+            allocator.reserve()
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        workers = [context.Process(target=_allocate, args=(self.path, 40, queue)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        numbers = queue.get(timeout=60) + queue.get(timeout=60)
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(set(numbers)), 80)
+        with NCFAllocator(1, self.path) as allocator:
+            self.assertEqual(allocator.remaining, 20)
+
+    def test_rejects_the_state_of_another_authorization(self):
+        with NCFAllocator(1, self.path) as allocator:
+            allocator.allocate()
+        with self.assertRaises(ValueError):
+            NCFAllocator(2, self.path).allocate()
+
+
+if __name__ == "__main__":
+    unittest.main()
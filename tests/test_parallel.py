@@ -0,0 +1,65 @@
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import unolet
+from unolet.parallel import parse_records
+
+from tests.base import MemoryAPITestCase
+
+
+def fields(resource):
+    return {k: v for k, v in vars(resource).items() if not k.startswith("_")}
+
+
+class TestParallel(MemoryAPITestCase):
+    dataset_options = {"invoices": 20, "movements": 230, "products": 15}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_stream_matches_serial(self):
+        serial = list(unolet.Movement.stream(page_size=50))
+        parallel = list(unolet.Movement.stream(page_size=50).parallel(chunk_size=20, executor=self.executor))
+        self.assertEqual([m.id for m in parallel], list(range(1, 231)))
+        for expected, resource in zip(serial, parallel):
+            self.assertEqual(fields(resource), fields(expected))
+        self.assertIsInstance(parallel[0].product, unolet.Product)
+        self.assertFalse(parallel[0]._state.adding)
+
+    def test_rows(self):
+        rows = list(unolet.Invoice.find(page_size=5).parallel(rows=True, executor=self.executor))
+        record = self.dataset.records["invoice"][1]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["person"], record["person"]["id"])
+        self.assertEqual(str(rows[0]["total"]), record["total"])
+
+    def test_bound_client(self):
+        client = unolet.Client("token", "http://tenant", transport=self.make_transport(self.dataset))
+        movements = list(client.Movement.stream().parallel(executor=self.executor))
+        self.assertIsInstance(movements[0], client.Movement)
+        self.assertIsInstance(movements[0].product, client.Product)
+
+    def test_validation_error(self):
+        self.dataset.records["movement"][3]["created"] = "not a date"
+        with self.assertRaises(ValueError):
+            list(unolet.Movement.stream().parallel(executor=self.executor))
+
+    def test_records_are_picklable(self):
+        unolet.Movement._initialize_metadata()
+        metadata = unolet.Movement._metadata
+        records = parse_records("movement", metadata.data, [self.dataset.records["movement"][1]])
+        self.assertEqual(pickle.loads(pickle.dumps(records)), records)
+        self.assertEqual(len(records[0]), len(metadata.fields))
+
+    def test_own_pool(self):
+        self.assertEqual(len(list(unolet.Product.stream().parallel(max_workers=1))), 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
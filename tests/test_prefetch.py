@@ -0,0 +1,103 @@
+import unittest
+
+import unolet
+from unolet.prefetch import prefetch_related
+
+from tests.base import MemoryAPITestCase
+
+
+class TestPrefetch(MemoryAPITestCase):
+    dataset_options = {"invoices": 40, "movements": 60, "products": 10}
+
+    def setUp(self):
+        super().setUp()
+        # Load the metadata up front so only data requests are counted.
+        for name in ("Invoice", "Movement", "Person", "Warehouse", "DocumentType", "Product"):
+            getattr(unolet, name)._initialize_metadata()
+
+    def requests(self):
+        return [call for call in self.transport.calls if call[0] != "OPTIONS"]
+
+    def test_find_prefetches_in_batches(self):
+        page = unolet.Invoice.find(page_size=40, prefetch=["person", "warehouse", "type"])
+        invoices = list(page)
+        requests = self.requests()
+        # The page, then one id__in request per related model.
+        self.assertEqual(len(requests), 4)
+        self.assertTrue(all("id__in" in query for _, _, query, _ in requests[1:]))
+
+        for invoice in invoices:
+            person = self.records["person"][invoice.person.id]
+            self.assertEqual(invoice.person.email, person["email"])
+            self.assertEqual(invoice.warehouse.code, self.records["warehouse"][invoice.warehouse.id]["code"])
+        self.assertEqual(len(self.requests()), 4)
+
+    def test_shared_instances(self):
+        invoices = list(unolet.Invoice.find(page_size=40, prefetch="person"))
+        by_id = {}
+        for invoice in invoices:
+            self.assertIs(by_id.setdefault(invoice.person.id, invoice.person), invoice.person)
+        self.assertLess(len(by_id), len(invoices))
+        self.assertEqual(invoices[0]._state.changes, {})
+
+    def test_batch_size(self):
+        invoices = list(unolet.Invoice.find(page_size=40))
+        calls = len(self.requests())
+        prefetch_related(invoices, ["person"], batch_size=3)
+        ids = {invoice.person.id for invoice in invoices}
+        self.assertEqual(len(self.requests()) - calls, -(-len(ids) // 3))
+
+    def test_nested_prefetch(self):
+        movements = list(unolet.Movement.find(page_size=60, prefetch=["document__person", "product"]))
+        self.assertEqual(len(self.requests()), 4)
+        movement = movements[0]
+        invoice = self.records["invoice"][movement.document.id]
+        self.assertEqual(movement.document.number, invoice["number"])
+        self.assertEqual(movement.document.person.email, self.records["person"][invoice["person"]["id"]]["email"])
+
+    def test_server_ignoring_the_filter(self):
+        _match = self.transport._match
+        self.transport._match = lambda value, lookup, expected: True if lookup == "in" else _match(value, lookup, expected)
+        self.transport.page_size = 2
+        invoices = list(unolet.Invoice.find(page_size=40, prefetch=["warehouse"]))
+        ids = {invoice.warehouse.id for invoice in invoices}
+        for invoice in invoices:
+            self.assertEqual(invoice.warehouse.code, self.records["warehouse"][invoice.warehouse.id]["code"])
+        gets = [url for method, url, _, _ in self.requests() if "/warehouse/" in url and not url.endswith("/warehouse/")]
+        self.assertLessEqual(len(gets), len(ids))
+
+    def test_stream_prefetches_per_page(self):
+        self.transport.page_size = 20
+        invoices = list(unolet.Invoice.stream(prefetch=["person"]))
+        self.assertEqual(len(invoices), 40)
+        self.assertEqual(len(self.requests()), 4)
+        self.assertTrue(all(invoice.person.email for invoice in invoices))
+
+    def test_sparse_resources_keep_deferred_fields(self):
+        invoices = list(unolet.Invoice.find(page_size=5, fields=["number", "person"], prefetch=["person", "warehouse"]))
+        self.assertNotIn("warehouse", invoices[0].__dict__)
+        self.assertTrue(invoices[0].person.email)
+
+    def test_dangling_reference(self):
+        person = self.records["invoice"][1]["person"]
+        del self.records["person"][person["id"]]
+        invoices = list(unolet.Invoice.find(page_size=10, prefetch=["person"]))
+        self.assertEqual(invoices[0].person.id, person["id"])
+        self.assertEqual(invoices[0].person.name, person["name"])
+        self.assertTrue(invoices[1].person.email)
+
+    def test_unknown_relation(self):
+        with self.assertRaises(ValueError):
+            unolet.Invoice.find(prefetch=["number"])
+        with self.assertRaises(ValueError):
+            unolet.Invoice.find(prefetch=["person__missing"])
+
+    def test_client_bound_classes(self):
+        client = unolet.Client("token", "http://tenant", transport=self.make_transport(self.dataset))
+        invoice = client.Invoice.find(page_size=5, prefetch=["person"])[0]
+        self.assertIsInstance(invoice.person, client.Person)
+        self.assertTrue(invoice.person.email)
+
+
+if __name__ == "__main__":
+    unittest.main()
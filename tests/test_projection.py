@@ -0,0 +1,70 @@
+import unittest
+from decimal import Decimal
+
+import unolet
+from unolet.exceptions import ValidationError
+
+from tests.base import MemoryAPITestCase
+
+
+class TestProjection(MemoryAPITestCase):
+    dataset_options = {"invoices": 30, "movements": 10, "products": 10}
+
+    def requests(self):
+        return [call for call in self.transport.calls if call[0] != "OPTIONS"]
+
+    def test_find_sends_projection(self):
+        page = unolet.Invoice.find(fields=["number", "total"], page_size=10)
+        self.assertEqual(self.transport.calls[-1][2]["fields"], "id,number,total")
+        invoice = page[0]
+        self.assertEqual(set(vars(invoice)) - {"_state"}, {"id", "number", "total"})
+        self.assertEqual(invoice._loaded_fields, {"id", "number", "total"})
+        self.assertEqual(invoice.total, Decimal(self.dataset.records["invoice"][1]["total"]))
+
+    def test_deferred_fields_loaded_once(self):
+        invoice = unolet.Invoice.get(1, fields=["number"])
+        calls = len(self.requests())
+        self.assertEqual(invoice.note, self.dataset.records["invoice"][1]["note"])
+        self.assertIsInstance(invoice.person, unolet.Person)
+        self.assertEqual(len(self.requests()), calls + 1)
+        self.assertIsNone(invoice._state.loaded)
+        with self.assertRaises(AttributeError):
+            invoice.missing
+
+    def test_server_without_projection(self):
+        client = unolet.Client("token", "http://tenant", transport=self.make_transport(self.dataset), projection_param=None)
+        invoice = client.Invoice.get(2, fields=["number"])
+        self.assertNotIn("fields", client.transport.calls[-1][2])
+        self.assertEqual(set(vars(invoice)) - {"_state"}, {"id", "number"})
+
+    def test_save_sends_loaded_fields(self):
+        invoice = unolet.Invoice.get(3, fields=["note"])
+        invoice.note = "Updated"
+        invoice.save()
+        method, _, _, data = self.requests()[-1]
+        self.assertEqual(method, "PATCH")
+        self.assertEqual(data, {"note": "Updated"})
+        self.assertEqual(self.dataset.records["invoice"][3]["note"], "Updated")
+
+    def test_new_resources_still_validated(self):
+        with self.assertRaises(ValidationError):
+            unolet.Product().save()
+
+    def test_pagination_keeps_fields(self):
+        page = unolet.Invoice.find(fields=["number"], page_size=10).next()
+        self.assertEqual(page.fields, ["id", "number"])
+        self.assertEqual(page[0].id, 11)
+        self.assertEqual(set(vars(page[0])) - {"_state"}, {"id", "number"})
+
+    def test_stream(self):
+        invoices = list(unolet.Invoice.stream(fields="number", page_size=7))
+        self.assertEqual(len(invoices), 30)
+        self.assertTrue(all(call[2]["fields"] == "id,number" for call in self.transport.calls if call[0] == "GET"))
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            unolet.Invoice.find(fields=["nope"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import unittest
+from datetime import date
+from decimal import Decimal
+
+import unolet
+from unolet.exceptions import ValidationError
+from unolet.serializers import encode_float, encode_integer
+
+from tests.base import MemoryAPITestCase
+
+
+class TestSerializer(MemoryAPITestCase):
+    dataset_options = {"invoices": 10, "movements": 20, "products": 10}
+
+    def test_compiled_once(self):
+        unolet.Movement._initialize_metadata()
+        metadata = unolet.Movement._metadata
+        self.assertIs(metadata.serializer, metadata.serializer)
+        self.assertNotIn("id", [name for name, _, _ in metadata.serializer.writable])
+
+    def test_request_body(self):
+        movement = unolet.Movement.get(1)
+        body = movement._validate_data(movement.__dict__)
+        record = self.dataset.records["movement"][1]
+        self.assertEqual(body["product"], record["product"]["id"])
+        self.assertEqual(body["quantity"], record["quantity"])
+        self.assertNotIn("created", body)
+        self.assertEqual(json.loads(json.dumps(body)), body)
+
+    def test_coercion(self):
+        product = unolet.Product(code="X1", name="X", price=19.5)
+        body = product._validate_data(product.__dict__)
+        self.assertEqual(body["price"], "19.5")
+
+    def test_errors(self):
+        product = unolet.Product(name="X")
+        product.price = "abc"
+        with self.assertRaises(ValidationError) as raised:
+            product.save()
+        errors = raised.exception.args[0]
+        self.assertEqual(errors["code"], ["This field is required."])
+        self.assertTrue(errors["price"][0].startswith("Invalid type for this field"))
+
+    def test_numbers_are_not_truncated(self):
+        self.assertEqual(encode_integer(2.0), 2)
+        self.assertEqual(encode_integer(Decimal("7")), 7)
+        self.assertEqual(encode_float(2), 2.0)
+        for value in (2.5, Decimal("7.9"), True, float("nan")):
+            with self.assertRaises(ValueError):
+                encode_integer(value)
+        with self.assertRaises(ValueError):
+            encode_float(True)
+
+        authorization = unolet.AuthorizationNCF.get(1)
+        authorization.current = 2.5
+        with self.assertRaises(ValidationError) as raised:
+            authorization.save()
+        self.assertIn("current", raised.exception.args[0])
+
+    def test_save_sends_encoded_body(self):
+        product = unolet.Product(code="NEW", name="New", price=Decimal("1.50"))
+        product.save()
+        method, _, _, data = self.transport.calls[-1]
+        self.assertEqual(method, "POST")
+        self.assertEqual(data["price"], "1.50")
+        self.assertEqual(product.id, 11)
+
+    def test_represent_matches_parse(self):
+        movement = unolet.Movement.get(2)
+        data = movement._serialize()
+        self.assertEqual(data["created"], movement.created.isoformat())
+        self.assertEqual(data["total"], str(movement.total))
+
+        copy = unolet.Movement()
+        copy._deserialize(data)
+        self.assertEqual(copy.total, movement.total)
+        self.assertEqual(copy.date, movement.date)
+        self.assertEqual(copy.product.id, movement.product.id)
+
+    def test_serialize_many(self):
+        movements = list(unolet.Movement.stream())
+        encoded = unolet.Movement.serialize_many(movements)
+        self.assertIsInstance(encoded, bytes)
+        bodies = json.loads(encoded)
+        self.assertEqual(len(bodies), 20)
+        self.assertEqual(bodies, unolet.Movement.serialize_many(movements, as_bytes=False))
+
+        movements[3].date = date(2024, 2, 1)
+        movements[5].quantity = "many"
+        movements[7].price = None
+        with self.assertRaises(ValidationError) as raised:
+            unolet.Movement.serialize_many(movements)
+        self.assertEqual(list(raised.exception.args[0]), [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
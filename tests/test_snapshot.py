@@ -0,0 +1,105 @@
+import copy
+import pickle
+import unittest
+from decimal import Decimal
+
+import unolet
+from unolet.fields import Undefined
+from unolet.models import Metadata, Pagination, ResourceList
+
+from benchmarks.fixtures import reset_metadata
+from tests.base import MemoryAPITestCase
+
+
+def values(resource):
+    return {name: value for name, value in vars(resource).items() if name != "_state"}
+
+
+class TestSnapshot(MemoryAPITestCase):
+    dataset_options = {"invoices": 30, "movements": 200, "products": 10}
+
+    def requests(self):
+        return [call for call in self.transport.calls if call[0] != "OPTIONS"]
+
+    def test_resource_round_trip(self):
+        invoice = unolet.Invoice.get(3)
+        data = invoice.to_bytes()
+        self.assertTrue(data.startswith(b"UNOS\x01"))
+        loaded = unolet.Invoice.from_bytes(data)
+        self.assertEqual(values(loaded), values(invoice))
+        self.assertIsInstance(loaded.total, Decimal)
+        self.assertEqual(loaded.person.id, invoice.person.id)
+        self.assertIs(loaded.person.email, Undefined)
+        self.assertFalse(loaded._state.adding)
+        self.assertEqual(loaded._state.changes, {})
+
+    def test_smaller_than_pickle(self):
+        movements = unolet.Movement.find(page_size=200)
+        self.assertLess(len(movements.results.to_bytes()), len(pickle.dumps(movements.results.items)) / 2)
+
+    def test_pagination_loads_without_requests(self):
+        page = unolet.Movement.find(page_size=50)
+        data = page.to_bytes()
+        reset_metadata()
+        calls = len(self.transport.calls)
+
+        loaded = Pagination.from_bytes(data)
+        self.assertEqual(len(self.transport.calls), calls)
+        self.assertEqual(loaded.count, page.count)
+        self.assertEqual(loaded.next_url, page.next_url)
+        self.assertEqual(len(loaded.results), 50)
+        self.assertEqual([values(m) for m in loaded], [values(m) for m in page])
+        self.assertIsInstance(loaded[0].document, unolet.Invoice)
+        self.assertEqual(len(self.transport.calls), calls)
+
+        loaded.next()
+        self.assertEqual(len(self.requests()), 2)
+
+    def test_resource_list(self):
+        movements = unolet.Movement.find(page_size=20).results
+        loaded = ResourceList.from_bytes(movements.to_bytes(), unolet.Movement)
+        self.assertEqual(loaded, movements)
+        self.assertEqual(loaded.raw_items[0]["quantity"], str(movements[0].quantity))
+
+    def test_sparse_resources(self):
+        invoice = unolet.Invoice.find(page_size=1, fields=["number"])[0]
+        loaded = ResourceList.from_bytes(ResourceList._from_resources(unolet.Invoice, [invoice]).to_bytes())[0]
+        self.assertEqual(loaded._loaded_fields, {"id", "number"})
+        self.assertNotIn("note", vars(loaded))
+        self.assertEqual(loaded.note, self.dataset.records["invoice"][invoice.id]["note"])
+
+    def test_unsaved_resource(self):
+        product = unolet.Product(name="New", price="1.50")
+        loaded = unolet.Product.from_bytes(product.to_bytes())
+        self.assertTrue(loaded._state.adding)
+        self.assertEqual(loaded.price, Decimal("1.50"))
+
+    def test_metadata_mismatch(self):
+        data = unolet.Product.get(1).to_bytes()
+        payload = copy.deepcopy(unolet.Product._metadata.data)
+        del payload["actions"]["POST"]["barcode"]
+        unolet.Product._metadata = Metadata(payload)
+        with self.assertRaises(ValueError):
+            unolet.Product.from_bytes(data)
+
+    def test_rejects_other_data(self):
+        data = unolet.Product.get(1).to_bytes()
+        with self.assertRaises(ValueError):
+            unolet.Invoice.from_bytes(data)
+        with self.assertRaises(ValueError):
+            ResourceList.from_bytes(data)
+        with self.assertRaises(ValueError):
+            unolet.Product.from_bytes(b"not a snapshot")
+        with self.assertRaises(ValueError):
+            unolet.Product.from_bytes(data[:40])
+
+    def test_client_bound_classes(self):
+        client = unolet.Client("token", "http://tenant", transport=self.make_transport(self.dataset))
+        data = client.Invoice.find(page_size=5).to_bytes()
+        loaded = Pagination.from_bytes(data, client.Invoice)
+        self.assertIsInstance(loaded[0], client.Invoice)
+        self.assertIsInstance(loaded[0].person, client.Person)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+
+import unolet
+from unolet.services.sync import CREATED, UPDATED, SyncEngine, SyncState
+
+from tests.base import MemoryAPITestCase
+
+
+class TestSyncEngine(MemoryAPITestCase):
+    dataset_options = {"invoices": 10, "movements": 95, "products": 10}
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "state.json")
+        self.movements = self.records["movement"]
+        self.engine = SyncEngine(self.path, page_size=10)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_initial_sync(self):
+        changes = list(self.engine.sync(unolet.Movement))
+        self.assertEqual([c.id for c in changes], list(range(1, 96)))
+        self.assertTrue(all(c.action == CREATED for c in changes))
+        self.assertIsInstance(changes[0].resource, unolet.Movement)
+
+        with open(self.path) as f:
+            state = json.load(f)["resources"]["movement"]
+        self.assertEqual(state["watermark"], self.movements[95]["modified"])
+        self.assertEqual(state["max_id"], 95)
+
+    def test_no_changes(self):
+        list(self.engine.sync(unolet.Movement))
+        self.assertEqual(list(SyncEngine(self.path, page_size=10).sync(unolet.Movement)), [])
+
+    def test_created_and_updated(self):
+        list(self.engine.sync(unolet.Movement))
+        self.movements[4]["modified"] = "2030-01-01T00:00:00"
+        self.movements[96] = dict(self.movements[1], id=96, modified="2030-01-02T00:00:00")
+
+        changes = list(self.engine.sync(unolet.Movement))
+        self.assertEqual([(c.action, c.id) for c in changes], [(UPDATED, 4), (CREATED, 96)])
+
+    def test_only_fetches_changes(self):
+        list(self.engine.sync(unolet.Movement))
+        transport = unolet.Unolet.transport
+        calls = len(transport.calls)
+        self.movements[4]["modified"] = "2030-01-01T00:00:00"
+        list(self.engine.sync(unolet.Movement))
+        self.assertEqual(len(transport.calls) - calls, 1)
+
+    def test_resume_after_crash(self):
+        seen = []
+        with self.assertRaises(RuntimeError):
+            for change in self.engine.sync(unolet.Movement):
+                if change.id == 25:
+                    raise RuntimeError("crash")
+                seen.append(change.id)
+
+        resumed = [c.id for c in SyncEngine(self.path, page_size=10).sync(unolet.Movement)]
+        self.assertGreater(resumed[0], 1)
+        self.assertLessEqual(resumed[0], 25)
+        self.assertEqual(sorted(set(seen) | set(resumed)), list(range(1, 96)))
+
+    def test_shared_watermark_larger_than_page(self):
+        for pk in range(20, 60):
+            self.movements[pk]["modified"] = "2024-06-01T00:00:00"
+        changes = [c.id for c in self.engine.sync(unolet.Movement)]
+        self.assertEqual(sorted(changes), list(range(1, 96)))
+        self.assertEqual(len(changes), len(set(changes)))
+
+    def test_id_watermark(self):
+        engine = SyncEngine(self.path, watermark_field="id", page_size=10)
+        self.assertEqual(len(list(engine.sync(unolet.Movement))), 95)
+        self.movements[96] = dict(self.movements[1], id=96)
+        self.assertEqual([c.id for c in engine.sync(unolet.Movement)], [96])
+
+
+class TestSyncState(unittest.TestCase):
+
+    def test_round_trip_and_reset(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.json")
+            state = SyncState(path)
+            state.set("movement", watermark="2024-01-01T00:00:00", last_id=3)
+            state.save()
+            self.assertEqual(SyncState(path).get("movement")["last_id"], 3)
+            self.assertEqual(os.listdir(directory), ["state.json"])
+
+            state.reset("movement")
+            self.assertEqual(SyncState(path).get("movement"), {})
+
+    def test_unknown_version(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.json")
+            with open(path, "w") as f:
+                json.dump({"version": 99}, f)
+            with self.assertRaises(ValueError):
+                SyncState(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
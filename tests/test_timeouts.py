@@ -0,0 +1,172 @@
+import time
+import unittest
+from collections import deque
+
+import unolet
+from unolet.exceptions import Timeout
+from unolet.timeouts import Deadline, Hedging, deadline, request_timeout
+from unolet.transports import InMemoryTransport
+from unolet.unit_of_work import UnitOfWork
+
+from benchmarks.fixtures import FIELDS, Dataset, options_payload, reset_metadata
+from tests.base import MemoryAPITestCase
+
+
+class SlowTransport(InMemoryTransport):
+    """Answers after a delay, and times out like a network transport."""
+
+    def __init__(self, dataset):
+        super().__init__(records=dataset.records, metadata={endpoint: options_payload(endpoint) for endpoint in FIELDS})
+        self.delay = 0.0
+        self.delays = deque()
+        self.timeouts = []
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        try:
+            delay = self.delays.popleft()
+        except IndexError:
+            delay = self.delay
+        self.timeouts.append(timeout)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise Timeout(f"{method} {url} timed out after {timeout}s")
+        time.sleep(delay)
+        return super().request(method, url, headers, params, data)
+
+
+class TestTimeouts(MemoryAPITestCase):
+    dataset_options = {"invoices": 20, "movements": 20, "products": 10}
+
+    def setUp(self):
+        super().setUp()
+        for model_class in (unolet.Invoice, unolet.Product, unolet.Person, unolet.Warehouse, unolet.DocumentType):
+            model_class._initialize_metadata()
+
+    def tearDown(self):
+        unolet.Unolet.set_timeout(None)
+        unolet.Unolet.set_hedging(None)
+        super().tearDown()
+
+    def make_transport(self, dataset):
+        return SlowTransport(dataset)
+
+    def test_client_timeout(self):
+        unolet.Product.get(1)
+        self.assertIsNone(self.transport.timeouts[-1])
+
+        unolet.Unolet.set_timeout(3)
+        unolet.Product.get(1)
+        self.assertEqual(self.transport.timeouts[-1], 3)
+
+        self.transport.delay = 1.0
+        unolet.Unolet.set_timeout(0.05)
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            unolet.Product.get(1)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_find_deadline_carries_through_pagination(self):
+        self.transport.timeouts = []
+        self.transport.delay = 0.1
+        page = unolet.Invoice.find(page_size=2, timeout=0.25)
+        page = page.next()
+        self.assertLess(self.transport.timeouts[-1], 0.2)
+        with self.assertRaises(Timeout):
+            page.next()
+        self.assertEqual(len(self.transport.timeouts), 3)
+
+    def test_stream_deadline(self):
+        self.transport.timeouts = []
+        self.transport.delay = 0.1
+        with self.assertRaises(Timeout):
+            list(unolet.Invoice.stream(page_size=2, timeout=0.25))
+        self.assertEqual(len(self.transport.timeouts), 3)
+
+        # Each iteration gets the full budget.
+        stream = unolet.Invoice.stream(page_size=10, timeout=0.5)
+        self.assertEqual(len(list(stream)), 20)
+        self.assertEqual(len(list(stream)), 20)
+
+    def test_deadline_block(self):
+        unolet.Unolet.set_timeout(3)
+        with deadline(0.5) as limit:
+            with deadline(10) as inner:
+                self.assertIs(inner, limit)
+                unolet.Product.get(1)
+        self.assertLessEqual(self.transport.timeouts[-1], 0.5)
+
+        self.transport.delay = 0.2
+        with self.assertRaises(Timeout):
+            with deadline(0.05):
+                unolet.Product.get(2)
+
+    def test_request_many(self):
+        with deadline(1):
+            unolet.Unolet.request_many([("product/1",), ("product/2",)])
+        self.assertTrue(all(0 < timeout <= 1 for timeout in self.transport.timeouts[-2:]))
+
+    def test_unit_of_work(self):
+        products = [unolet.Product(code=f"P{i}", name=f"Product {i}", price="1.00") for i in range(3)]
+        self.transport.delay = 0.5
+        with UnitOfWork(timeout=0.05) as uow:
+            uow.add(*products)
+        self.assertTrue(all(isinstance(result.error, Timeout) for result in uow.results))
+
+    def test_expired_deadline(self):
+        limit = Deadline(0)
+        self.assertTrue(limit.expired)
+        with self.assertRaises(Timeout):
+            request_timeout(None, limit)
+        self.assertEqual(request_timeout(2, None), 2)
+        self.assertLessEqual(request_timeout(2, Deadline(1)), 1)
+
+
+class TestHedging(unittest.TestCase):
+
+    def setUp(self):
+        reset_metadata()
+        self.transport = SlowTransport(Dataset(invoices=5, movements=5, products=10))
+        self.hedging = Hedging(percentile=50, min_delay=0.02, min_samples=5)
+        self.client = unolet.Client("token", "http://memory", transport=self.transport, hedging=self.hedging)
+
+    def tearDown(self):
+        self.hedging.close()
+        self.client.close()
+        reset_metadata()
+
+    def test_slow_get_is_sent_again(self):
+        self.client.Product.get(1)
+        self.transport.delay = 0.01
+        for _ in range(10):
+            self.client.Product.get(1)
+        self.assertIsNotNone(self.hedging.delay())
+
+        self.transport.delays.extend([1.0, 0.01])
+        start = time.monotonic()
+        product = self.client.Product.get(2)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(product.id, 2)
+        self.assertEqual((self.hedging.hedged, self.hedging.won), (1, 1))
+
+    def test_only_gets_are_hedged(self):
+        product = self.client.Product.get(1)
+        self.transport.delay = 0.01
+        for _ in range(10):
+            self.client.Product.get(1)
+        calls = len(self.transport.calls)
+
+        self.transport.delay = 0.1
+        product.name = "Renamed"
+        product.save()
+        self.assertEqual(len(self.transport.calls), calls + 1)
+        self.assertEqual(self.hedging.hedged, 0)
+
+    def test_not_hedged_until_warm(self):
+        self.transport.delay = 0.05
+        self.client.Product.get(1)
+        self.assertIsNone(self.hedging.delay())
+        self.assertEqual(len(self.transport.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
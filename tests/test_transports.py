@@ -0,0 +1,177 @@
+import importlib.util
+import unittest
+from decimal import Decimal
+
+import unolet
+from unolet.exceptions import NotFound, UnexpectedResponseCodeError, handle_response_error
+from unolet.transports import (
+    HTTP2Transport,
+    InMemoryTransport,
+    RequestsTransport,
+    Response,
+    get_transport,
+)
+
+from benchmarks.fixtures import Dataset, reset_metadata
+from benchmarks.stub_server import StubServer
+from tests.base import MemoryAPITestCase
+
+
+class TestInMemoryTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport(
+            records={"product": {1: {"id": 1, "code": "A"}, 2: {"id": 2, "code": "B"}, 3: {"id": 3, "code": "A"}}},
+            metadata={"product": {"name": "Product List", "actions": {}}},
+            page_size=2,
+        )
+        self.url = "http://memory/api/v1/product/"
+
+    def test_options(self):
+        response = self.transport.request("OPTIONS", self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Product List")
+
+    def test_list_pagination(self):
+        data = self.transport.request("GET", self.url).json()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual([r["id"] for r in data["results"]], [1, 2])
+        self.assertIsNone(data["previous"])
+
+        data = self.transport.request("GET", data["next"]).json()
+        self.assertEqual([r["id"] for r in data["results"]], [3])
+        self.assertIsNone(data["next"])
+
+    def test_list_filter(self):
+        data = self.transport.request("GET", self.url, params={"code": "A"}).json()
+        self.assertEqual([r["id"] for r in data["results"]], [1, 3])
+
+    def test_detail_create_update_delete(self):
+        self.assertEqual(self.transport.request("GET", self.url + "2/").json()["code"], "B")
+
+        response = self.transport.request("POST", self.url, data={"code": "C"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["id"], 4)
+
+        response = self.transport.request("PATCH", self.url + "4/", data={"code": "D"})
+        self.assertEqual(response.json(), {"id": 4, "code": "D"})
+
+        self.assertEqual(self.transport.request("DELETE", self.url + "4/").status_code, 204)
+        self.assertEqual(self.transport.request("GET", self.url + "4/").status_code, 404)
+
+    def test_add_route(self):
+        self.transport.add_route("GET", "product/1", json={"detail": "Boom"}, status=500)
+        response = self.transport.request("GET", self.url + "1/")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.transport.calls[-1][0], "GET")
+
+
+class TestResponse(unittest.TestCase):
+
+    def test_raise_for_status(self):
+        import requests
+        Response(200, b"{}").raise_for_status()
+        with self.assertRaises(requests.HTTPError):
+            Response(404, b"{}", url="http://x/").raise_for_status()
+
+
+class TestGetTransport(unittest.TestCase):
+
+    def test_by_name(self):
+        self.assertIsInstance(get_transport(), RequestsTransport)
+        self.assertIsInstance(get_transport("memory"), InMemoryTransport)
+
+        transport = InMemoryTransport()
+        self.assertIs(get_transport(transport), transport)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_transport("carrier-pigeon")
+
+
+class TestUnoletAPIWithTransport(MemoryAPITestCase):
+    dataset_options = {"invoices": 20, "movements": 50, "products": 30}
+
+    def test_get(self):
+        product = unolet.Product.get(3)
+        self.assertEqual(product.code, "P000003")
+        self.assertIsInstance(product.price, Decimal)
+
+    def test_get_not_found(self):
+        with self.assertRaises(NotFound):
+            unolet.Product.get(999)
+
+    def test_find_and_next(self):
+        page = unolet.Product.find(page=1)
+        self.assertEqual(page.count, 30)
+        self.assertEqual(len(page.results), 30)
+        self.assertIsNone(page.next())
+
+    def test_save(self):
+        product = unolet.Product(code="NEW", name="New product", price="1.50")
+        product.save()
+        self.assertEqual(product.id, 31)
+
+        product.price = Decimal("2.00")
+        product.save()
+        self.assertEqual(self.dataset.records["product"][31]["price"], "2.00")
+
+    def test_request_many(self):
+        responses = unolet.Unolet.request_many([("product/2",), ("product/1", "GET"), ("product", "POST", None, {"code": "X"})])
+        self.assertEqual([r.json()["id"] for r in responses], [2, 1, 31])
+
+    def test_request_many_raises(self):
+        with self.assertRaises(NotFound):
+            unolet.Unolet.request_many([("product/1",), ("product/999",)])
+
+
+class TestHandleResponseError(unittest.TestCase):
+
+    def test_expected_response_code(self):
+        handle_response_error(Response(201, b"{}"), expected_response_code=201)
+        with self.assertRaises(UnexpectedResponseCodeError):
+            handle_response_error(Response(200, b"{}"), expected_response_code=201)
+
+    def test_error_status(self):
+        with self.assertRaises(NotFound):
+            handle_response_error(Response(404, b'{"detail": "Not found."}'), expected_response_code=200)
+
+
+class TestRequestsTransport(unittest.TestCase):
+
+    def test_request_many_reuses_sessions(self):
+        reset_metadata()
+        with StubServer(Dataset(invoices=10, movements=10, products=10)) as server:
+            transport = RequestsTransport(max_concurrency=4)
+            unolet.Unolet.connect("test-token", server.base_url, transport=transport)
+            try:
+                for _ in range(20):
+                    responses = unolet.Unolet.request_many([(f"product/{pk}",) for pk in range(1, 11)])
+                    self.assertEqual([r.json()["id"] for r in responses], list(range(1, 11)))
+                # One session per thread of the transport.
+                self.assertLessEqual(len(transport._sessions), 4)
+            finally:
+                unolet.Unolet.set_transport()
+                reset_metadata()
+        self.assertEqual(transport._sessions, [])
+        self.assertIsNone(transport._executor)
+
+
+@unittest.skipUnless(importlib.util.find_spec("httpx") and importlib.util.find_spec("h2"), "httpx[http2] is not installed")
+class TestHTTP2Transport(unittest.TestCase):
+
+    def test_against_stub_server(self):
+        reset_metadata()
+        with StubServer(Dataset(invoices=10, movements=10, products=10)) as server:
+            unolet.Unolet.connect("test-token", server.base_url, transport=HTTP2Transport())
+            try:
+                self.assertEqual(unolet.Product.get(2).code, "P000002")
+                responses = unolet.Unolet.request_many([(f"product/{pk}",) for pk in range(1, 11)])
+                self.assertEqual([r.json()["id"] for r in responses], list(range(1, 11)))
+            finally:
+                unolet.Unolet.set_transport()
+                reset_metadata()
+
+
+if __name__ == "__main__":
+    unittest.main()
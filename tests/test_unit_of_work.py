@@ -0,0 +1,135 @@
+import threading
+import time
+import unittest
+from datetime import date
+
+import unolet
+from unolet.exceptions import ValidationError
+from unolet.transports import InMemoryTransport
+from unolet.unit_of_work import CREATE, UNCHANGED, UPDATE, UnitOfWork
+
+from benchmarks.fixtures import options_payload
+from tests.base import MemoryAPITestCase
+
+
+class SlowTransport(InMemoryTransport):
+
+    def request(self, *args, **kwargs):
+        time.sleep(0.02)
+        return super().request(*args, **kwargs)
+
+
+class TestUnitOfWork(MemoryAPITestCase):
+    dataset_options = {"invoices": 5, "movements": 5, "products": 20}
+
+    def setUp(self):
+        super().setUp()
+        self.warehouse = unolet.Warehouse.get(1)
+        self.document_type = unolet.DocumentType.get(1)
+        self.products = list(unolet.Product.stream())
+
+    def make_transport(self, dataset):
+        return SlowTransport(
+            dataset.records,
+            {endpoint: options_payload(endpoint) for endpoint in dataset.records},
+        )
+
+    def posted(self, endpoint):
+        return [data for method, url, _, data in self.transport.calls if method == "POST" and f"/{endpoint}/" in url]
+
+    def new_invoice(self, lines=20, person=None):
+        person = person or unolet.Person(name="New customer")
+        invoice = unolet.Invoice(date=date(2024, 3, 1), type=self.document_type, person=person, warehouse=self.warehouse)
+        movements = [
+            unolet.Movement(document=invoice, product=product, quantity=1, price=product.price)
+            for product in self.products[:lines]
+        ]
+        return person, invoice, movements
+
+    def test_saves_in_dependency_order(self):
+        person, invoice, movements = self.new_invoice()
+        with UnitOfWork() as uow:
+            uow.add(*movements)
+
+        self.assertEqual(len(uow.results), 22)
+        self.assertTrue(all(result.ok and result.action == CREATE for result in uow.results))
+        self.assertIsNotNone(invoice.id)
+        self.assertEqual(self.posted("invoice")[0]["person"], person.id)
+        self.assertEqual({data["document"] for data in self.posted("movement")}, {invoice.id})
+        self.assertTrue(all(movement.id for movement in movements))
+
+        methods = [(method, url.split("/")[-2]) for method, url, _, _ in self.transport.calls if method == "POST"]
+        self.assertEqual(methods[:2], [("POST", "person"), ("POST", "invoice")])
+
+    def test_concurrent_writes(self):
+        _, invoice, movements = self.new_invoice(lines=20)
+        start = time.perf_counter()
+        uow = UnitOfWork(max_concurrency=20)
+        uow.add(invoice, *movements)
+        uow.commit()
+        # Three levels (person, invoice, lines) instead of 22 sequential requests.
+        self.assertLess(time.perf_counter() - start, 22 * 0.02 * 0.6)
+
+    def test_commits_share_threads(self):
+        threads = set()
+        request = self.transport.request
+
+        def record(*args, **kwargs):
+            threads.add(threading.current_thread())
+            return request(*args, **kwargs)
+
+        self.transport.request = record
+        for _ in range(5):
+            _, invoice, movements = self.new_invoice(lines=3)
+            with UnitOfWork() as uow:
+                uow.add(invoice, *movements)
+            self.assertTrue(all(result.ok for result in uow.results))
+        self.assertLessEqual(len(threads), self.transport.max_concurrency)
+
+    def test_updates_and_unchanged(self):
+        product, unchanged = self.products[0], self.products[1]
+        product.name = "Renamed"
+        _, invoice, movements = self.new_invoice(lines=1)
+        uow = UnitOfWork()
+        uow.add(product, unchanged, *movements)
+        results = {id(result.resource): result for result in uow.commit()}
+        self.assertEqual(results[id(product)].action, UPDATE)
+        self.assertEqual(results[id(unchanged)].action, UNCHANGED)
+        self.assertEqual(self.records["product"][product.id]["name"], "Renamed")
+        self.assertEqual(len(uow), 0)
+
+    def test_invalid_resource_skips_dependents(self):
+        person, invoice, movements = self.new_invoice(lines=3, person=unolet.Person(phone="555"))
+        uow = UnitOfWork()
+        uow.add(*movements)
+        results = {id(result.resource): result for result in uow.commit()}
+
+        self.assertIsInstance(results[id(person)].error, ValidationError)
+        self.assertTrue(results[id(invoice)].skipped)
+        self.assertTrue(all(results[id(m)].skipped for m in movements))
+        self.assertEqual(self.posted("invoice"), [])
+
+    def test_failed_write_skips_dependents(self):
+        self.transport.add_route("POST", "invoice", json={"date": ["Closed period."]}, status=400)
+        _, invoice, movements = self.new_invoice(lines=2)
+        uow = UnitOfWork()
+        uow.add(invoice, *movements)
+        results = {id(result.resource): result for result in uow.commit()}
+
+        self.assertIsInstance(results[id(invoice)].error, ValidationError)
+        self.assertFalse(results[id(invoice)].skipped)
+        self.assertTrue(all(results[id(m)].skipped for m in movements))
+        self.assertEqual(len(self.posted("person")), 1)
+        self.assertEqual(self.posted("movement"), [])
+
+    def test_not_committed_on_error(self):
+        _, invoice, _ = self.new_invoice(lines=0)
+        with self.assertRaises(RuntimeError):
+            with UnitOfWork() as uow:
+                uow.add(invoice)
+                raise RuntimeError
+        self.assertEqual(self.posted("invoice"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
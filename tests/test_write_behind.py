@@ -0,0 +1,195 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import unolet
+from unolet.cache import LocalCache
+from unolet.exceptions import ValidationError
+from unolet.services.write_behind import WriteBehindQueue
+
+from tests.base import MemoryAPITestCase
+
+
+class TestWriteBehindQueue(MemoryAPITestCase):
+    dataset_options = {"invoices": 2, "movements": 2, "products": 10}
+
+    def setUp(self):
+        super().setUp()
+        self.products = list(unolet.Product.stream())
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.spool_path = os.path.join(self.tmpdir.name, "writes.jsonl")
+
+    def tearDown(self):
+        unolet.Unolet.default.write_behind = None
+        super().tearDown()
+        self.tmpdir.cleanup()
+
+    def writes(self):
+        return [(method, url, data) for method, url, _, data in self.transport.calls if method in ("POST", "PATCH")]
+
+    def spooled(self):
+        with open(self.spool_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_coalesces_updates(self):
+        product = self.products[0]
+        with WriteBehindQueue(flush_interval=60) as queue:
+            product.name = "Renamed"
+            first = queue.save(product)
+            product.price = 12
+            second = queue.save(product)
+            self.assertIs(first, second)
+            self.assertEqual(len(queue), 1)
+            self.assertEqual(self.writes(), [])
+
+        writes = self.writes()
+        self.assertEqual(len(writes), 1)
+        method, url, data = writes[0]
+        self.assertEqual(method, "PATCH")
+        self.assertTrue(url.endswith(f"/product/{product.id}/"))
+        self.assertEqual(data["name"], "Renamed")
+        self.assertEqual(data["price"], "12")
+        self.assertIs(first.result(), product)
+        self.assertEqual(unolet.Product.get(product.id).name, "Renamed")
+
+    def test_creates_once(self):
+        queue = WriteBehindQueue(flush_interval=60)
+        product = unolet.Product(name="New", code="NEW-1", price=5)
+        future = queue.save(product)
+        product.price = 6
+        queue.save(product)
+        queue.flush()
+        queue.close()
+
+        posts = [data for method, _, data in self.writes() if method == "POST"]
+        self.assertEqual(len(posts), 1)
+        self.assertEqual(posts[0]["price"], "6")
+        self.assertIsNotNone(future.result().id)
+        self.assertFalse(product._state.adding)
+
+    def test_flushes_on_batch_size(self):
+        with WriteBehindQueue(batch_size=3, flush_interval=60) as queue:
+            futures = []
+            for product in self.products[:3]:
+                product.name = f"{product.name} (batch)"
+                futures.append(queue.save(product))
+            for future in futures:
+                future.result(timeout=5)
+            self.assertEqual(len(self.writes()), 3)
+
+    def test_flushes_on_interval(self):
+        with WriteBehindQueue(flush_interval=0.05) as queue:
+            product = self.products[0]
+            product.name = "Later"
+            future = queue.save(product)
+            start = time.monotonic()
+            future.result(timeout=5)
+            self.assertLess(time.monotonic() - start, 2)
+
+    def test_invalid_resource_raises_on_save(self):
+        product = self.products[0]
+        product.price = "abc"
+        with WriteBehindQueue(flush_interval=60) as queue:
+            with self.assertRaises(ValidationError):
+                queue.save(product)
+            self.assertEqual(len(queue), 0)
+
+    def test_api_errors_fail_the_future(self):
+        product = self.products[0]
+        self.transport.add_route("PATCH", f"product/{product.id}", json={"name": ["Too long."]}, status=400)
+        product.name = "x" * 300
+        with WriteBehindQueue(flush_interval=60, spool_path=self.spool_path) as queue:
+            future = queue.save(product)
+        self.assertIsInstance(future.exception(), ValidationError)
+        self.assertEqual(self.spooled(), [])
+
+    def test_spool_is_replayed(self):
+        product = self.products[0]
+        queue = WriteBehindQueue(flush_interval=60, spool_path=self.spool_path)
+        product.name = "Spooled"
+        queue.save(product)
+        product.price = 3
+        queue.save(product)
+        self.assertEqual(len(self.spooled()), 2)
+        # Stop the worker without flushing, as if the process had died.
+        queue._closed = True
+        with queue._condition:
+            queue._condition.notify_all()
+        queue._thread.join()
+        self.assertEqual(self.writes(), [])
+
+        with WriteBehindQueue(flush_interval=60, spool_path=self.spool_path) as replayed:
+            self.assertEqual(len(replayed), 1)
+
+        writes = self.writes()
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(writes[0][2], {"name": "Spooled", "price": "3"})
+        self.assertEqual(self.spooled(), [])
+
+    def test_untracked_values_are_sent(self):
+        product = unolet.Product(id=self.products[0].id, code="X1", name="Built", price="5.00")
+        self.assertEqual(product._state.changes, {})
+        with WriteBehindQueue(flush_interval=60) as queue:
+            future = queue.save(product)
+        self.assertIs(future.result(), product)
+        self.assertEqual(self.writes()[-1][2]["price"], "5.00")
+        self.assertEqual(unolet.Product.get(product.id).price, product.price)
+
+    def test_writes_invalidate_the_cache(self):
+        unolet.Unolet.set_cache(LocalCache())
+        self.addCleanup(unolet.Unolet.set_cache, None)
+        product = unolet.Product.get(1)
+        with WriteBehindQueue(flush_interval=60, spool_path=self.spool_path) as queue:
+            queue.attach()
+            product.price = 7
+            product.save()
+            # Changed again before the flush.
+            product.name = "Pending"
+        self.assertEqual(unolet.Product.get(1).price, 7)
+
+        # Replayed from the spool.
+        unolet.Product.get(2)
+        with open(self.spool_path, "w") as f:
+            f.write(json.dumps({"key": "product/2", "model": "Product", "action": "update", "id": 2, "data": {"price": "8"}}) + "\n")
+        WriteBehindQueue(flush_interval=60, spool_path=self.spool_path).close()
+        self.assertEqual(unolet.Product.get(2).price, 8)
+
+    def test_flushes_share_threads(self):
+        threads = set()
+        request = self.transport.request
+
+        def record(*args, **kwargs):
+            threads.add(threading.current_thread())
+            return request(*args, **kwargs)
+
+        self.transport.request = record
+        with WriteBehindQueue(flush_interval=60, max_concurrency=2) as queue:
+            for i in range(10):
+                for product in self.products[:4]:
+                    product.name = f"Flush {i}"
+                    queue.save(product)
+                queue.flush()
+        self.assertEqual(self.products[0].name, "Flush 9")
+        self.assertLessEqual(len(threads), 2)
+
+    def test_attached_save(self):
+        product = self.products[0]
+        with WriteBehindQueue(flush_interval=60) as queue:
+            queue.attach()
+            product.name = "Attached"
+            self.assertIs(product.save(), product)
+            self.assertEqual(len(queue), 1)
+            self.assertEqual(self.writes(), [])
+        self.assertEqual(len(self.writes()), 1)
+        self.assertIsNone(unolet.Unolet.default.write_behind)
+
+        product.name = "Direct"
+        product.save()
+        self.assertEqual(len(self.writes()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
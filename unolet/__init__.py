@@ -7,6 +7,7 @@ ERP system such as documents, invoices, purchases, quotations, and more.
 
 Public Classes:
     - Unolet
+    - Client
     - Company
     - DocumentType
     - Document
@@ -27,30 +28,55 @@ Example:
 
     # Initialize the Unolet API client
     Unolet.connect("your_token_here", "your_unolet_base_url_here", "v1")
+
+    # Or one client per tenant
+    client = Client("tenant_token_here", "tenant_base_url_here")
+    client.Invoice.find(page=1)
 """
 
 __version__ = "0.0.2"
 
-from unolet.api import UnoletAPI as Unolet
-from unolet.erp import (
-    DocumentType,
-    Document,
-    Invoice,
-    Purchase,
-    PurchaseOrder,
-    Quotation,
-    Person,
-    Product,
-    Movement,
-    NCF,
-    AuthorizationNCF,
-    Transaction,
-    Warehouse,
-)
+import importlib
+
+# Public names and the module defining them. They are imported on first access
+# (PEP 562), so `import unolet` stays cheap for short-lived processes.
+_LAZY_ATTRIBUTES = {
+    "Unolet": ("unolet.api", "UnoletAPI"),
+    "Client": ("unolet.api", "Client"),
+    "Company": ("unolet.erp", "Company"),
+    "DocumentType": ("unolet.erp", "DocumentType"),
+    "Document": ("unolet.erp", "Document"),
+    "Invoice": ("unolet.erp", "Invoice"),
+    "Purchase": ("unolet.erp", "Purchase"),
+    "PurchaseOrder": ("unolet.erp", "PurchaseOrder"),
+    "Quotation": ("unolet.erp", "Quotation"),
+    "Person": ("unolet.erp", "Person"),
+    "Product": ("unolet.erp", "Product"),
+    "Movement": ("unolet.erp", "Movement"),
+    "NCF": ("unolet.erp", "NCF"),
+    "AuthorizationNCF": ("unolet.erp", "AuthorizationNCF"),
+    "Transaction": ("unolet.erp", "Transaction"),
+    "Warehouse": ("unolet.erp", "Warehouse"),
+}
+
+
+def __getattr__(name):
+    try:
+        module, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 
 __all__ = [
     "Unolet",
+    "Client",
     "Company",
     "DocumentType",
     "Document",
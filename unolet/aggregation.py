@@ -0,0 +1,234 @@
+"""
+Streaming aggregation over raw API records.
+
+An `Aggregator` consumes pages of raw records as they arrive and keeps one
+entry per group only, so memory is bounded by the number of groups rather than
+the number of rows. Decimal sums are exact: values are accumulated as integers
+scaled by the field `decimal_places`, in NumPy int64 buffers when NumPy is
+installed (falling back to Python integers before they could overflow) or in
+plain lists otherwise.
+
+Group keys are read straight from the JSON: related fields group by the id of
+the related object, and date or datetime fields accept the `__date`, `__month`
+and `__year` transforms.
+
+Example:
+    from unolet import Movement
+
+    rows = Movement.aggregate(group_by=["product", "warehouse"], sums=["quantity", "total"], date__gte="2024-01-01")
+    # [{"product": 1, "warehouse": 2, "quantity": Decimal("12.5000"), "total": Decimal("1200.00"), "count": 3}, ...]
+"""
+
+import importlib
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+from unolet.fields import field_kind
+from unolet.utils import related_id, scaled_int
+
+
+SUMMABLE = ("decimal", "integer", "float")
+TRANSFORMS = {
+    "date": lambda value: value[:10],
+    "month": lambda value: value[:7],
+    "year": lambda value: value[:4],
+}
+INT64_LIMIT = 2 ** 62
+
+
+def _numpy():
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+def _fraction_digits(value):
+    if isinstance(value, str) and "." in value and "e" not in value and "E" not in value:
+        return len(value) - value.index(".") - 1
+    return 0
+
+
+class SumBuffer:
+    """
+    Per-group sums of one field.
+
+    Args:
+        kind (str): "decimal", "integer" or "float".
+        scale (int, optional): Decimal places of the sums. Inferred from the
+            values, and widened as needed, when `None`.
+    """
+    def __init__(self, kind: str, scale=None):
+        self.kind = kind
+        self.fixed_scale = scale is not None or kind != "decimal"
+        self.scale = scale or 0
+        self.np = _numpy()
+        if self.np is None:
+            self.values = []
+        elif kind == "float":
+            self.values = self.np.zeros(0, dtype=self.np.float64)
+        else:
+            self.values = self.np.zeros(0, dtype=self.np.int64)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _grow(self, size):
+        if size <= len(self.values):
+            return
+        if self.np is None:
+            self.values.extend([0.0 if self.kind == "float" else 0] * (size - len(self.values)))
+        else:
+            capacity = max(size, 2 * len(self.values), 16)
+            grown = self.np.zeros(capacity, dtype=self.values.dtype)
+            grown[:len(self.values)] = self.values
+            self.values = grown
+
+    def _rescale(self, scale):
+        factor = 10 ** (scale - self.scale)
+        if self.np is None:
+            self.values = [v * factor for v in self.values]
+        else:
+            self._ensure_capacity(int(self.np.abs(self.values).max(initial=0)) * factor)
+            self.values = self.values * factor
+        self.scale = scale
+
+    def _ensure_capacity(self, bound):
+        """Switch to exact Python integers before int64 could overflow."""
+        if self.np is not None and self.values.dtype != object and bound >= INT64_LIMIT:
+            self.values = self.values.astype(object)
+
+    def add(self, indices: List[int], raw: List, size: int):
+        """
+        Add raw values to their groups.
+
+        Args:
+            indices (List[int]): Group index of each value.
+            raw (List): Raw JSON values; `None` is skipped.
+            size (int): Number of groups known so far.
+        """
+        pairs = [(i, v) for i, v in zip(indices, raw) if v is not None]
+        if self.kind == "decimal" and not self.fixed_scale:
+            scale = max((_fraction_digits(v) for _, v in pairs), default=0)
+            if scale > self.scale:
+                self._rescale(scale)
+
+        if self.kind == "float":
+            values = [float(v) for _, v in pairs]
+        elif self.kind == "integer":
+            values = [int(v) for _, v in pairs]
+        else:
+            values = [scaled_int(v, self.scale) for _, v in pairs]
+        indices = [i for i, _ in pairs]
+
+        if self.np is None:
+            self._grow(size)
+            for i, v in zip(indices, values):
+                self.values[i] += v
+            return
+
+        np = self.np
+        self._grow(size)
+        if self.kind != "float" and values:
+            bound = max(map(abs, values)) * len(values) + int(np.abs(self.values).max(initial=0))
+            self._ensure_capacity(bound)
+        np.add.at(self.values, np.array(indices, dtype=np.intp), np.array(values, dtype=self.values.dtype))
+
+    def value(self, index: int):
+        """Return the sum of a group as `Decimal`, `int` or `float`."""
+        value = self.values[index] if index < len(self.values) else 0
+        if self.kind == "decimal":
+            return Decimal(int(value)).scaleb(-self.scale)
+        if self.kind == "integer":
+            return int(value)
+        return float(value)
+
+
+class Aggregator:
+    """
+    Group raw records and accumulate counts and sums.
+
+    Args:
+        metadata (Metadata): Metadata of the aggregated resource.
+        group_by (Iterable[str]): Fields to group by, optionally with a
+            `__date`, `__month` or `__year` transform.
+        sums (Iterable[str]): Numeric fields to sum.
+    """
+    def __init__(self, metadata, group_by: Iterable[str] = (), sums: Iterable[str] = ()):
+        self.metadata = metadata
+        self.group_by = [self._group_spec(name) for name in group_by]
+        self.sums: Dict[str, SumBuffer] = {}
+        for name in sums:
+            field = self._field(name)
+            kind = field_kind(field)
+            if kind not in SUMMABLE:
+                raise ValueError(f"Cannot sum {kind} field {name!r}")
+            self.sums[name] = SumBuffer(kind, getattr(field, "decimal_places", None))
+        self.groups: Dict[tuple, int] = {}
+        self.keys: List[tuple] = []
+        self.counts = SumBuffer("integer")
+        self.rows = 0
+
+    def _field(self, name):
+        try:
+            return self.metadata.fields[name]
+        except KeyError:
+            raise ValueError(f"Unknown field {name!r} for {self.metadata.name or 'resource'}")
+
+    def _group_spec(self, label):
+        name, _, transform = label.partition("__")
+        kind = field_kind(self._field(name))
+        if transform:
+            if transform not in TRANSFORMS or kind not in ("date", "datetime"):
+                raise ValueError(f"Unsupported transform {label!r}")
+            apply = TRANSFORMS[transform]
+            return label, name, lambda value: None if value is None else apply(value)
+        if kind == "related":
+            return label, name, related_id
+        return label, name, None
+
+    def add(self, rows: List[Dict]):
+        """Aggregate a page of raw records."""
+        indices = []
+        groups, keys = self.groups, self.keys
+        specs = self.group_by
+        for row in rows:
+            key = tuple(
+                extract(row.get(name)) if extract else row.get(name)
+                for _, name, extract in specs
+            )
+            index = groups.get(key)
+            if index is None:
+                index = groups[key] = len(keys)
+                keys.append(key)
+            indices.append(index)
+
+        size = len(keys)
+        self.counts.add(indices, [1] * len(indices), size)
+        for name, buffer in self.sums.items():
+            buffer.add(indices, [row.get(name) for row in rows], size)
+        self.rows += len(rows)
+
+    def consume(self, pages: Iterable[List[Dict]]):
+        """Aggregate every page of `pages`. Returns `self`."""
+        for rows in pages:
+            self.add(rows)
+        return self
+
+    def result(self) -> List[Dict]:
+        """
+        Return one dict per group, sorted by group key, holding the group
+        fields, the sums and a `count` of rows.
+        """
+        order = sorted(
+            range(len(self.keys)),
+            key=lambda i: tuple((value is None, value) for value in self.keys[i]),
+        )
+        result = []
+        for index in order:
+            row = {label: value for (label, _, _), value in zip(self.group_by, self.keys[index])}
+            for name, buffer in self.sums.items():
+                row[name] = buffer.value(index)
+            row["count"] = self.counts.value(index)
+            result.append(row)
+        return result
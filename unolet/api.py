@@ -1,11 +1,16 @@
-import requests
-from dataclasses import dataclass
+import importlib
+import threading
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
 
 from unolet.exceptions import handle_response_error
+from unolet.timeouts import current_deadline, request_timeout
+from unolet.transports import BaseTransport, get_transport
 
+if TYPE_CHECKING:
+    import requests
 
-@dataclass(frozen=True)
-class APIConfig:
+
+class APIConfig(NamedTuple):
     token: str
     base_url: str
     api_version: str = "v1"
@@ -15,75 +20,343 @@ class APIConfig:
         return f"{self.base_url}/api/{self.api_version}"
 
 
-class UnoletAPI:
-    config: APIConfig = None
+class Client:
+    """
+    A connection to one Unolet instance.
 
-    @classmethod
-    def connect(cls, token: str, base_url: str, api_version: str = "v1"):
-        """
-        Establish a connection to the Unolet API.
+    Each client has its own configuration, transport (and so connection pool),
+    concurrency limit and resource metadata, so one process can talk to several
+    companies or instances at once. Resources bound to the client are reached as
+    attributes:
 
-        This method configures the connection settings for the Unolet API using
-        the provided token, base URL, and API version.
+        client = Client("[TOKEN]", "https://tenant.unolet.app")
+        invoices = client.Invoice.find(page=1)
+
+    `client.Invoice` is a subclass of `unolet.Invoice` that sends its requests,
+    and builds its related resources, through `client`.
+
+    Args:
+        `token` (str, optional): The authentication token. The client must be
+            connected with `connect` before use when omitted.
+        `base_url` (str, optional): The base URL of the Unolet API.
+        `api_version` (str, optional): The version of the Unolet API to use. Defaults to "v1".
+        `transport` (str | BaseTransport, optional): The transport used to send requests,
+            either an instance or one of "requests", "http2" or "memory".
+        `max_concurrency` (int, optional): Maximum number of requests in flight for
+            `request_many`, for transports created by name.
+        `projection_param` (str, optional): Query parameter used to ask the server for
+            a subset of fields, as with `find(fields=[...])`. Defaults to "fields";
+            `None` when the server does not support projections.
+        `cache` (BaseCache, optional): Cache consulted for metadata and `get()`, see
+            `unolet.cache`.
+        `timeout` (float, optional): Timeout of every request, in seconds. See
+            `unolet.timeouts`.
+        `hedging` (Hedging, optional): Send slow GET requests a second time, see
+            `unolet.timeouts.Hedging`.
+    """
+    def __init__(
+        self,
+        token: str = None,
+        base_url: str = None,
+        api_version: str = "v1",
+        transport=None,
+        max_concurrency: int = None,
+        projection_param: Optional[str] = "fields",
+        cache=None,
+        timeout: Optional[float] = None,
+        hedging=None,
+    ):
+        self.config: APIConfig = None
+        self.transport: BaseTransport = None
+        self.max_concurrency = max_concurrency
+        self.projection_param = projection_param
+        self.cache = cache
+        self.timeout = timeout
+        self.hedging = hedging
+        # A `WriteBehindQueue` that `save()` hands writes to, once attached.
+        self.write_behind = None
+        self._resources: Dict[str, type] = {}
+        self._lock = threading.Lock()
+        if token is not None:
+            self.connect(token, base_url, api_version, transport)
+        elif transport is not None:
+            self.set_transport(transport)
+
+    def __repr__(self):
+        url = self.config.api_url if self.config else "not connected"
+        return f"<{self.__class__.__name__} {url}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getattr__(self, name):
+        if name.startswith("_") or not name[:1].isupper():
+            raise AttributeError(name)
+        return self.resource(name)
+
+    def connect(self, token: str, base_url: str, api_version: str = "v1", transport=None):
+        """
+        Configure the connection settings of the client.
 
         Args:
             `token` (str): The authentication token for accessing the Unolet API.
             `base_url` (str): The base URL of the Unolet API.
             `api_version` (str, optional): The version of the Unolet API to use. Defaults to "v1".
+            `transport` (str | BaseTransport, optional): The transport used to send requests,
+                either an instance or one of "requests", "http2" or "memory". The current
+                transport is kept when omitted; "requests" is used if there is none.
         """
-        cls.config = APIConfig(token, base_url, api_version)
+        self.config = APIConfig(token, base_url, api_version)
+        if transport is not None or self.transport is None:
+            self.set_transport(transport)
 
-    @staticmethod
-    def get_headers():
+    def set_transport(self, transport=None):
+        """
+        Replace the transport used to send requests, closing the previous one.
+
+        Args:
+            `transport` (str | BaseTransport, optional): A transport instance or name.
+        """
+        if self.max_concurrency is not None and not isinstance(transport, BaseTransport):
+            transport = get_transport(transport, max_concurrency=self.max_concurrency)
+        else:
+            transport = get_transport(transport)
+        if self.transport is not None and self.transport is not transport:
+            self.transport.close()
+        self.transport = transport
+
+    def get_transport(self) -> BaseTransport:
+        if self.transport is None:
+            self.set_transport()
+        return self.transport
+
+    def close(self):
+        """Close the transport of the client."""
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def resource(self, name: str) -> type:
+        """
+        Return the resource class `name`, e.g. "Invoice", bound to this client.
+
+        Bound classes are created once per client and keep their own metadata.
+        """
+        model_class = self._resources.get(name)
+        if model_class is not None:
+            return model_class
+        base = getattr(importlib.import_module("unolet"), name, None)
+        if not isinstance(base, type) or not hasattr(base, "_metadata"):
+            raise AttributeError(f"Unknown resource {name!r}")
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = type(base)(name, (base,), {
+                    "_endpoint": base._endpoint,
+                    "_api": self,
+                    "__module__": base.__module__,
+                    "__qualname__": base.__qualname__,
+                })
+            return self._resources[name]
+
+    def get_headers(self):
         return {
-            "Authorization": f"Token {UnoletAPI.config.token}",
+            "Authorization": f"Token {self.config.token}",
             "Content-Type": "application/json",
         }
 
-    @staticmethod
-    def request(endpoint, method='GET', params=None, data=None):
-        url = UnoletAPI.build_url(endpoint)
-        headers = UnoletAPI.get_headers()
-        response = requests.request(method, url, headers=headers, params=params, json=data)
-        return response
+    def request(self, endpoint, method='GET', params=None, data=None):
+        url = self.build_url(endpoint)
+        headers = self.get_headers()
+        transport = self.get_transport()
+        # Captured here: hedged attempts run in other threads.
+        limit = current_deadline()
 
-    @staticmethod
-    def get(endpoint, params=None):
-        response = UnoletAPI.request(endpoint, "GET", params=params)
-        return UnoletAPI.process_response(response)
+        def send():
+            timeout = request_timeout(self.timeout, limit)
+            if timeout is None:
+                return transport.request(method, url, headers=headers, params=params, data=data)
+            return transport.request(method, url, headers=headers, params=params, data=data, timeout=timeout)
 
-    @staticmethod
-    def post(endpoint, params=None, data=None):
-        response = UnoletAPI.request(endpoint, "POST", params=params, data=data)
-        return UnoletAPI.process_response(response)
+        if self.hedging is not None and method.upper() == "GET":
+            return self.hedging.send(send)
+        return send()
 
-    @staticmethod
-    def put(endpoint, params=None, data=None):
-        response = UnoletAPI.request(endpoint, "PUT", params=params, data=data)
-        return UnoletAPI.process_response(response)
+    def request_many(self, calls: List[tuple], raise_errors: bool = True):
+        """
+        Send several requests concurrently through the transport.
 
-    @staticmethod
-    def patch(endpoint, params=None, data=None):
-        response = UnoletAPI.request(endpoint, "PATCH", params=params, data=data)
-        return UnoletAPI.process_response(response)
+        Args:
+            `calls` (List[tuple]): `(endpoint, method, params, data)` tuples. Trailing
+                items may be omitted, as with `request`.
+            `raise_errors` (bool, optional): Raise the error of the first failed
+                response. Pass `False` to check each response yourself.
 
-    @staticmethod
-    def delete(endpoint, params=None):
-        response = UnoletAPI.request(endpoint, "DELETE", params=params)
-        return UnoletAPI.process_response(response)
+        Returns:
+            list: The responses, in the same order as `calls`.
+        """
+        defaults = (None, "GET", None, None)
+        headers = self.get_headers()
+        timeout = request_timeout(self.timeout, current_deadline())
+        requests_ = []
+        for call in calls:
+            endpoint, method, params, data = tuple(call) + defaults[len(call):]
+            request = {
+                "method": method,
+                "url": self.build_url(endpoint),
+                "headers": headers,
+                "params": params,
+                "data": data,
+            }
+            if timeout is not None:
+                request["timeout"] = timeout
+            requests_.append(request)
+        responses = self.get_transport().request_many(requests_)
+        if not raise_errors:
+            return responses
+        return [self.process_response(response) for response in responses]
 
-    @staticmethod
-    def options(endpoint):
-        response = UnoletAPI.request(endpoint, "OPTIONS")
-        return UnoletAPI.process_response(response)
+    def get(self, endpoint, params=None):
+        response = self.request(endpoint, "GET", params=params)
+        return self.process_response(response)
+
+    def post(self, endpoint, params=None, data=None):
+        response = self.request(endpoint, "POST", params=params, data=data)
+        return self.process_response(response)
+
+    def put(self, endpoint, params=None, data=None):
+        response = self.request(endpoint, "PUT", params=params, data=data)
+        return self.process_response(response)
+
+    def patch(self, endpoint, params=None, data=None):
+        response = self.request(endpoint, "PATCH", params=params, data=data)
+        return self.process_response(response)
+
+    def delete(self, endpoint, params=None):
+        response = self.request(endpoint, "DELETE", params=params)
+        return self.process_response(response)
+
+    def options(self, endpoint):
+        response = self.request(endpoint, "OPTIONS")
+        return self.process_response(response)
 
     @staticmethod
-    def process_response(response: requests.Response):
+    def process_response(response: "requests.Response"):
         handle_response_error(response)
         return response
 
-    @staticmethod
-    def build_url(endpoint: str):
+    def build_url(self, endpoint: str):
         assert not endpoint.startswith("/") and not endpoint.endswith("/")
-        return f"{UnoletAPI.config.api_url}/{endpoint}/"
+        return f"{self.config.api_url}/{endpoint}/"
+
+
+class _DefaultClientAttribute:
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        return getattr(owner.default, self.name)
+
 
+class UnoletAPI:
+    """
+    The process-wide default client, used by the resource classes imported from
+    `unolet`. Create a `Client` per tenant to talk to several instances.
+    """
+    default: Client = Client()
+    config: APIConfig = _DefaultClientAttribute("config")
+    transport: BaseTransport = _DefaultClientAttribute("transport")
+    projection_param: Optional[str] = _DefaultClientAttribute("projection_param")
+    write_behind = _DefaultClientAttribute("write_behind")
+    cache = _DefaultClientAttribute("cache")
+    timeout: Optional[float] = _DefaultClientAttribute("timeout")
+    hedging = _DefaultClientAttribute("hedging")
+
+    @classmethod
+    def connect(cls, token: str, base_url: str, api_version: str = "v1", transport=None):
+        """
+        Establish a connection to the Unolet API.
+
+        This method configures the connection settings for the Unolet API using
+        the provided token, base URL, and API version.
+
+        Args:
+            `token` (str): The authentication token for accessing the Unolet API.
+            `base_url` (str): The base URL of the Unolet API.
+            `api_version` (str, optional): The version of the Unolet API to use. Defaults to "v1".
+            `transport` (str | BaseTransport, optional): The transport used to send requests,
+                either an instance or one of "requests", "http2" or "memory". The current
+                transport is kept when omitted; "requests" is used if there is none.
+        """
+        cls.default.connect(token, base_url, api_version, transport)
+
+    @classmethod
+    def set_transport(cls, transport=None):
+        cls.default.set_transport(transport)
+
+    @classmethod
+    def get_transport(cls) -> BaseTransport:
+        return cls.default.get_transport()
+
+    @classmethod
+    def set_cache(cls, cache=None):
+        """Set the cache of the default client, see `unolet.cache`. `None` disables it."""
+        cls.default.cache = cache
+
+    @classmethod
+    def set_timeout(cls, timeout: Optional[float] = None):
+        """Set the timeout of every request of the default client, in seconds. `None` disables it."""
+        cls.default.timeout = timeout
+
+    @classmethod
+    def set_hedging(cls, hedging=None):
+        """Hedge the GET requests of the default client, see `unolet.timeouts.Hedging`."""
+        cls.default.hedging = hedging
+
+    @classmethod
+    def resource(cls, name: str) -> type:
+        return getattr(importlib.import_module("unolet"), name)
+
+    @classmethod
+    def get_headers(cls):
+        return cls.default.get_headers()
+
+    @classmethod
+    def request(cls, endpoint, method='GET', params=None, data=None):
+        return cls.default.request(endpoint, method, params=params, data=data)
+
+    @classmethod
+    def request_many(cls, calls: List[tuple], raise_errors: bool = True):
+        return cls.default.request_many(calls, raise_errors)
+
+    @classmethod
+    def get(cls, endpoint, params=None):
+        return cls.default.get(endpoint, params)
+
+    @classmethod
+    def post(cls, endpoint, params=None, data=None):
+        return cls.default.post(endpoint, params, data)
+
+    @classmethod
+    def put(cls, endpoint, params=None, data=None):
+        return cls.default.put(endpoint, params, data)
+
+    @classmethod
+    def patch(cls, endpoint, params=None, data=None):
+        return cls.default.patch(endpoint, params, data)
+
+    @classmethod
+    def delete(cls, endpoint, params=None):
+        return cls.default.delete(endpoint, params)
+
+    @classmethod
+    def options(cls, endpoint):
+        return cls.default.options(endpoint)
+
+    process_response = staticmethod(Client.process_response)
+
+    @classmethod
+    def build_url(cls, endpoint: str):
+        return cls.default.build_url(endpoint)
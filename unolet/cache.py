@@ -0,0 +1,345 @@
+"""
+Caches shared by the workers of a host.
+
+A client with a cache consults it before asking the API for metadata
+(`OPTIONS`) and for resources fetched with `get()`:
+
+    - Metadata is stored as JSON and resources as binary snapshots (see
+      `unolet.snapshot`), under keys that include the API URL, so clients of
+      different tenants can share a cache.
+    - Entries expire after `metadata_ttl` or `ttl` seconds. `models` limits
+      resource caching to some models, e.g. the rarely changing products,
+      warehouses and document types.
+    - Saving or deleting a resource through the client removes its entry.
+      Changes made by other applications are only seen once entries expire.
+
+`SharedCache` keeps entries in a memory-mapped file, so every process on the
+host that opens the same file shares them: the first worker to load a
+product saves the API call for the other fifteen. Its size is fixed when the
+file is created; old entries are overwritten once it is full. It needs `fcntl`
+to lock the file across processes, i.e. POSIX systems.
+
+`LocalCache` keeps entries in the memory of the process. It is also the
+reference implementation of `BaseCache` for other stores: a backend for an
+external store implements `get`, `set`, `delete` and `clear`.
+
+Example:
+    from unolet import Client, Unolet
+    from unolet.cache import SharedCache
+
+    cache = SharedCache("/tmp/unolet.cache", size=64 * 1024 * 1024, models=["Product", "Warehouse"])
+    Unolet.set_cache(cache)
+
+    # or per client
+    client = Client("[TOKEN]", "https://tenant.unolet.app", cache=cache)
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+
+class BaseCache:
+    """
+    Base class of the caches.
+
+    Args:
+        ttl (float): Lifetime of cached resources, in seconds.
+        metadata_ttl (float): Lifetime of cached metadata, in seconds.
+        models (Iterable[str], optional): Names of the models whose resources
+            are cached. All are when omitted.
+    """
+    def __init__(self, ttl: float = 300, metadata_ttl: float = 3600, models: Optional[Iterable[str]] = None):
+        self.ttl = ttl
+        self.metadata_ttl = metadata_ttl
+        self.models = frozenset(models) if models is not None else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store `value` for `ttl` seconds. Returns whether it was stored."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _prefix(model_class) -> Optional[str]:
+        config = model_class._api.config
+        return f"{config.api_url}/{model_class._endpoint}" if config else None
+
+    def caches(self, model_class) -> bool:
+        return self.models is None or model_class.__name__ in self.models
+
+    def load_metadata(self, model_class) -> Optional[Dict]:
+        prefix = self._prefix(model_class)
+        data = self.get(f"{prefix}?options") if prefix else None
+        return json.loads(data) if data is not None else None
+
+    def store_metadata(self, model_class, data: Dict):
+        prefix = self._prefix(model_class)
+        if prefix:
+            self.set(f"{prefix}?options", json.dumps(data, separators=(",", ":")).encode(), self.metadata_ttl)
+
+    def load_resource(self, model_class, id):
+        prefix = self._prefix(model_class)
+        if not prefix or not self.caches(model_class):
+            return None
+        data = self.get(f"{prefix}/{id}")
+        if data is None:
+            return None
+        try:
+            return model_class.from_bytes(data)
+        except ValueError:
+            # Taken with other metadata, e.g. before a schema change.
+            self.delete(f"{prefix}/{id}")
+            return None
+
+    def store_resource(self, resource):
+        prefix = self._prefix(type(resource))
+        if prefix and resource.id is not None and self.caches(type(resource)):
+            self.set(f"{prefix}/{resource.id}", resource.to_bytes(), self.ttl)
+
+    def invalidate(self, resource):
+        prefix = self._prefix(type(resource))
+        if prefix and resource.id is not None:
+            self.delete(f"{prefix}/{resource.id}")
+
+
+class LocalCache(BaseCache):
+    """
+    Cache in the memory of the process, least recently used entries first out.
+
+    Args:
+        max_size (int): Maximum total size of the values, in bytes.
+        **options: `ttl`, `metadata_ttl` and `models`, as for `BaseCache`.
+    """
+    def __init__(self, max_size: int = 64 * 1024 * 1024, **options):
+        super().__init__(**options)
+        self.max_size = max_size
+        self.size = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        if len(value) > self.max_size:
+            return False
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires)
+            self.size += len(value)
+            while self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+_MAGIC = b"UNOC"
+_VERSION = 1
+# magic, version, number of slots, capacity of the data area, write position
+_HEADER = struct.Struct("<4sIIQQ")
+_HEADER_SIZE = 64
+# key hash, absolute position of the record, record length, expiry timestamp
+_SLOT = struct.Struct("<QQI4xd")
+_PROBES = 8
+
+
+def _hash(key: bytes) -> int:
+    import hashlib
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+class SharedCache(BaseCache):
+    """
+    Cache in a memory-mapped file shared by the processes of the host.
+
+    The file holds a hash table of `slots` entries and a ring buffer of `size`
+    bytes for the values. New values are appended to the ring buffer; entries
+    whose bytes have been overwritten are dropped, so the file never grows.
+    Values larger than a quarter of `size` are not cached.
+
+    Every process must open the file with the same `size` and `slots`.
+
+    Args:
+        path (str): The cache file. Created, or reset when its layout differs,
+            on first use.
+        size (int): Size of the data area, in bytes.
+        slots (int): Maximum number of entries.
+        **options: `ttl`, `metadata_ttl` and `models`, as for `BaseCache`.
+    """
+    def __init__(self, path: str, size: int = 64 * 1024 * 1024, slots: int = 65536, **options):
+        super().__init__(**options)
+        self.path = path
+        self.capacity = size
+        self.slots = slots
+        self._slots_offset = _HEADER_SIZE
+        self._data_offset = _HEADER_SIZE + slots * _SLOT.size
+        self._lock = threading.Lock()
+        self._file = None
+        self._mmap = None
+        self._pid = None
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._file.close()
+            self._mmap = self._file = self._pid = None
+
+    def _open(self):
+        # Reopened after a fork, so that workers do not share file locks.
+        if self._pid == os.getpid():
+            return
+        import fcntl
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+        file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600), "r+b")
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            length = self._data_offset + self.capacity
+            file.seek(0)
+            header = file.read(_HEADER.size)
+            expected = (_MAGIC, _VERSION, self.slots, self.capacity)
+            if len(header) < _HEADER.size or _HEADER.unpack(header)[:4] != expected or os.fstat(file.fileno()).st_size != length:
+                file.truncate(0)
+                file.truncate(length)
+                file.seek(0)
+                file.write(_HEADER.pack(*expected, 0))
+                file.flush()
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+        self._file = file
+        self._mmap = mmap.mmap(file.fileno(), length)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        import fcntl
+
+        with self._lock:
+            self._open()
+            fcntl.flock(self._file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield self._mmap
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _head(self, mm) -> int:
+        return _HEADER.unpack_from(mm, 0)[4]
+
+    def _probe(self, key_hash: int):
+        start = key_hash % self.slots
+        for i in range(_PROBES):
+            yield self._slots_offset + (start + i) % self.slots * _SLOT.size
+
+    def _find(self, mm, key: bytes, key_hash: int, head: int, now: float) -> Optional[tuple]:
+        """Return `(slot offset, value)` of the live entry of `key`."""
+        for offset in self._probe(key_hash):
+            slot_hash, position, length, expires = _SLOT.unpack_from(mm, offset)
+            if slot_hash != key_hash or expires <= now or position + self.capacity < head:
+                continue
+            start = self._data_offset + position % self.capacity
+            record = mm[start:start + length]
+            key_length = int.from_bytes(record[:2], "little")
+            if record[2:2 + key_length] == key:
+                return offset, record[2 + key_length:]
+        return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        key = key.encode()
+        with self._locked(exclusive=False) as mm:
+            found = self._find(mm, key, _hash(key), self._head(mm), time.time())
+        return found[1] if found else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        key = key.encode()
+        record = len(key).to_bytes(2, "little") + key + value
+        if len(record) > self.capacity // 4:
+            return False
+        key_hash = _hash(key)
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._locked(exclusive=True) as mm:
+            head = self._head(mm)
+            found = self._find(mm, key, key_hash, head, now)
+            if found:
+                slot = found[0]
+            else:
+                # The first free or dead slot, else the one expiring first.
+                candidates = []
+                for offset in self._probe(key_hash):
+                    slot_hash, position, _, slot_expires = _SLOT.unpack_from(mm, offset)
+                    dead = slot_hash == 0 or slot_expires <= now or position + self.capacity < head
+                    candidates.append((not dead, slot_expires, offset))
+                slot = min(candidates)[2]
+
+            if head % self.capacity + len(record) > self.capacity:
+                # Records do not wrap around the end of the ring buffer.
+                head += self.capacity - head % self.capacity
+            start = self._data_offset + head % self.capacity
+            mm[start:start + len(record)] = record
+            _SLOT.pack_into(mm, slot, key_hash, head, len(record), expires)
+            _HEADER.pack_into(mm, 0, _MAGIC, _VERSION, self.slots, self.capacity, head + len(record))
+        return True
+
+    def delete(self, key: str):
+        key = key.encode()
+        with self._locked(exclusive=True) as mm:
+            found = self._find(mm, key, _hash(key), self._head(mm), time.time())
+            if found:
+                _SLOT.pack_into(mm, found[0], 0, 0, 0, 0.0)
+
+    def clear(self):
+        with self._locked(exclusive=True) as mm:
+            mm[self._slots_offset:self._data_offset] = bytes(self._data_offset - self._slots_offset)
+            _HEADER.pack_into(mm, 0, _MAGIC, _VERSION, self.slots, self.capacity, 0)
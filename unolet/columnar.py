@@ -0,0 +1,283 @@
+"""
+Columnar export of raw API results to NumPy, Arrow and pandas.
+
+Columns are built straight from the JSON records returned by the API, typed
+according to the resource `Metadata.fields`, without creating resource objects:
+
+    - IntegerField: int64.
+    - FloatField: float64.
+    - DecimalField: int64 scaled by `decimal_places` (NumPy) or
+      decimal128(`max_digits`, `decimal_places`) (Arrow).
+    - DateField / DatetimeField: datetime64[D] / datetime64[us]. Timestamps with
+      a UTC offset are converted to UTC.
+    - BooleanField: bool.
+    - Related fields: int64 holding the id of the related object.
+    - Anything else: Python objects (strings for string fields).
+
+NumPy, pyarrow and pandas are optional dependencies, imported on first use.
+
+Example:
+    table = Movement.stream(date="2024-01-31").to_arrow(fields=["product", "quantity", "total"])
+"""
+
+import importlib
+from datetime import timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from unolet.fields import DecimalField, Field, field_kind
+from unolet.utils import related_id, scaled_int, string_to_date
+
+
+def _require(module, extra):
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"Columnar export requires {module.split('.')[0]}: pip install unolet[{extra}]") from e
+
+
+def _scale(field: DecimalField, values: List):
+    """Return the decimal scale of a column, inferred from the data when the metadata has none."""
+    if field.decimal_places is not None:
+        return field.decimal_places
+    scale = 0
+    for value in values:
+        if isinstance(value, str) and "." in value:
+            scale = max(scale, len(value) - value.index(".") - 1)
+    return scale
+
+
+class Column:
+    """
+    A typed column built from raw values.
+
+    Attributes:
+        name (str): Field name.
+        kind (str): One of "integer", "float", "decimal", "date", "datetime",
+            "boolean", "related" or "object".
+        values (numpy.ndarray): Column data. Null slots hold an arbitrary value.
+        mask (numpy.ndarray): Boolean array, `True` where the value is null.
+        scale (int): Decimal scale of "decimal" columns.
+        precision (int): Decimal precision of "decimal" columns.
+        tz (str): "UTC" for datetime columns built from offset-aware strings.
+    """
+    def __init__(self, field: Field, raw: List):
+        np = _require("numpy", "numpy")
+        self.name = field.name
+        self.kind = field_kind(field)
+        self.scale = None
+        self.precision = None
+        self.tz = None
+
+        if self.kind == "related":
+            raw = [related_id(v) for v in raw]
+        self.mask = np.fromiter((v is None for v in raw), dtype=bool, count=len(raw))
+        has_nulls = self.mask.any()
+
+        if self.kind in ("integer", "related"):
+            values = [0 if v is None else int(v) for v in raw] if has_nulls else raw
+            try:
+                self.values = np.array(values, dtype=np.int64)
+            except (TypeError, ValueError, OverflowError):
+                self.kind, self.values = "object", np.array(raw, dtype=object)
+        elif self.kind == "float":
+            self.values = np.array([float("nan") if v is None else float(v) for v in raw], dtype=np.float64)
+        elif self.kind == "boolean":
+            self.values = np.array([bool(v) for v in raw], dtype=bool)
+        elif self.kind == "decimal":
+            self.scale = _scale(field, raw)
+            self.precision = field.max_digits or 38
+            scaled = [0 if v is None else scaled_int(v, self.scale) for v in raw]
+            try:
+                self.values = np.array(scaled, dtype=np.int64)
+            except OverflowError:
+                self.values = np.array(scaled, dtype=object)
+        elif self.kind == "date":
+            self.values = np.array([None if v is None else str(v)[:10] for v in raw], dtype="datetime64[D]")
+        elif self.kind == "datetime":
+            self.values = self._datetimes(np, raw)
+        else:
+            self.values = np.array(raw, dtype=object)
+
+    def _datetimes(self, np, raw):
+        if not any(isinstance(v, str) and (v.endswith("Z") or "+" in v[10:] or "-" in v[10:]) for v in raw):
+            return np.array(raw, dtype="datetime64[us]")
+        self.tz = "UTC"
+        values = []
+        for value in raw:
+            if value is None:
+                values.append(None)
+                continue
+            moment = string_to_date(value)
+            if moment.utcoffset() is not None:
+                moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+            values.append(moment)
+        return np.array(values, dtype="datetime64[us]")
+
+    def rescale(self, scale: int):
+        """Raise the scale of a decimal column, e.g. to match the other pages of a result."""
+        np = _require("numpy", "numpy")
+        factor = 10 ** (scale - self.scale)
+        if self.values.dtype != object and int(np.abs(self.values).max(initial=0)) * factor >= 2 ** 63:
+            self.values = self.values.astype(object)
+        self.values = self.values * factor
+        self.scale = scale
+
+    def to_numpy(self):
+        """Return the column as a NumPy array, masked when it holds nulls of a non-nullable dtype."""
+        np = _require("numpy", "numpy")
+        if self.mask.any() and self.kind in ("integer", "related", "boolean", "decimal"):
+            return np.ma.masked_array(self.values, mask=self.mask)
+        return self.values
+
+    def to_arrow(self):
+        """Return the column as a `pyarrow.Array`."""
+        pa = _require("pyarrow", "arrow")
+        np = _require("numpy", "numpy")
+        mask = self.mask if self.mask.any() else None
+        if self.kind == "decimal":
+            if self.values.dtype == object:
+                values = [None if m else Decimal(v).scaleb(-self.scale) for v, m in zip(self.values, self.mask)]
+                return pa.array(values, type=pa.decimal128(self.precision, self.scale))
+            words = np.empty((len(self.values), 2), dtype=np.int64)
+            words[:, 0] = self.values
+            words[:, 1] = self.values >> 63
+            validity = None
+            if mask is not None:
+                validity = pa.py_buffer(np.packbits(~mask, bitorder="little").tobytes())
+            return pa.Array.from_buffers(
+                pa.decimal128(self.precision, self.scale),
+                len(words),
+                [validity, pa.py_buffer(words.tobytes())],
+                null_count=int(self.mask.sum()),
+            )
+        if self.kind == "object":
+            return pa.array(self.values.tolist())
+        array = pa.array(self.values, mask=mask)
+        if self.tz:
+            array = array.cast(pa.timestamp("us", tz=self.tz))
+        return array
+
+
+def _select_fields(metadata, fields: Optional[Iterable[str]]) -> List[Field]:
+    if fields is None:
+        return list(metadata.fields.values())
+    unknown = [name for name in fields if name not in metadata.fields]
+    if unknown:
+        raise ValueError(f"Unknown fields for {metadata.name or 'resource'}: {', '.join(unknown)}")
+    return [metadata.fields[name] for name in fields]
+
+
+def build_columns(metadata, rows: List[Dict], fields: Optional[Iterable[str]] = None) -> List[Column]:
+    """
+    Build typed columns from raw records.
+
+    Args:
+        metadata (Metadata): Metadata of the resource the records belong to.
+        rows (List[dict]): Raw records, as returned by the API.
+        fields (Iterable[str], optional): Fields to export. Defaults to all.
+
+    Returns:
+        List[Column]: One column per field.
+    """
+    return [Column(field, [row.get(field.name) for row in rows]) for field in _select_fields(metadata, fields)]
+
+
+def _align_scales(chunks: List[List[Column]]):
+    """Give the decimal columns of every page the largest scale inferred among them."""
+    for columns in zip(*chunks):
+        if columns[0].kind != "decimal":
+            continue
+        scale = max(column.scale for column in columns)
+        for column in columns:
+            if column.scale < scale:
+                column.rescale(scale)
+
+
+def to_numpy(metadata, pages: Iterable[List[Dict]], fields: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Convert pages of raw records to a dict of NumPy arrays keyed by field name.
+
+    Decimal columns hold integers scaled by the field `decimal_places`.
+    """
+    np = _require("numpy", "numpy")
+    chunks = [build_columns(metadata, rows, fields) for rows in pages]
+    names = [field.name for field in _select_fields(metadata, fields)]
+    if not chunks:
+        return {name: np.array([]) for name in names}
+    _align_scales(chunks)
+
+    result = {}
+    for index, name in enumerate(names):
+        arrays = [chunk[index].to_numpy() for chunk in chunks]
+        if len(arrays) == 1:
+            result[name] = arrays[0]
+        elif any(isinstance(a, np.ma.MaskedArray) for a in arrays):
+            result[name] = np.ma.concatenate(arrays)
+        else:
+            result[name] = np.concatenate(arrays)
+    return result
+
+
+def to_arrow(metadata, pages: Iterable[List[Dict]], fields: Optional[Iterable[str]] = None):
+    """Convert pages of raw records to a `pyarrow.Table`."""
+    pa = _require("pyarrow", "arrow")
+    chunks = [build_columns(metadata, rows, fields) for rows in pages]
+    _align_scales(chunks)
+    tables = [pa.table({column.name: column.to_arrow() for column in columns}) for columns in chunks]
+    if not tables:
+        return pa.table({column.name: column.to_arrow() for column in build_columns(metadata, [], fields)})
+    if len(tables) == 1:
+        return tables[0]
+
+    # Pages with offset-aware timestamps produce UTC columns; naive pages of
+    # the same column are taken as UTC too so that the schemas line up.
+    schema = tables[0].schema
+    for table in tables[1:]:
+        for index, field in enumerate(table.schema):
+            if pa.types.is_timestamp(field.type) and field.type.tz:
+                schema = schema.set(index, field)
+    return pa.concat_tables([table.cast(schema) for table in tables])
+
+
+def to_pandas(metadata, pages: Iterable[List[Dict]], fields: Optional[Iterable[str]] = None):
+    """
+    Convert pages of raw records to a `pandas.DataFrame`.
+
+    With pyarrow installed the frame uses Arrow-backed dtypes, so decimals stay
+    exact as decimal128. Otherwise it is built from the NumPy columns.
+    """
+    pd = _require("pandas", "pandas")
+    try:
+        importlib.import_module("pyarrow")
+    except ImportError:
+        columns = to_numpy(metadata, pages, fields)
+        return pd.DataFrame({name: (values.filled() if hasattr(values, "filled") else values) for name, values in columns.items()})
+    return to_arrow(metadata, pages, fields).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+class ColumnarMixin:
+    """
+    Adds `to_numpy()`, `to_arrow()` and `to_pandas()` to result containers.
+
+    Subclasses provide `model_class` and `_raw_pages()`, an iterable of lists of
+    raw records.
+    """
+    def _raw_pages(self):
+        raise NotImplementedError
+
+    def _columnar_metadata(self):
+        self.model_class._initialize_metadata()
+        return self.model_class._metadata
+
+    def to_numpy(self, fields: Optional[Iterable[str]] = None) -> Dict:
+        """Return the results as a dict of NumPy arrays. See `unolet.columnar.to_numpy`."""
+        return to_numpy(self._columnar_metadata(), self._raw_pages(), fields)
+
+    def to_arrow(self, fields: Optional[Iterable[str]] = None):
+        """Return the results as a `pyarrow.Table`. See `unolet.columnar.to_arrow`."""
+        return to_arrow(self._columnar_metadata(), self._raw_pages(), fields)
+
+    def to_pandas(self, fields: Optional[Iterable[str]] = None):
+        """Return the results as a `pandas.DataFrame`. See `unolet.columnar.to_pandas`."""
+        return to_pandas(self._columnar_metadata(), self._raw_pages(), fields)
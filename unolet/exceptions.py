@@ -1,4 +1,7 @@
-import requests
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
 
 
 NON_FIELD_ERRORS = "non_field_errors"
@@ -18,7 +21,7 @@ class APIError(UnoletError):
         errors -- errors returned by the API
         response -- the HTTP response object
     """
-    def __init__(self, message=None, errors=None, response: requests.Response = None):
+    def __init__(self, message=None, errors=None, response: "requests.Response" = None):
         self.response = response
         self.errors = errors or {}
         self.status_code = response.status_code if response else None
@@ -39,6 +42,16 @@ class ObjectDoesNotExist(APIError):
     pass
 
 
+class Timeout(UnoletError, TimeoutError):
+    """Exception raised when a request times out or a deadline has passed."""
+    pass
+
+
+class MultipleObjectsReturned(UnoletError):
+    """Exception raised when a lookup expected one object but matched several."""
+    pass
+
+
 class NotFound(ObjectDoesNotExist):
     """Exception raised when a requested resource is not found."""
     pass
@@ -72,36 +85,40 @@ class UnexpectedResponseCodeError(APIError):
         expected_code -- the expected HTTP status code
         received_code -- the received HTTP status code
     """
-    def __init__(self, expected_code, received_code, response: requests.Response = None):
+    def __init__(self, expected_code, received_code, response: "requests.Response" = None):
         self.expected_code = expected_code
         self.received_code = received_code
         message = f"Expected response code {expected_code}, but received {received_code}"
         super().__init__(message=message, response=response)
 
 
-def handle_response_error(response: requests.Response, expected_response_code: int = None):
+def handle_response_error(response: "requests.Response", expected_response_code: int = None):
     """
     Handle errors from the API response.
 
     Raises an appropriate error based on the response status code.
     """
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as e:
+    if not response.ok:
+        # Imported here: successful responses, the common case, do not need it.
+        import requests
+
         try:
-            errors = response.json()
-        except ValueError:
-            # If response is not a valid JSON, raise the original error
-            raise e
-
-        if response.status_code == 400:
-            raise ValidationError(errors=errors, response=response)
-        elif response.status_code == 404:
-            raise NotFound(errors=errors, response=response)
-        elif response.status_code == 500:
-            raise APIError(errors=errors, response=response)
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            try:
+                errors = response.json()
+            except ValueError:
+                # If response is not a valid JSON, raise the original error
+                raise e
+
+            if response.status_code == 400:
+                raise ValidationError(errors=errors, response=response)
+            elif response.status_code == 404:
+                raise NotFound(errors=errors, response=response)
+            elif response.status_code == 500:
+                raise APIError(errors=errors, response=response)
 
-        raise APIError(errors=errors, response=response)
+            raise APIError(errors=errors, response=response)
 
     if expected_response_code and expected_response_code != response.status_code:
         raise UnexpectedResponseCodeError(
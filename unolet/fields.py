@@ -100,23 +100,27 @@ class Field:
                 raise ValueError(f"expected an {expected_type.__name__}, but received {type(value).__name__} = {value}")
         return value
 
-    def parse_value(self, value):
+    def parse_value(self, value, api=None):
         """
         Parse the value to the appropriate type.
 
         Args:
             value: The value to be parsed.
+            api (Client, optional): Client that related resources are bound to.
 
         Returns:
             The parsed value.
         """
         value = self.validate_value(value)
         if self.is_related and isinstance(value, dict) and 'id' in value:
-            module = importlib.import_module("unolet")
-            model_class = getattr(module, self.related_model)
+            if api is not None:
+                model_class = api.resource(self.related_model)
+            else:
+                module = importlib.import_module("unolet")
+                model_class = getattr(module, self.related_model)
             value = model_class(**value)
         elif isinstance(value, list):
-            value = [self.parse_value(e) for e in value]
+            value = [self.parse_value(e, api) for e in value]
         elif isinstance(value, str):
             try:
                 value = string_to_date(value)
@@ -291,6 +295,32 @@ class Undefined:
         return not isinstance(other, Undefined) and other is not None
 
 
+def field_kind(field: Field) -> str:
+    """
+    Return the kind of value a field holds, for storage and export.
+
+    Args:
+        field (Field): The field.
+
+    Returns:
+        str: One of "related", "decimal", "float", "integer", "datetime",
+        "date", "boolean" or "object".
+    """
+    if isinstance(field, RelatedField) or field.is_related:
+        return "related"
+    for field_class, kind in (
+        (DecimalField, "decimal"),
+        (FloatField, "float"),
+        (IntegerField, "integer"),
+        (DatetimeField, "datetime"),
+        (DateField, "date"),
+        (BooleanField, "boolean"),
+    ):
+        if isinstance(field, field_class):
+            return kind
+    return "object"
+
+
 field_mapping: Dict[str, Field] = {
     FIELD: Field,
     INTEGER: IntegerField,
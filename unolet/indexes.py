@@ -0,0 +1,316 @@
+"""
+Client-side secondary indexes over loaded resources.
+
+`IndexedCollection` holds resources that are already in memory, e.g. a product
+catalog loaded with `Product.stream()`, and answers lookups from hash and
+sorted indexes instead of scanning the list or calling the API again:
+
+    - Hash indexes answer equality and `__in` lookups and `group_by` in O(1)
+      per key.
+    - Sorted indexes also answer range lookups (`__gt`, `__gte`, `__lt`,
+      `__lte`) in O(log n).
+
+Fields without an index can still be filtered on, by scanning. Related fields
+are indexed by the id of the related object.
+
+The collection observes its resources: after `save()` their index entries are
+updated, and after `delete()` they are dropped. Call `reindex(resource)` after
+changing a resource without saving it.
+
+Example:
+    from unolet import Product
+    from unolet.indexes import IndexedCollection
+
+    catalog = IndexedCollection(Product.stream(), indexes={"code": "hash", "barcode": "hash", "price": "sorted"})
+    product = catalog.get_by(barcode="7460000000022")
+    cheap = catalog.filter(category="Drinks", price__lt=50)
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from unolet.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from unolet.fields import Undefined
+from unolet.models import BaseResource
+
+
+HASH = "hash"
+SORTED = "sorted"
+
+RANGE_LOOKUPS = ("gt", "gte", "lt", "lte")
+LOOKUPS = ("exact", "in", "isnull") + RANGE_LOOKUPS
+
+
+def index_key(value):
+    """Return the value used as index key: related resources by id, undefined as `None`."""
+    if isinstance(value, BaseResource):
+        return value.id
+    if value is Undefined or isinstance(value, Undefined):
+        return None
+    return value
+
+
+class HashIndex:
+    """Equality index: key -> resources, in insertion order."""
+    kind = HASH
+
+    def __init__(self, field: str):
+        self.field = field
+        self.buckets: Dict = defaultdict(dict)
+
+    def add(self, key, resource):
+        self.buckets[key][id(resource)] = resource
+
+    def remove(self, key, resource):
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.pop(id(resource), None)
+            if not bucket:
+                del self.buckets[key]
+
+    def lookup(self, lookup, value) -> Optional[List]:
+        if lookup == "exact":
+            return list(self.buckets.get(index_key(value), {}).values())
+        if lookup == "in":
+            return [r for v in value for r in self.buckets.get(index_key(v), {}).values()]
+        if lookup == "isnull" and value:
+            return list(self.buckets.get(None, {}).values())
+        return None
+
+    def groups(self) -> Dict:
+        return {key: list(bucket.values()) for key, bucket in self.buckets.items()}
+
+
+class SortedIndex(HashIndex):
+    """
+    Ordered index: supports equality and range lookups.
+
+    Null keys are kept in the hash buckets only, since they do not order
+    against other values.
+    """
+    kind = SORTED
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.keys = []
+
+    def add(self, key, resource):
+        if key is not None and key not in self.buckets:
+            self.keys.insert(bisect_left(self.keys, key), key)
+        super().add(key, resource)
+
+    def remove(self, key, resource):
+        super().remove(key, resource)
+        if key is not None and key not in self.buckets:
+            position = bisect_left(self.keys, key)
+            if position < len(self.keys) and self.keys[position] == key:
+                del self.keys[position]
+
+    def range(self, low=None, high=None, include_low=True, include_high=True) -> List:
+        start = 0 if low is None else (bisect_left if include_low else bisect_right)(self.keys, low)
+        stop = len(self.keys) if high is None else (bisect_right if include_high else bisect_left)(self.keys, high)
+        return [r for key in self.keys[start:stop] for r in self.buckets[key].values()]
+
+    def lookup(self, lookup, value) -> Optional[List]:
+        if lookup in RANGE_LOOKUPS:
+            value = index_key(value)
+            if lookup == "gt":
+                return self.range(low=value, include_low=False)
+            if lookup == "gte":
+                return self.range(low=value)
+            if lookup == "lt":
+                return self.range(high=value, include_high=False)
+            return self.range(high=value)
+        return super().lookup(lookup, value)
+
+
+INDEX_CLASSES = {HASH: HashIndex, SORTED: SortedIndex}
+
+
+def _matches(value, lookup, expected):
+    value = index_key(value)
+    if lookup == "exact":
+        return value == index_key(expected)
+    if lookup == "in":
+        return value in {index_key(v) for v in expected}
+    if lookup == "isnull":
+        return (value is None) == bool(expected)
+    if value is None:
+        return False
+    expected = index_key(expected)
+    if lookup == "gt":
+        return value > expected
+    if lookup == "gte":
+        return value >= expected
+    if lookup == "lt":
+        return value < expected
+    return value <= expected
+
+
+class IndexedCollection:
+    """
+    In-memory collection of resources with secondary indexes.
+
+    Args:
+        resources (Iterable[BaseResource]): Initial resources, e.g. a
+            `ResourceList`, a `Pagination` or a `ResourceStream`.
+        indexes (dict | Iterable[str], optional): Fields to index, as
+            `{field: "hash" | "sorted"}` or a list of fields for hash indexes.
+    """
+    def __init__(self, resources: Iterable[BaseResource] = (), indexes=None):
+        self.resources: Dict[int, BaseResource] = {}
+        self.indexes: Dict[str, HashIndex] = {}
+        self._keys: Dict[int, Dict] = {}
+        if isinstance(indexes, dict):
+            for field, kind in indexes.items():
+                self.add_index(field, kind)
+        else:
+            for field in indexes or ():
+                self.add_index(field)
+        self.extend(resources)
+
+    def __repr__(self):
+        return f"<IndexedCollection({len(self)} resources, indexes={sorted(self.indexes)})>"
+
+    def __len__(self):
+        return len(self.resources)
+
+    def __iter__(self):
+        return iter(list(self.resources.values()))
+
+    def __contains__(self, resource):
+        return id(resource) in self.resources
+
+    def add_index(self, field: str, kind: str = HASH):
+        """
+        Index `field`, building the index from the current resources.
+
+        Args:
+            field (str): Field name.
+            kind (str): "hash" or "sorted".
+        """
+        if kind not in INDEX_CLASSES:
+            raise ValueError(f"Unknown index kind {kind!r}, expected one of {sorted(INDEX_CLASSES)}")
+        index = INDEX_CLASSES[kind](field)
+        for key, resource in self.resources.items():
+            value = index_key(getattr(resource, field, None))
+            self._keys[key][field] = value
+            index.add(value, resource)
+        self.indexes[field] = index
+
+    def add(self, resource: BaseResource):
+        """Add a resource, or reindex it if it is already in the collection."""
+        if id(resource) in self.resources:
+            return self.reindex(resource)
+        self.resources[id(resource)] = resource
+        keys = self._keys[id(resource)] = {}
+        for field, index in self.indexes.items():
+            keys[field] = index_key(getattr(resource, field, None))
+            index.add(keys[field], resource)
+        resource._observe(self)
+
+    def extend(self, resources: Iterable[BaseResource]):
+        for resource in resources:
+            self.add(resource)
+
+    def discard(self, resource: BaseResource):
+        """Remove a resource if it is in the collection."""
+        if self.resources.pop(id(resource), None) is None:
+            return
+        for field, key in self._keys.pop(id(resource)).items():
+            self.indexes[field].remove(key, resource)
+        resource._unobserve(self)
+
+    def reindex(self, resource: BaseResource):
+        """Update the index entries of `resource` after it changed."""
+        keys = self._keys.get(id(resource))
+        if keys is None:
+            return
+        for field, index in self.indexes.items():
+            value = index_key(getattr(resource, field, None))
+            if keys[field] != value:
+                index.remove(keys[field], resource)
+                index.add(value, resource)
+                keys[field] = value
+
+    def resource_saved(self, resource):
+        self.reindex(resource)
+
+    def resource_deleted(self, resource):
+        self.discard(resource)
+
+    def _parse(self, lookups: Dict):
+        parsed = []
+        for key, value in lookups.items():
+            field, _, lookup = key.partition("__")
+            lookup = lookup or "exact"
+            if lookup not in LOOKUPS:
+                raise ValueError(f"Unsupported lookup {lookup!r}, expected one of {sorted(LOOKUPS)}")
+            parsed.append((field, lookup, value))
+        return parsed
+
+    def filter(self, **lookups) -> List[BaseResource]:
+        """
+        Return the resources matching every lookup.
+
+        The most selective indexed lookup provides the candidates; the other
+        lookups are checked on those candidates only.
+
+        Args:
+            **lookups: e.g. `code="A1"`, `price__lt=10`, `category__in=[...]`.
+        """
+        indexed, pending = [], []
+        for field, lookup, value in self._parse(lookups):
+            index = self.indexes.get(field)
+            found = index.lookup(lookup, value) if index is not None else None
+            if found is None:
+                pending.append((field, lookup, value))
+            else:
+                indexed.append((found, (field, lookup, value)))
+
+        if indexed:
+            indexed.sort(key=lambda item: len(item[0]))
+            candidates = indexed[0][0]
+            pending.extend(condition for _, condition in indexed[1:])
+        else:
+            candidates = list(self.resources.values())
+        return [
+            resource for resource in candidates
+            if all(_matches(getattr(resource, field, None), lookup, value) for field, lookup, value in pending)
+        ]
+
+    def get_by(self, **lookups) -> BaseResource:
+        """
+        Return the single resource matching `lookups`.
+
+        Raises:
+            ObjectDoesNotExist: No resource matches.
+            MultipleObjectsReturned: Several resources match.
+        """
+        results = self.filter(**lookups)
+        if not results:
+            raise ObjectDoesNotExist(f"No resource matches {lookups}")
+        if len(results) > 1:
+            raise MultipleObjectsReturned(f"{len(results)} resources match {lookups}")
+        return results[0]
+
+    def range(self, field: str, low=None, high=None, include_low=True, include_high=False) -> List[BaseResource]:
+        """
+        Return the resources whose `field` lies between `low` and `high`, in
+        ascending order. `field` must have a sorted index.
+        """
+        index = self.indexes.get(field)
+        if not isinstance(index, SortedIndex):
+            raise ValueError(f"Field {field!r} has no sorted index")
+        return index.range(index_key(low), index_key(high), include_low, include_high)
+
+    def group_by(self, field: str) -> Dict:
+        """Return `{key: [resources]}` for the values of `field`."""
+        index = self.indexes.get(field)
+        if index is not None:
+            return index.groups()
+        groups = defaultdict(list)
+        for resource in self.resources.values():
+            groups[index_key(getattr(resource, field, None))].append(resource)
+        return dict(groups)
@@ -1,14 +1,20 @@
-from datetime import date, datetime
-from decimal import Decimal
+import json
 from functools import cached_property
 from types import SimpleNamespace
-from collections import defaultdict
-from typing import Dict, List, Optional
+from weakref import WeakSet
+from typing import Dict, Iterable, List, Optional
 from urllib.parse import urlparse, parse_qs
 
+from unolet.aggregation import Aggregator
 from unolet.api import UnoletAPI
+from unolet.columnar import ColumnarMixin
+from unolet.parallel import ParallelMixin
+from unolet.prefetch import prefetch_lookups, prefetch_related
+from unolet.serializers import Serializer, encode
+from unolet.snapshot import LIST, PAGINATION, RESOURCE, dumps, loads, snapshot_fields
+from unolet.timeouts import Deadline, deadline
 from unolet.utils import is_string_decimal, string_to_date
-from unolet.exceptions import ObjectDoesNotExist, ValidationError
+from unolet.exceptions import ObjectDoesNotExist
 from unolet.fields import RELATED, Field, Undefined, field_mapping
 
 
@@ -28,6 +34,8 @@ class State:
         self.changes = {}
         self.adding = False
         self.original_data = original_data or {}
+        # Names of the loaded fields of a sparse resource, `None` when all are.
+        self.loaded = None
 
 
 class Metadata:
@@ -38,6 +46,7 @@ class Metadata:
         Args:
             data (dict): Data to initialize metadata.
         """
+        self.data = data
         self.name = data.get("name", "")
         self.description = data.get("description", "")
         self.actions = data.get("actions", {})
@@ -52,6 +61,23 @@ class Metadata:
             field = field_class(field_name, **field_data)
             self.fields[field_name] = field
 
+    @cached_property
+    def serializer(self) -> Serializer:
+        """The serializer of the model, compiled on first use."""
+        return Serializer(self)
+
+    @cached_property
+    def schema_key(self) -> str:
+        """A hash of the metadata, identifying the schema of the model."""
+        import hashlib
+        payload = json.dumps(self.data, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    @cached_property
+    def snapshot_fields(self) -> List[tuple]:
+        """The fields in the order of snapshot rows, with their codecs."""
+        return snapshot_fields(self)
+
     def __str__(self):
         return f"Metadata: {self.name}"
 
@@ -61,6 +87,7 @@ class Metadata:
 
 class BaseResource(SimpleNamespace, metaclass=ResourceMeta):
     _endpoint = None
+    _api = UnoletAPI
 
     def __init__(self, **kwargs):
         self._initialize_metadata()
@@ -72,6 +99,15 @@ class BaseResource(SimpleNamespace, metaclass=ResourceMeta):
             self._state.adding = True
         super().__init__(**initial_data)
 
+    def __getattr__(self, name):
+        # Only reached for attributes missing from __dict__, i.e. the unloaded
+        # fields of a sparse resource, which are fetched on first access.
+        state = self.__dict__.get("_state")
+        if state is None or state.loaded is None or name.startswith("_") or name not in self._metadata.fields:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        self._load_deferred()
+        return self.__dict__[name]
+
     def __setattr__(self, key, value):
         if key in self.__dict__ and self.__dict__[key] != value:
             self._state.changes[key] = value
@@ -96,17 +132,100 @@ class BaseResource(SimpleNamespace, metaclass=ResourceMeta):
     @classmethod
     def _initialize_metadata(cls):
         if cls._metadata is None:
-            response = UnoletAPI.options(cls._endpoint)
+            cache = cls._api.cache
+            data = cache.load_metadata(cls) if cache is not None else None
+            if data is not None:
+                cls._metadata = Metadata(data)
+                return
+            response = cls._api.options(cls._endpoint)
             if response.status_code == 200:
                 cls._metadata = Metadata(response.json())
+                if cache is not None:
+                    cache.store_metadata(cls, cls._metadata.data)
             else:
                 cls._metadata = Metadata({})
 
+    @classmethod
+    def _from_parsed(cls, values: Dict):
+        """
+        Build a resource from field values already parsed by
+        `Field.parse_value`, e.g. in `unolet.parallel`. Related fields may
+        still be raw.
+        """
+        cls._initialize_metadata()
+        instance = cls.__new__(cls)
+        data = {}
+        for field_name, field in cls._metadata.fields.items():
+            value = values.get(field_name, Undefined)
+            if field.is_related:
+                value = field.parse_value(value, cls._api)
+            data[field_name] = value
+        state = State(values)
+        if data.get("id") is Undefined:
+            data["id"] = None
+            state.adding = True
+        instance.__dict__["_state"] = state
+        instance.__dict__.update(data)
+        return instance
+
+    @classmethod
+    def _projection(cls, fields) -> List[str]:
+        """Validate a list (or comma separated string) of field names, adding `id`."""
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        cls._initialize_metadata()
+        unknown = [name for name in fields if name not in cls._metadata.fields]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown} for {cls.__name__}")
+        return ["id"] + [name for name in dict.fromkeys(fields) if name != "id"]
+
+    @classmethod
+    def _projection_params(cls, params: Dict, fields: Optional[List[str]]) -> Dict:
+        if fields is None or not cls._api.projection_param:
+            return params
+        return {**params, cls._api.projection_param: ",".join(fields)}
+
+    @classmethod
+    def _build(cls, data: Dict, fields: Optional[List[str]] = None):
+        """Build a resource from API data, sparse when `fields` is given."""
+        if fields is None:
+            return cls(**data)
+        instance = cls.__new__(cls)
+        state = State(data)
+        state.loaded = frozenset(fields)
+        values = {
+            name: cls._metadata.fields[name].parse_value(data.get(name, Undefined), cls._api)
+            for name in fields
+        }
+        if values["id"] is Undefined:
+            values["id"] = None
+            state.adding = True
+        instance.__dict__["_state"] = state
+        instance.__dict__.update(values)
+        return instance
+
+    def _load_deferred(self):
+        """Fetch the fields of a sparse resource that were not loaded."""
+        missing = [name for name in self._metadata.fields if name not in self.__dict__]
+        if self.id is None:
+            raise AttributeError(f"Cannot load {missing} of an unsaved {self.__class__.__name__}")
+        loaded = self.get(self.id, fields=missing)
+        for name in missing:
+            self.__dict__[name] = loaded.__dict__[name]
+        self._state.loaded = None
+
+    @property
+    def _loaded_fields(self) -> frozenset:
+        """Names of the fields loaded in this resource."""
+        if self._state.loaded is None:
+            return frozenset(self._metadata.fields)
+        return self._state.loaded
+
     def _get_initial_data(self, data):
         initial_data = {}
         for field_name, field in self._metadata.fields.items():
             value = data.get(field_name, Undefined)
-            initial_data[field_name] = field.parse_value(value)
+            initial_data[field_name] = field.parse_value(value, self._api)
         return initial_data
 
     def _update_from_data(self, data):
@@ -114,49 +233,83 @@ class BaseResource(SimpleNamespace, metaclass=ResourceMeta):
 
     def _refresh_from_api(self):
         assert self.id
+        if self._api.cache is not None:
+            self._api.cache.invalidate(self)
         instance = self.get(self.id)
         self._update_from_data(instance.as_dict())
 
-    def _validate_data(self, data):
-        validated_data = {}
-        errors = defaultdict(list)
+    def _validate_data(self, data, partial=False):
+        return self._metadata.serializer.validate(data, partial)
 
-        for field_name, field in self._metadata.fields.items():
-            value = data.get(field_name, Undefined)
+    def save(self):
+        write_behind = getattr(self._api, "write_behind", None)
+        if write_behind is not None:
+            # Queued: see `unolet.services.write_behind.WriteBehindQueue.attach`.
+            write_behind.save(self)
+            return self
+        body = self._save_body()
+        if self._state.adding:
+            response = self.create(body)
+        else:
+            response = self.update(body)
+        self._saved(response)
+        return self
 
-            if field.read_only:
-                continue
+    def _save_body(self) -> bytes:
+        """Validate the resource and return the encoded body of its save request."""
+        validated_data = self._validate_data(self.__dict__, partial=self._state.loaded is not None and not self._state.adding)
+        return encode(validated_data)
 
-            if field.required and value is Undefined:
-                errors[field_name].append(f"This field is required.")
-                continue
+    def _saved(self, response):
+        """Update the resource from the response of its save request."""
+        data = response.json()
+        self._update_from_data(data)
+        if self._api.cache is not None:
+            self._api.cache.invalidate(self)
+        self._notify("saved")
 
-            if value is not Undefined:
-                try:
-                    validated_value = field.serialize(value)
-                    validated_data[field_name] = validated_value
-                except ValueError as e:
-                    errors[field_name].append(f"Invalid type for this field: {e}")
+    def _observe(self, observer):
+        """
+        Register `observer` to be told about saves and deletes of this resource.
 
-        if errors:
-            raise ValidationError(dict(errors))
+        Observers are held weakly and must define `resource_saved(resource)` and
+        `resource_deleted(resource)`.
+        """
+        self.__dict__.setdefault("_observers", WeakSet()).add(observer)
 
-        return validated_data
+    def _unobserve(self, observer):
+        self.__dict__.get("_observers", WeakSet()).discard(observer)
 
-    def save(self):
-        data = {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
-        validated_data = self._validate_data(data)
-        if self._state.adding:
-            response = self.create(validated_data)
-        else:
-            response = self.update(validated_data)
-        data = response.json()
-        self._update_from_data(data)
-        return self
+    def _notify(self, event):
+        for observer in list(self.__dict__.get("_observers", ())):
+            getattr(observer, f"resource_{event}")(self)
 
     @classmethod
-    def find(cls, **params):
-        response = UnoletAPI.get(cls._endpoint, params)
+    def find(cls, fields=None, prefetch=None, timeout=None, **params):
+        """
+        Query the resources.
+
+        Args:
+            fields (List[str], optional): Load only these fields (and `id`).
+                The others are fetched on first access.
+            prefetch (List[str], optional): Related fields to load for the
+                whole page in batched requests, e.g. `["person", "warehouse"]`.
+                See `unolet.prefetch`.
+            timeout (float, optional): Deadline in seconds for the query and
+                the pages reached from it with `next()` and `previous()`. See
+                `unolet.timeouts`.
+            **params: Query parameters, e.g. filters, `page` and `page_size`.
+
+        Returns:
+            Pagination | ResourceList: The results.
+        """
+        if fields is not None:
+            fields = cls._projection(fields)
+        if prefetch is not None:
+            prefetch_lookups(cls, prefetch)
+        limit = Deadline.after(timeout)
+        with deadline(limit):
+            response = cls._api.get(cls._endpoint, cls._projection_params(params, fields))
         data = response.json()
         if "count" in data:
             return Pagination(
@@ -164,39 +317,107 @@ class BaseResource(SimpleNamespace, metaclass=ResourceMeta):
                 count=data["count"],
                 next_url=data["next"],
                 previous_url=data["previous"],
-                results=data["results"]
+                results=data["results"],
+                fields=fields,
+                prefetch=prefetch,
+                deadline=limit,
             )
         elif "results" in data:
-            return ResourceList(model_class=cls, items=data)
+            return ResourceList(model_class=cls, items=data["results"], fields=fields, prefetch=prefetch, deadline=limit)
         raise NotImplemented()
 
     @classmethod
-    def get(cls, id):
-        response = UnoletAPI.get(f"{cls._endpoint}/{id}")
+    def stream(cls, fields=None, prefetch=None, timeout=None, **params):
+        """
+        Lazily iterate over every result of a query, following the pages.
+
+        Args:
+            fields (List[str], optional): Load only these fields, as for `find`.
+            prefetch (List[str], optional): Related fields to load page by
+                page, as for `find`.
+            timeout (float, optional): Deadline in seconds for every page of
+                the query, counted from the first request.
+            **params: Query parameters, as for `find`.
+
+        Returns:
+            ResourceStream: An iterable of resources that also offers the raw
+            pages and columnar export.
+        """
+        if fields is not None:
+            fields = cls._projection(fields)
+        if prefetch is not None:
+            prefetch_lookups(cls, prefetch)
+        return ResourceStream(model_class=cls, params=params, fields=fields, prefetch=prefetch, timeout=timeout)
+
+    @classmethod
+    def aggregate(cls, group_by=(), sums=(), **params):
+        """
+        Group the results of a query and sum numeric fields, page by page.
+
+        Resources are not built; memory grows with the number of groups only.
+        Decimal sums are exact.
+
+        Args:
+            group_by (Iterable[str]): Fields to group by. Related fields group
+                by id; date fields accept `__date`, `__month` and `__year`.
+            sums (Iterable[str]): Numeric fields to sum.
+            **params: Query parameters and `timeout`, as for `stream`.
+
+        Returns:
+            List[dict]: One dict per group with the group fields, the sums and
+            a `count` of rows, sorted by group.
+        """
+        cls._initialize_metadata()
+        aggregator = Aggregator(cls._metadata, group_by=group_by, sums=sums)
+        return aggregator.consume(cls.stream(**params).pages()).result()
+
+    @classmethod
+    def get(cls, id, fields=None, timeout=None):
+        """
+        Get a resource by id.
+
+        Args:
+            id: The id of the resource.
+            fields (List[str], optional): Load only these fields, as for `find`.
+            timeout (float, optional): Deadline in seconds. See `unolet.timeouts`.
+        """
+        cache = cls._api.cache if fields is None else None
+        if cache is not None:
+            cached = cache.load_resource(cls, id)
+            if cached is not None:
+                return cached
+        if fields is not None:
+            fields = cls._projection(fields)
+        with deadline(timeout):
+            response = cls._api.get(f"{cls._endpoint}/{id}", cls._projection_params({}, fields) or None)
 
         if response.status_code == 404:
             raise ObjectDoesNotExist(response)
 
         data = response.json()
-        return cls(**data)
+        instance = cls._build(data, fields)
+        if cache is not None:
+            cache.store_resource(instance)
+        return instance
 
     @classmethod
     def create(cls, data):
-        response = UnoletAPI.post(cls._endpoint, data=data)
+        response = cls._api.post(cls._endpoint, data=data)
         return response
 
     def delete(self):
-        response = UnoletAPI.delete(f"{self._endpoint}/{self.id}")
-        return response.status_code == 204
-
-    def update(self):
+        response = self._api.delete(f"{self._endpoint}/{self.id}")
+        deleted = response.status_code == 204
+        if deleted:
+            if self._api.cache is not None:
+                self._api.cache.invalidate(self)
+            self._notify("deleted")
+        return deleted
+
+    def update(self, data):
         assert self.id
-        if self._state.changes:
-            data = self._state.changes
-            data = {k: self._serialize(v) for k, v in data.items()}
-            response = UnoletAPI.patch(f"{self._endpoint}/{self.id}", data=data)
-            updated_data = response.json()
-            self._update_from_data(updated_data)
+        response = self._api.patch(f"{self._endpoint}/{self.id}", data=data)
+        return response
 
     def exists(self):
         assert self.id
@@ -209,55 +430,102 @@ class BaseResource(SimpleNamespace, metaclass=ResourceMeta):
         return True
 
     def _serialize(self):
-        serialized_data = {}
-        for field_name, field in self._metadata.fields.items():
-            value = getattr(self, field_name, None)
-            if value is not None:
-                if field.internal_type == Decimal:
-                    serialized_data[field_name] = str(value)
-                elif field.internal_type in [datetime, date]:
-                    serialized_data[field_name] = value.isoformat()
-                else:
-                    serialized_data[field_name] = value
-        return serialized_data
+        return self._metadata.serializer.represent(self.__dict__)
 
     def _deserialize(self, data):
-        deserialized_data = {}
-        for field_name, field in self._metadata.fields.items():
-            value = data.get(field_name, None)
-            if value is not None:
-                if field.internal_type == Decimal:
-                    deserialized_data[field_name] = Decimal(value)
-                elif field.internal_type == datetime:
-                    deserialized_data[field_name] = datetime.fromisoformat(value)
-                elif field.internal_type == date:
-                    deserialized_data[field_name] = date.fromisoformat(value)
-                elif field.internal_type == int:
-                    deserialized_data[field_name] = int(value)
-                elif field.internal_type == float:
-                    deserialized_data[field_name] = float(value)
-                elif field.internal_type == str:
-                    deserialized_data[field_name] = str(value)
-                elif field.internal_type == bool:
-                    deserialized_data[field_name] = value.lower() in ['true', '1', 't', 'y', 'yes']
-        self._update_from_data(deserialized_data)
+        self._update_from_data(data)
+
+    def to_bytes(self, schema: bool = False) -> bytes:
+        """
+        Return a binary snapshot of the resource. See `unolet.snapshot`.
+
+        Args:
+            schema (bool): Include the metadata, so the snapshot loads in
+                processes that have not loaded it.
+        """
+        return dumps(RESOURCE, type(self), [self], schema)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """
+        Load a resource from a snapshot made by `to_bytes`, without requests.
+
+        Raises:
+            ValueError: The data is not a snapshot of this model, or was taken
+            with different metadata.
+        """
+        return loads(data, cls, RESOURCE)["resources"][0]
+
+    @classmethod
+    def serialize_many(cls, resources: Iterable["BaseResource"], partial: bool = False, as_bytes: bool = True):
+        """
+        Serialize many resources at once, e.g. for bulk submission.
+
+        Args:
+            resources (Iterable[BaseResource]): The resources.
+            partial (bool): Do not require the required fields.
+            as_bytes (bool): Return the JSON encoded list instead of the list of dicts.
+
+        Raises:
+            ValidationError: `{index: {field: [messages]}}` for every invalid resource.
+        """
+        cls._initialize_metadata()
+        bodies = cls._metadata.serializer.serialize_many((resource.__dict__ for resource in resources), partial)
+        return encode(bodies) if as_bytes else bodies
 
 
 class UnoletResource(BaseResource):
     _endpoint = None
 
 
-class ResourceList:
-    def __init__(self, model_class: UnoletResource, items: List[Dict]):
+class ResourceList(ColumnarMixin, ParallelMixin):
+    def __init__(self, model_class: UnoletResource, items: List[Dict], fields: Optional[List[str]] = None, prefetch: Optional[List[str]] = None, deadline: Optional[Deadline] = None):
         """
         Initialize a ResourceList.
 
+        Resources are built from the raw items on first access, so columnar
+        exports never pay for them.
+
         Args:
             model_class (UnoletResource): The class of the resource.
             items (List[Dict]): The items to include in the resource list.
+            fields (Optional[List[str]]): The loaded fields of sparse resources.
+            prefetch (Optional[List[str]]): Related fields loaded in batches
+                when the resources are built.
+            deadline (Optional[Deadline]): Deadline of the prefetch requests.
         """
         self.model_class = model_class
-        self.items = [model_class(**item) for item in items]
+        self.raw_items = items
+        self.fields = fields
+        self.prefetch = prefetch
+        self.deadline = deadline
+
+    @classmethod
+    def _from_resources(cls, model_class: UnoletResource, resources: List[UnoletResource], fields: Optional[List[str]] = None) -> "ResourceList":
+        instance = cls.__new__(cls)
+        instance.model_class = model_class
+        instance.fields = fields
+        instance.prefetch = None
+        instance.deadline = None
+        instance.__dict__["items"] = resources
+        return instance
+
+    @cached_property
+    def raw_items(self) -> List[Dict]:
+        # Only reached for lists loaded from a snapshot, which keep no raw items.
+        serializer = self.model_class._metadata.serializer
+        return [serializer.represent(item.__dict__) for item in self.items]
+
+    @cached_property
+    def items(self) -> List[UnoletResource]:
+        items = [self.model_class._build(item, self.fields) for item in self.raw_items]
+        if self.prefetch:
+            with deadline(self.deadline):
+                prefetch_related(items, self.prefetch)
+        return items
+
+    def _raw_pages(self):
+        return [self.raw_items]
 
     def __repr__(self) -> str:
         return f"<ResourceList(items={self.items})>"
@@ -266,7 +534,26 @@ class ResourceList:
         return f"ResourceList({self.model_class.__name__})"
 
     def __len__(self) -> int:
-        return len(self.items)
+        if "items" in self.__dict__:
+            return len(self.items)
+        return len(self.raw_items)
+
+    def to_bytes(self, schema: bool = True) -> bytes:
+        """Return a binary snapshot of the resources. See `unolet.snapshot`."""
+        return dumps(LIST, self.model_class, self.items, schema, fields=self.fields)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, model_class: Optional[UnoletResource] = None) -> "ResourceList":
+        """
+        Load a list from a snapshot made by `to_bytes`, without requests.
+
+        Args:
+            data (bytes): The snapshot.
+            model_class (UnoletResource, optional): The resource class, e.g. one
+                bound to a client. Defaults to the class named in the snapshot.
+        """
+        snapshot = loads(data, model_class, LIST)
+        return cls._from_resources(snapshot["model_class"], snapshot["resources"], snapshot["attributes"]["fields"])
 
     def __getitem__(self, index: int) -> UnoletResource:
         return self.items[index]
@@ -284,8 +571,8 @@ class ResourceList:
         return len(self)
 
 
-class Pagination:
-    def __init__(self, model_class: UnoletResource, count: int, next_url: Optional[str], previous_url: Optional[str], results: List[Dict]):
+class Pagination(ColumnarMixin, ParallelMixin):
+    def __init__(self, model_class: UnoletResource, count: int, next_url: Optional[str], previous_url: Optional[str], results: List[Dict], fields: Optional[List[str]] = None, prefetch: Optional[List[str]] = None, deadline: Optional[Deadline] = None):
         """
         Initialize a Pagination object.
 
@@ -295,12 +582,19 @@ class Pagination:
             next_url (Optional[str]): The URL for the next page of results.
             previous_url (Optional[str]): The URL for the previous page of results.
             results (List[Dict]): The list of results.
+            fields (Optional[List[str]]): The loaded fields of sparse resources.
+            prefetch (Optional[List[str]]): Related fields loaded in batches.
+            deadline (Optional[Deadline]): Deadline shared by the following
+                and previous pages.
         """
         self.model_class = model_class
         self.count = count
         self.next_url = next_url
         self.previous_url = previous_url
-        self.results = ResourceList(model_class, results)
+        self.fields = fields
+        self.prefetch = prefetch
+        self.deadline = deadline
+        self.results = ResourceList(model_class, results, fields, prefetch, deadline)
 
         if self.next_url:
             self.next_url_params = parse_qs(urlparse(self.next_url).query)
@@ -322,17 +616,100 @@ class Pagination:
     def __iter__(self):
         return iter(self.results)
 
+    def _raw_pages(self):
+        return self.results._raw_pages()
+
+    def to_bytes(self, schema: bool = True) -> bytes:
+        """Return a binary snapshot of the page. See `unolet.snapshot`."""
+        return dumps(
+            PAGINATION, self.model_class, self.results.items, schema,
+            count=self.count, next=self.next_url, previous=self.previous_url, fields=self.fields,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, model_class: Optional[UnoletResource] = None) -> "Pagination":
+        """Load a page from a snapshot made by `to_bytes`, as `ResourceList.from_bytes`."""
+        snapshot = loads(data, model_class, PAGINATION)
+        attributes = snapshot["attributes"]
+        model_class = snapshot["model_class"]
+        page = cls(model_class, attributes["count"], attributes["next"], attributes["previous"], [], attributes["fields"])
+        page.results = ResourceList._from_resources(model_class, snapshot["resources"], attributes["fields"])
+        return page
+
     def __eq__(self, other: 'Pagination') -> bool:
         if not isinstance(other, Pagination):
             return NotImplemented
         return self.count == other.count and self.next_url == other.next and self.previous_url == other.previous and self.results == other.results
 
+    def _find(self, url_params):
+        params = {k: v[-1] for k, v in url_params.items()}
+        params.pop(self.model_class._api.projection_param, None)
+        return self.model_class.find(fields=self.fields, prefetch=self.prefetch, timeout=self.deadline, **params)
+
     def next(self):
         if self.next_url:
-            page = self.next_url_params["page"][0]
-            return self.model_class.find(page=page)
+            return self._find(self.next_url_params)
 
     def previous(self):
         if self.previous_url:
-            page = self.previous_url_params["page"][0]
-            return self.model_class.find(page=page)
+            return self._find(self.previous_url_params)
+
+
+class ResourceStream(ColumnarMixin, ParallelMixin):
+    def __init__(self, model_class: UnoletResource, params: Optional[Dict] = None, fields: Optional[List[str]] = None, prefetch: Optional[List[str]] = None, timeout=None):
+        """
+        Initialize a ResourceStream.
+
+        Pages are requested lazily while iterating, so only one page of raw
+        records is held in memory at a time.
+
+        Args:
+            model_class (UnoletResource): The class of the resource.
+            params (Optional[Dict]): Query parameters of the first page.
+            fields (Optional[List[str]]): The loaded fields of sparse resources.
+            prefetch (Optional[List[str]]): Related fields loaded in batches,
+                page by page.
+            timeout (float | Deadline, optional): Deadline of every page of
+                an iteration, in seconds from its first request.
+        """
+        self.model_class = model_class
+        self.params = params or {}
+        self.fields = fields
+        self.prefetch = prefetch
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return f"<ResourceStream({self.model_class.__name__}, params={self.params})>"
+
+    def __iter__(self):
+        limit = Deadline.after(self.timeout)
+        for rows in self._pages(limit):
+            items = [self.model_class._build(row, self.fields) for row in rows]
+            if self.prefetch:
+                with deadline(limit):
+                    prefetch_related(items, self.prefetch)
+            yield from items
+
+    def pages(self):
+        """
+        Yield the raw records of every page, following the `next` links.
+        """
+        return self._pages(Deadline.after(self.timeout))
+
+    def _pages(self, limit: Optional[Deadline]):
+        params = dict(self.params)
+        while True:
+            params = self.model_class._projection_params(params, self.fields)
+            # Not held across `yield`, which would leak the deadline to the caller.
+            with deadline(limit):
+                data = self.model_class._api.get(self.model_class._endpoint, params).json()
+            if isinstance(data, list):
+                yield data
+                return
+            yield data["results"]
+            if not data.get("next"):
+                return
+            params = {k: v[-1] for k, v in parse_qs(urlparse(data["next"]).query).items()}
+
+    def _raw_pages(self):
+        return self.pages()
@@ -0,0 +1,153 @@
+"""
+Parse large result sets in a process pool.
+
+Turning API records into resources (dates, decimals, validation) is CPU bound
+and runs on a single core. `parse_pages` sends the raw pages to a process pool
+instead, while the next pages are still being downloaded. Workers return
+compact records (a tuple of parsed values per row, in field order) that are
+rehydrated into resources in the calling process, or plain row dicts with
+`rows=True`.
+
+Related fields are left raw by the workers and parsed when rehydrating, since
+building related resources needs their metadata and the API connection; rows
+hold the id of the related object.
+
+Every result container offers the same through `parallel()`:
+
+Example:
+    from unolet import Movement
+
+    for movement in Movement.stream(date__gte="2024-01-01").parallel(max_workers=8):
+        ...
+
+    rows = list(Movement.stream().parallel(rows=True))
+"""
+
+import os
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+from unolet.fields import Undefined
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+_worker_metadata: Dict[str, object] = {}
+
+
+def _metadata(key: str, data: Dict):
+    metadata = _worker_metadata.get(key)
+    if metadata is None:
+        from unolet.models import Metadata
+        metadata = _worker_metadata[key] = Metadata(data)
+    return metadata
+
+
+def parse_records(key: str, metadata_data: Dict, rows: List[Dict]) -> List[tuple]:
+    """
+    Parse and validate raw records into compact records. Runs in the workers.
+
+    Args:
+        key (str): Cache key of the metadata in the worker.
+        metadata_data (dict): The OPTIONS payload of the resource.
+        rows (List[dict]): Raw records.
+
+    Returns:
+        List[tuple]: One tuple of values per record, in the order of the
+        metadata fields. Related fields keep their raw value.
+    """
+    fields = list(_metadata(key, metadata_data).fields.values())
+    return [
+        tuple(
+            row.get(field.name, Undefined) if field.is_related
+            else field.parse_value(row.get(field.name, Undefined))
+            for field in fields
+        )
+        for row in rows
+    ]
+
+
+def _as_row(names, related, record) -> Dict:
+    row = {}
+    for name, is_related, value in zip(names, related, record):
+        if value is Undefined:
+            value = None
+        elif is_related and isinstance(value, dict):
+            value = value.get("id")
+        row[name] = value
+    return row
+
+
+def parse_pages(
+    model_class,
+    pages: Iterable[List[Dict]],
+    max_workers: Optional[int] = None,
+    rows: bool = False,
+    chunk_size: int = 1000,
+    executor: Optional["Executor"] = None,
+) -> Iterator:
+    """
+    Parse pages of raw records in a process pool, preserving their order.
+
+    At most two chunks per worker are in flight, so pages are read from
+    `pages` only as fast as the workers parse them.
+
+    Args:
+        model_class (type): The resource class of the records.
+        pages (Iterable[List[dict]]): Pages of raw records.
+        max_workers (int, optional): Number of processes. Defaults to the
+            number of CPUs.
+        rows (bool): Yield dicts of parsed values instead of resources.
+        chunk_size (int): Maximum number of records sent to a worker at once.
+        executor (Executor, optional): Pool to use instead of creating, and
+            shutting down, one for this call.
+
+    Yields:
+        The resources, or row dicts, in the order of the records.
+    """
+    model_class._initialize_metadata()
+    metadata = model_class._metadata
+    names = list(metadata.fields)
+    related = [field.is_related for field in metadata.fields.values()]
+    key = metadata.schema_key
+
+    max_workers = max_workers or os.cpu_count() or 1
+    own_executor = executor is None
+    if own_executor:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers)
+    pending = deque()
+
+    def emit(future):
+        for record in future.result():
+            if rows:
+                yield _as_row(names, related, record)
+            else:
+                yield model_class._from_parsed(dict(zip(names, record)))
+
+    try:
+        for page in pages:
+            for start in range(0, len(page), chunk_size):
+                pending.append(executor.submit(parse_records, key, metadata.data, page[start:start + chunk_size]))
+            while len(pending) > 2 * max_workers:
+                yield from emit(pending.popleft())
+        while pending:
+            yield from emit(pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown()
+
+
+class ParallelMixin:
+    """
+    Adds `parallel()` to result containers.
+
+    Subclasses provide `model_class` and `_raw_pages()`, an iterable of lists of
+    raw records.
+    """
+    def parallel(self, max_workers: Optional[int] = None, rows: bool = False, chunk_size: int = 1000, executor: Optional["Executor"] = None) -> Iterator:
+        """Parse the results in a process pool. See `unolet.parallel.parse_pages`."""
+        return parse_pages(self.model_class, self._raw_pages(), max_workers, rows, chunk_size, executor)
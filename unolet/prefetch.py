@@ -0,0 +1,168 @@
+"""
+Batch-load the related resources of a page of results.
+
+Related fields usually hold whatever the API embedded, often just an id and a
+name, so reading the rest of `invoice.person` on every invoice of a page
+means one `get` per invoice. `prefetch_related` loads them for the whole page
+instead:
+
+    - The distinct ids of every prefetched relation are collected across the
+      resources, and relations to the same model (e.g. `person` and
+      `customer`) share their ids.
+    - Every model is fetched with `id__in` filters of up to `batch_size` ids,
+      all sent concurrently. Ids the server did not return, e.g. when it
+      ignores the filter, are fetched with concurrent `get` requests.
+    - Each related object is built once and the same instance is attached
+      to every resource referring to it.
+
+Relations of related resources are prefetched with `__`, e.g.
+`"document__person"` on movements. Each level costs one or two concurrent
+round trips, however many resources there are.
+
+Example:
+    from unolet import Invoice
+
+    for invoice in Invoice.find(page=1, prefetch=["person", "warehouse", "type"]):
+        print(invoice.person.email, invoice.warehouse.code)
+"""
+
+from typing import Dict, Iterable, List
+
+from unolet.fields import Undefined
+from unolet.utils import related_id
+
+
+BATCH_SIZE = 100
+
+
+def prefetch_lookups(model_class, names) -> Dict[str, List[str]]:
+    """
+    Validate prefetch lookups, e.g. `["person", "document__person"]`.
+
+    Args:
+        model_class (type): The resource class the lookups start from.
+        names (Iterable[str] | str): Related field names, nested with `__`,
+            or a comma separated string of them.
+
+    Returns:
+        Dict[str, List[str]]: The nested lookups of every related field.
+
+    Raises:
+        ValueError: When a name is not a related field of its model.
+    """
+    if isinstance(names, str):
+        names = names.split(",")
+    model_class._initialize_metadata()
+    lookups: Dict[str, List[str]] = {}
+    for name in names:
+        name, _, nested = name.partition("__")
+        field = model_class._metadata.fields.get(name)
+        if field is None or not field.is_related:
+            raise ValueError(f"{name!r} is not a related field of {model_class.__name__}")
+        lookups.setdefault(name, [])
+        if nested:
+            lookups[name].append(nested)
+    for name, nested in lookups.items():
+        if nested:
+            prefetch_lookups(_related_class(model_class, name), nested)
+    return lookups
+
+
+def _related_class(model_class, name) -> type:
+    return model_class._api.resource(model_class._metadata.fields[name].related_model)
+
+
+def _values(value) -> list:
+    if value is None or value is Undefined:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _fetch(api, wanted: Dict[type, set], batch_size: int) -> Dict[type, Dict]:
+    """Load the resources with the given ids, in at most two concurrent rounds."""
+    loaded = {model_class: {} for model_class in wanted}
+    if not wanted:
+        return loaded
+    calls, owners = [], []
+    for model_class, ids in wanted.items():
+        ids = sorted(ids, key=str)
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            calls.append((model_class._endpoint, "GET", {"id__in": ",".join(map(str, chunk)), "page_size": len(chunk)}))
+            owners.append(model_class)
+    for model_class, response in zip(owners, api.request_many(calls)):
+        data = response.json()
+        rows = data["results"] if isinstance(data, dict) else data
+        ids = {str(id) for id in wanted[model_class]}
+        for row in rows:
+            if str(row.get("id")) in ids:
+                loaded[model_class][row["id"]] = model_class(**row)
+
+    missing = [
+        (model_class, id)
+        for model_class, ids in wanted.items()
+        for id in ids
+        if id not in loaded[model_class]
+    ]
+    if missing:
+        responses = api.request_many([(f"{model_class._endpoint}/{id}",) for model_class, id in missing], raise_errors=False)
+        for (model_class, id), response in zip(missing, responses):
+            if response.status_code in (403, 404):
+                # Deleted, or not visible to the token: keep the embedded value.
+                continue
+            loaded[model_class][id] = model_class(**api.process_response(response).json())
+    return loaded
+
+
+def prefetch_related(resources: Iterable, names, batch_size: int = BATCH_SIZE) -> List:
+    """
+    Load the related resources of `resources` in batches and attach them.
+
+    Args:
+        resources (Iterable[BaseResource]): Resources of the same class.
+        names (Iterable[str] | str): Relations to load, see `prefetch_lookups`.
+        batch_size (int): Maximum number of ids per request.
+
+    Returns:
+        List[BaseResource]: The resources.
+    """
+    resources = list(resources)
+    if not resources:
+        return resources
+    model_class = type(resources[0])
+    lookups = prefetch_lookups(model_class, names)
+
+    wanted: Dict[type, set] = {}
+    nested: Dict[type, List[str]] = {}
+    relations = []
+    for name, lookup in lookups.items():
+        related_class = _related_class(model_class, name)
+        relations.append((name, related_class))
+        ids = wanted.setdefault(related_class, set())
+        nested.setdefault(related_class, []).extend(lookup)
+        for resource in resources:
+            for value in _values(resource.__dict__.get(name)):
+                id = related_id(value)
+                if id is not None:
+                    ids.add(id)
+
+    loaded = _fetch(model_class._api, {k: v for k, v in wanted.items() if v}, batch_size)
+
+    for name, related_class in relations:
+        instances = loaded.get(related_class, {})
+        for resource in resources:
+            if name not in resource.__dict__:
+                # Not loaded in a sparse resource.
+                continue
+            value = resource.__dict__[name]
+            if isinstance(value, list):
+                value = [instances.get(related_id(v), v) for v in value]
+            elif value is not None:
+                value = instances.get(related_id(value), value)
+            # Not a change of the resource, so bypass the change tracking.
+            resource.__dict__[name] = value
+
+    for related_class, lookup in nested.items():
+        if lookup and loaded.get(related_class):
+            prefetch_related(loaded[related_class].values(), lookup, batch_size)
+    return resources
@@ -0,0 +1,447 @@
+"""
+Local SQLite mirror of ERP resources.
+
+A mirror copies chosen resources into a SQLite database so that hot reads
+(product lookups, customer search, warehouse lists) become indexed local
+queries. Every table is derived from the resource `Metadata.fields`: one column
+per field, plus the original record as JSON, from which the same resource
+classes are rebuilt on read. The metadata is loaded from the API and stored
+too, so the mirror can still be queried while the API is unreachable.
+
+Lookups follow the API filter syntax: `field`, `field__gt`, `field__in`,
+`field__icontains`, and so on (see `LOOKUPS`).
+
+Example:
+    from unolet import Product
+    from unolet.services.mirror import Mirror
+
+    mirror = Mirror("unolet.sqlite3")
+    products = mirror.register(Product, indexes=["code", "barcode"])
+    products.refresh()
+
+    product = products.get_by(barcode="7460000000022")
+    cheap = products.find(price__lt=10, is_active=True, order_by="name")
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from unolet.exceptions import ObjectDoesNotExist
+from unolet.fields import field_kind
+from unolet.models import BaseResource, Metadata, ResourceList
+
+
+SQL_TYPES = {
+    "related": "INTEGER",
+    "integer": "INTEGER",
+    "float": "REAL",
+    "decimal": "NUMERIC",
+    "boolean": "INTEGER",
+    "date": "TEXT",
+    "datetime": "TEXT",
+    "object": "TEXT",
+}
+
+LOOKUPS = {
+    "exact": "{column} = ?",
+    "iexact": "{column} = ? COLLATE NOCASE",
+    "contains": "instr({column}, ?) > 0",
+    "icontains": "{column} LIKE ? ESCAPE '\\'",
+    "startswith": "instr({column}, ?) = 1",
+    "istartswith": "{column} LIKE ? ESCAPE '\\'",
+    "gt": "{column} > ?",
+    "gte": "{column} >= ?",
+    "lt": "{column} < ?",
+    "lte": "{column} <= ?",
+    "in": "{column} IN ({placeholders})",
+    "isnull": "{column} IS {negation}NULL",
+}
+
+STATE_TABLE = "_mirror_state"
+DATA_COLUMN = "_data"
+
+
+def _quote(name):
+    return '"%s"' % name.replace('"', '""')
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _to_sql(kind, value):
+    """Convert a raw API value or a Python value to its SQLite representation."""
+    if value is None:
+        return None
+    if isinstance(value, BaseResource):
+        return value.id
+    if kind == "related":
+        return value.get("id") if isinstance(value, dict) else value
+    if kind == "boolean":
+        return int(bool(value))
+    if kind == "decimal":
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _default(value):
+    if isinstance(value, BaseResource):
+        return value.id
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class MirrorTable:
+    """
+    The mirrored copy of one resource.
+
+    Args:
+        mirror (Mirror): The mirror holding the table.
+        model_class (type): The resource class.
+        indexes (Iterable[str]): Extra fields to index. Related fields are
+            always indexed.
+    """
+    def __init__(self, mirror: "Mirror", model_class, indexes: Iterable[str] = ()):
+        self.mirror = mirror
+        self.model_class = model_class
+        self.name = model_class._endpoint
+        self.extra_indexes = list(indexes)
+        self._load(mirror._ensure_metadata(model_class, store=True))
+
+    def __repr__(self):
+        return f"<MirrorTable {self.name}>"
+
+    def _load(self, metadata: Metadata):
+        self.metadata = metadata
+        self.kinds = {name: field_kind(field) for name, field in metadata.fields.items()}
+        self.indexes = [name for name, kind in self.kinds.items() if kind == "related" and name != "id"]
+        for name in self.extra_indexes:
+            if name not in self.kinds:
+                raise ValueError(f"Unknown field {name!r} for {self.model_class.__name__}")
+            if name not in self.indexes:
+                self.indexes.append(name)
+        self._create()
+
+    def _create(self):
+        columns = [f"{_quote(name)} {SQL_TYPES[kind]}" for name, kind in self.kinds.items() if name != "id"]
+        columns = ["id INTEGER PRIMARY KEY"] + columns + [f"{DATA_COLUMN} TEXT NOT NULL"]
+        with self.mirror.transaction() as cursor:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {_quote(self.name)} ({', '.join(columns)})")
+            existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({_quote(self.name)})")}
+            for name, kind in self.kinds.items():
+                if name not in existing:
+                    cursor.execute(f"ALTER TABLE {_quote(self.name)} ADD COLUMN {_quote(name)} {SQL_TYPES[kind]}")
+            for name in self.indexes:
+                index = _quote(f"{self.name}_{name}_idx")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {_quote(self.name)} ({_quote(name)})")
+
+    def _row(self, record: Dict):
+        values = [_to_sql(kind, record.get(name)) for name, kind in self.kinds.items()]
+        return values + [json.dumps(record, default=_default)]
+
+    def upsert(self, records: Iterable[Dict]) -> int:
+        """
+        Insert or replace raw records.
+
+        Args:
+            records (Iterable[dict]): Raw records, as returned by the API.
+
+        Returns:
+            int: The number of records written.
+        """
+        columns = [_quote(name) for name in self.kinds] + [DATA_COLUMN]
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT OR REPLACE INTO {_quote(self.name)} ({', '.join(columns)}) VALUES ({placeholders})"
+        rows = [self._row(record) for record in records]
+        with self.mirror.transaction() as cursor:
+            cursor.executemany(sql, rows)
+        return len(rows)
+
+    def delete(self, ids: Iterable) -> int:
+        """Remove the records with the given ids. Returns the number removed."""
+        ids = list(ids)
+        deleted = 0
+        with self.mirror.transaction() as cursor:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(f"DELETE FROM {_quote(self.name)} WHERE id IN ({placeholders})", chunk)
+                deleted += cursor.rowcount
+        return deleted
+
+    def refresh(self, prune: bool = True, **params) -> int:
+        """
+        Copy the resource from the API into the mirror, page by page.
+
+        Args:
+            prune (bool): Remove local records that the API no longer returns.
+                Only use it when `params` select the whole resource.
+            **params: Query parameters, as for `find`.
+
+        Returns:
+            int: The number of records copied.
+        """
+        started = time.time()
+        metadata = self.mirror._ensure_metadata(self.model_class, store=True, reload=True)
+        if metadata is not self.metadata:
+            self._load(metadata)
+        seen = set()
+        count = 0
+        for rows in self.model_class.stream(**params).pages():
+            count += self.upsert(rows)
+            if prune:
+                seen.update(row["id"] for row in rows)
+        if prune:
+            stale = [row[0] for row in self.mirror.execute(f"SELECT id FROM {_quote(self.name)}") if row[0] not in seen]
+            self.delete(stale)
+        self.mirror._save_state(self.model_class, self.metadata, refreshed=started)
+        return count
+
+    @property
+    def last_refresh(self) -> Optional[datetime]:
+        """When `refresh` last started, or `None` if it never ran."""
+        row = self.mirror.execute(f"SELECT refreshed FROM {STATE_TABLE} WHERE endpoint = ?", [self.name]).fetchone()
+        return datetime.fromtimestamp(row[0]) if row and row[0] is not None else None
+
+    def is_stale(self, max_age: float) -> bool:
+        """Return whether the last refresh is older than `max_age` seconds."""
+        refreshed = self.last_refresh
+        return refreshed is None or time.time() - refreshed.timestamp() > max_age
+
+    def _where(self, filters: Dict):
+        clauses, params = [], []
+        for key, value in filters.items():
+            name, _, lookup = key.partition("__")
+            lookup = lookup or "exact"
+            if name != "id" and name not in self.kinds:
+                raise ValueError(f"Unknown field {name!r} for {self.model_class.__name__}")
+            if lookup not in LOOKUPS:
+                raise ValueError(f"Unsupported lookup {lookup!r}, expected one of {sorted(LOOKUPS)}")
+            kind = self.kinds.get(name, "integer")
+            column = _quote(name)
+
+            if lookup == "isnull":
+                clauses.append(LOOKUPS[lookup].format(column=column, negation="" if value else "NOT "))
+                continue
+            if lookup == "in":
+                values = [_to_sql(kind, v) for v in value]
+                if not values:
+                    clauses.append("0")
+                    continue
+                placeholders = ", ".join("?" for _ in values)
+                clauses.append(LOOKUPS[lookup].format(column=column, placeholders=placeholders))
+                params.extend(values)
+                continue
+
+            value = _to_sql(kind, value)
+            if lookup == "icontains":
+                value = f"%{_escape_like(str(value))}%"
+            elif lookup == "istartswith":
+                value = f"{_escape_like(str(value))}%"
+            clauses.append(LOOKUPS[lookup].format(column=column))
+            params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _order_by(self, order_by):
+        if not order_by:
+            return ""
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        terms = []
+        for term in order_by:
+            name = term.lstrip("-")
+            if name != "id" and name not in self.kinds:
+                raise ValueError(f"Unknown field {name!r} for {self.model_class.__name__}")
+            terms.append(f"{_quote(name)} {'DESC' if term.startswith('-') else 'ASC'}")
+        return f" ORDER BY {', '.join(terms)}"
+
+    def raw(self, order_by=None, limit: Optional[int] = None, offset: int = 0, **filters) -> List[Dict]:
+        """Return the matching raw records. Takes the same arguments as `find`."""
+        where, params = self._where(filters)
+        sql = f"SELECT {DATA_COLUMN} FROM {_quote(self.name)}{where}{self._order_by(order_by)}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        return [json.loads(row[0]) for row in self.mirror.execute(sql, params)]
+
+    def find(self, order_by=None, limit: Optional[int] = None, offset: int = 0, **filters) -> ResourceList:
+        """
+        Query the mirror.
+
+        Args:
+            order_by (str | List[str], optional): Fields to sort by, prefixed
+                with "-" for descending order.
+            limit (int, optional): Maximum number of results.
+            offset (int): Number of results to skip.
+            **filters: Lookups, e.g. `code="A1"` or `price__lte=10`.
+
+        Returns:
+            ResourceList: The matching resources.
+        """
+        self.mirror._ensure_metadata(self.model_class)
+        return ResourceList(self.model_class, self.raw(order_by, limit, offset, **filters))
+
+    def get(self, id) -> BaseResource:
+        """Return the resource with the given id, or raise `ObjectDoesNotExist`."""
+        return self.get_by(id=id)
+
+    def get_by(self, **filters) -> BaseResource:
+        """Return the first resource matching `filters`, or raise `ObjectDoesNotExist`."""
+        results = self.find(limit=1, **filters)
+        if not len(results):
+            raise ObjectDoesNotExist(f"{self.model_class.__name__} matching {filters} is not in the mirror")
+        return results[0]
+
+    def count(self, **filters) -> int:
+        """Return the number of records matching `filters`."""
+        where, params = self._where(filters)
+        return self.mirror.execute(f"SELECT COUNT(*) FROM {_quote(self.name)}{where}", params).fetchone()[0]
+
+
+class Mirror:
+    """
+    A SQLite database holding mirrored resources.
+
+    The connection may be shared between threads. File databases use WAL
+    journaling so other processes can read while the mirror is refreshed.
+
+    Args:
+        path (str): Database file, or ":memory:" for a private in-memory copy.
+    """
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.lock = threading.RLock()
+        self.tables: Dict[type, MirrorTable] = {}
+        # Classes given the stored metadata because the API was unreachable.
+        self._offline = set()
+        self.execute(
+            f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (endpoint TEXT PRIMARY KEY, metadata TEXT, refreshed REAL)"
+        )
+
+    def __repr__(self):
+        return f"<Mirror {self.path}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, model_class) -> MirrorTable:
+        try:
+            return self.tables[model_class]
+        except KeyError:
+            raise KeyError(f"{model_class.__name__} is not registered in {self}")
+
+    def __contains__(self, model_class):
+        return model_class in self.tables
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+    def register(self, model_class, indexes: Iterable[str] = ()) -> MirrorTable:
+        """
+        Mirror a resource class, creating or migrating its table.
+
+        Args:
+            model_class (type): The resource class, e.g. `unolet.Product`.
+            indexes (Iterable[str]): Extra fields to index.
+
+        Returns:
+            MirrorTable: The table of the resource.
+        """
+        table = MirrorTable(self, model_class, indexes)
+        self.tables[model_class] = table
+        return table
+
+    def refresh(self, **params) -> Dict[str, int]:
+        """Refresh every registered table. Returns the records copied per endpoint."""
+        return {table.name: table.refresh(**params) for table in self.tables.values()}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _stored_metadata(self, model_class) -> Optional[Metadata]:
+        row = self.execute(f"SELECT metadata FROM {STATE_TABLE} WHERE endpoint = ?", [model_class._endpoint]).fetchone()
+        return Metadata(json.loads(row[0])) if row and row[0] else None
+
+    def _save_state(self, model_class, metadata: Metadata, refreshed=None):
+        payload = json.dumps(metadata.data)
+        with self.transaction() as cursor:
+            cursor.execute(
+                f"INSERT INTO {STATE_TABLE} (endpoint, metadata, refreshed) VALUES (?, ?, ?) "
+                f"ON CONFLICT(endpoint) DO UPDATE SET metadata = excluded.metadata, "
+                f"refreshed = COALESCE(excluded.refreshed, refreshed)",
+                [model_class._endpoint, payload, refreshed],
+            )
+
+    def _ensure_metadata(self, model_class, store: bool = False, reload: bool = False, _seen=None) -> Metadata:
+        """
+        Give `model_class` and its related classes their metadata.
+
+        The metadata comes from the API and is stored for the next time. The
+        stored copy is only used when the API cannot be reached, so the mirror
+        keeps working offline; `reload` asks the API again for classes given
+        the stored copy.
+        """
+        seen = _seen if _seen is not None else set()
+        seen.add(model_class)
+        if reload and model_class in self._offline:
+            model_class._metadata = None
+        if model_class._metadata is None:
+            try:
+                model_class._initialize_metadata()
+            except Exception:
+                stored = self._stored_metadata(model_class)
+                if stored is None:
+                    raise
+                model_class._metadata = stored
+                self._offline.add(model_class)
+            else:
+                self._offline.discard(model_class)
+                store = True
+        if store and model_class not in self._offline:
+            self._save_state(model_class, model_class._metadata)
+        for field in model_class._metadata.fields.values():
+            related_model = getattr(field, "related_model", None)
+            if not related_model:
+                continue
+            try:
+                # Bound to the same client as `model_class`.
+                related_class = model_class._api.resource(related_model)
+            except AttributeError:
+                continue
+            if related_class not in seen:
+                self._ensure_metadata(related_class, store, reload, seen)
+        return model_class._metadata
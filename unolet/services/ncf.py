@@ -0,0 +1,286 @@
+"""
+Local allocation of NCF numbers in reserved blocks.
+
+Issuing an invoice needs the next NCF (número de comprobante fiscal) of an
+`AuthorizationNCF`. Instead of asking the API for every number, the
+allocator reserves a block of `block_size` numbers at once, by moving the
+`current` sequence of the authorization forward, and hands the numbers out
+locally:
+
+    - The block and the next number are kept in a JSON state file. Every
+      number is written to disk before it is returned, with an atomic file
+      replace, so a restarted process carries on where it stopped and never
+      issues a number twice.
+    - Threads and processes of the host that open the same state file share
+      the blocks; a lock file serializes the allocations.
+    - When `refill_threshold` numbers or fewer are left, the next block is
+      reserved in a background thread, so allocations only wait for the API
+      when the numbers run out.
+    - Blocks never go past the `end` of the authorization, and no number is
+      issued once its `expiration` date has passed.
+
+Reservations are a read followed by a PATCH of the authorization, which the
+API does not make atomic: hosts that issue NCF of the same type should either
+share one state file or use their own authorization. A process that crashes
+between a reservation and the write of the state file leaves a gap in the
+sequence, never a duplicate.
+
+Example:
+    from unolet.services.ncf import NCFAllocator
+
+    with NCFAllocator(authorization_id, "ncf_b01.json", block_size=200) as ncf:
+        invoice.ncf = ncf.allocate()  # "B0100000001"
+        invoice.save()
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from unolet.api import UnoletAPI
+from unolet.exceptions import UnoletError
+from unolet.models import BaseResource
+from unolet.utils import atomic_write, string_to_date
+
+
+STATE_VERSION = 1
+
+# Fields of the authorization used by the allocator.
+FIELDS = {
+    "prefix": "prefix",
+    "start": "start",
+    "end": "end",
+    "current": "current",
+    "expiration": "expiration",
+}
+
+
+class NCFError(UnoletError):
+    """Exception raised when no NCF can be allocated."""
+    pass
+
+
+class NCFExhausted(NCFError):
+    """Exception raised when every number of the authorization has been used."""
+    pass
+
+
+class NCFExpired(NCFError):
+    """Exception raised when the authorization has expired."""
+    pass
+
+
+class NCFAllocator:
+    """
+    Hand out the NCF numbers of an authorization from locally reserved blocks.
+
+    Args:
+        authorization: The `AuthorizationNCF`, or its id.
+        path (str): Location of the state file. Every process allocating
+            numbers of the authorization on the host must use the same file.
+        block_size (int): Numbers reserved per request to the API.
+        refill_threshold (int, optional): Reserve the next block in the
+            background once this many numbers or fewer are left. Defaults to
+            a quarter of `block_size`.
+        digits (int): Length of the sequence part of the NCF.
+        fields (Dict[str, str], optional): Names of the authorization fields,
+            for servers that differ from `FIELDS`.
+        client (Client, optional): Client of the authorization when it is
+            given by id. Defaults to the default client.
+    """
+    def __init__(
+        self,
+        authorization,
+        path: str,
+        block_size: int = 100,
+        refill_threshold: Optional[int] = None,
+        digits: int = 8,
+        fields: Optional[Dict[str, str]] = None,
+        client=None,
+    ):
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        if isinstance(authorization, BaseResource):
+            self.model_class = type(authorization)
+            self.authorization_id = authorization.id
+        else:
+            self.model_class = (client or UnoletAPI).resource("AuthorizationNCF")
+            self.authorization_id = authorization
+        self.path = path
+        self.block_size = block_size
+        self.refill_threshold = block_size // 4 if refill_threshold is None else refill_threshold
+        self.digits = digits
+        self.fields = {**FIELDS, **(fields or {})}
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._files = None
+        self._pid = None
+        self._refill_thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Wait for a background reservation and release the lock files."""
+        thread = self._refill_thread
+        if thread is not None:
+            thread.join()
+        with self._refill_lock, self._lock, self._open_lock:
+            if self._files is not None and self._pid == os.getpid():
+                for file in self._files:
+                    file.close()
+            self._files = self._pid = None
+
+    @property
+    def remaining(self) -> int:
+        """Numbers reserved and not yet allocated."""
+        with self._locked():
+            return self._remaining(self._load())
+
+    def allocate(self) -> str:
+        """
+        Return the next NCF, e.g. "B0100000001".
+
+        Raises:
+            NCFExhausted: Every number of the authorization has been used.
+            NCFExpired: The authorization has expired.
+            APIError: A block could not be reserved.
+        """
+        while True:
+            with self._locked():
+                state = self._load()
+                self._check_expiration(state)
+                blocks = state["blocks"]
+                if blocks:
+                    number, last = blocks[0]
+                    if number == last:
+                        blocks.pop(0)
+                    else:
+                        blocks[0][0] = number + 1
+                    self._save(state)
+                    if self._remaining(state) <= self.refill_threshold:
+                        self._refill_in_background()
+                    return f"{state['prefix']}{number:0{self.digits}d}"
+            self._refill(blocking=True)
+
+    def reserve(self):
+        """Reserve another block now, however many numbers are left."""
+        self._refill(blocking=True, force=True)
+
+    def _remaining(self, state: Dict) -> int:
+        return sum(last - number + 1 for number, last in state["blocks"])
+
+    def _check_expiration(self, state: Dict):
+        expiration = state.get("expiration")
+        if expiration and date.fromisoformat(expiration) < date.today():
+            raise NCFExpired(f"The NCF authorization {self.authorization_id} expired on {expiration}")
+
+    def _refill_in_background(self):
+        thread = self._refill_thread
+        if thread is not None and thread.is_alive():
+            return
+        self._refill_thread = threading.Thread(target=self._refill_quietly, name="unolet-ncf-refill", daemon=True)
+        self._refill_thread.start()
+
+    def _refill_quietly(self):
+        try:
+            self._refill(blocking=False)
+        except Exception as e:
+            # Raised again by the allocation that finds no numbers left.
+            self.last_error = e
+
+    def _refill(self, blocking: bool, force: bool = False) -> bool:
+        """Reserve a block unless enough numbers are left. Returns whether one was."""
+        import fcntl
+
+        with self._refill_lock:
+            self._open()
+            refill_file = self._files[1]
+            try:
+                fcntl.flock(refill_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return False
+            try:
+                with self._locked():
+                    state = self._load()
+                if not force and self._remaining(state) > (self.refill_threshold if not blocking else 0):
+                    # Another process reserved a block meanwhile.
+                    return False
+                block, prefix, expiration = self._reserve_block()
+                with self._locked():
+                    state = self._load()
+                    state["blocks"].append(block)
+                    state["prefix"] = prefix
+                    state["expiration"] = expiration
+                    self._save(state)
+                self.last_error = None
+                return True
+            finally:
+                fcntl.flock(refill_file, fcntl.LOCK_UN)
+
+    def _reserve_block(self):
+        """Move the sequence of the authorization forward by a block."""
+        fields = self.fields
+        authorization = self.model_class.get(self.authorization_id, fields=list(fields.values()))
+        values = {name: getattr(authorization, field) for name, field in fields.items()}
+        expiration = values["expiration"]
+        if isinstance(expiration, str):
+            expiration = string_to_date(expiration)
+        if isinstance(expiration, datetime):
+            expiration = expiration.date()
+        if expiration and expiration < date.today():
+            raise NCFExpired(f"The NCF authorization {self.authorization_id} expired on {expiration}")
+
+        first = max((values["current"] or 0) + 1, values["start"])
+        last = min(first + self.block_size - 1, values["end"])
+        if first > last:
+            raise NCFExhausted(f"Every NCF of the authorization {self.authorization_id} has been used")
+
+        authorization.update({fields["current"]: last})
+        cache = self.model_class._api.cache
+        if cache is not None:
+            cache.invalidate(authorization)
+        return [first, last], values["prefix"], expiration.isoformat() if expiration else None
+
+    def _open(self):
+        # flock() locks belong to the open file, which a forked child
+        # inherits: the child opens its own files to lock against its parent.
+        with self._open_lock:
+            if self._pid != os.getpid():
+                self._files = (open(f"{self.path}.lock", "a+b"), open(f"{self.path}.refill", "a+b"))
+                self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self):
+        import fcntl
+
+        with self._lock:
+            self._open()
+            fcntl.flock(self._files[0], fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._files[0], fcntl.LOCK_UN)
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {"version": STATE_VERSION, "authorization": self.authorization_id, "prefix": None, "expiration": None, "blocks": []}
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported NCF state version {state.get('version')!r} in {self.path}")
+        if state.get("authorization") != self.authorization_id:
+            raise ValueError(f"{self.path} holds the numbers of the NCF authorization {state.get('authorization')!r}")
+        return state
+
+    def _save(self, state: Dict):
+        atomic_write(self.path, json.dumps(state))
+
@@ -0,0 +1,345 @@
+"""
+Background write-behind queue for resource saves.
+
+`WriteBehindQueue` takes `save()` calls off the request path. Saves are
+queued and a background thread sends them to the API:
+
+    - Repeated saves of the same resource are coalesced. Changes to an
+      existing resource, taken from `_state.changes`, are merged into a single
+      PATCH per `(endpoint, id)`; a new resource saved again before it is
+      sent is created once, with its latest values.
+    - The queue is flushed when `batch_size` writes are pending or
+      `flush_interval` seconds after the oldest pending write, whichever comes
+      first. The writes of a batch are sent concurrently.
+    - Every save returns a `Future` resolved with the resource once it is
+      written, or with the error of the write.
+    - With a `spool_path`, every queued write is also appended to a file,
+      fsynced, before `save()` returns. Writes left in the spool by a process
+      that stopped before flushing are sent again by the next queue opened on
+      the same file. Delivery is at least once: a write sent just before a
+      crash may be sent again. Writes rejected by the API fail their future
+      and are dropped from the spool; writes that could not be sent at all
+      stay in it.
+
+Once attached to a client, `resource.save()` itself goes through the queue
+for every resource of that client.
+
+New resources that refer to other unsaved resources cannot be queued, since
+their ids are not known yet; save those with `unolet.unit_of_work.UnitOfWork`.
+
+Example:
+    from unolet import Unolet, Product
+    from unolet.services.write_behind import WriteBehindQueue
+
+    queue = WriteBehindQueue(spool_path="writes.jsonl", batch_size=100, flush_interval=2)
+    queue.attach()  # the default client
+
+    product = Product.get(22)
+    product.price = 10
+    product.save()  # returns immediately
+
+    queue.close()  # flushes pending writes
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from unolet.api import UnoletAPI
+from unolet.exceptions import APIError
+from unolet.models import BaseResource
+from unolet.serializers import encode
+from unolet.utils import atomic_write
+
+
+CREATE = "create"
+UPDATE = "update"
+
+
+class _Write:
+    """A pending write, with the changes of every save it coalesces."""
+    def __init__(self, key: str, model_class: type, action: str, id, data: Dict, resource: Optional[BaseResource] = None):
+        self.key = key
+        self.model_class = model_class
+        self.action = action
+        self.id = id
+        self.data = data
+        self.resource = resource
+        self.future = Future()
+
+    def record(self, data: Dict) -> Dict:
+        return {
+            "key": self.key,
+            "model": self.model_class.__name__,
+            "action": self.action,
+            "id": self.id,
+            "data": data,
+        }
+
+
+class WriteBehindQueue:
+    """
+    Queue of resource writes flushed by a background thread.
+
+    Args:
+        batch_size (int): Flush as soon as this many writes are pending.
+        flush_interval (float): Flush at most this many seconds after a write
+            was queued.
+        max_concurrency (int): Maximum number of writes in flight.
+        spool_path (str, optional): File where pending writes are kept until
+            they are sent.
+        client (Client, optional): Client used to resolve the resource classes
+            of spooled writes. Defaults to the default client.
+    """
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_concurrency: int = 10,
+        spool_path: Optional[str] = None,
+        client=None,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_concurrency = max_concurrency
+        self.spool_path = spool_path
+        self.client = client
+        self.pending: Dict[str, _Write] = {}
+        self._keys: Dict[int, str] = {}
+        self._in_flight: Dict[int, _Write] = {}
+        self._oldest: Optional[float] = None
+        self._condition = threading.Condition()
+        self._flushing = threading.Lock()
+        self._closed = False
+        self._attached = []
+        # Kept for the life of the queue, so that the connections its threads
+        # open are reused by every flush.
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="unolet-write-behind")
+
+        if spool_path:
+            self._replay()
+        self._thread = threading.Thread(target=self._run, name="unolet-write-behind", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        with self._condition:
+            return len(self.pending)
+
+    def attach(self, client=None):
+        """
+        Send the `save()` calls of every resource of `client` (the default
+        client when omitted) through the queue.
+        """
+        client = client or UnoletAPI.default
+        client.write_behind = self
+        self._attached.append(client)
+
+    def detach(self):
+        for client in self._attached:
+            if getattr(client, "write_behind", None) is self:
+                client.write_behind = None
+        self._attached = []
+
+    def save(self, resource: BaseResource) -> Future:
+        """
+        Queue the save of `resource`.
+
+        The request body is validated right away, so invalid resources raise
+        `ValidationError` here rather than in the background.
+
+        Returns:
+            Future: Resolved with the resource once it is written.
+        """
+        type(resource)._initialize_metadata()
+        self._wait_for_create(resource)
+        adding = resource._state.adding
+        if adding:
+            for name, field in resource._metadata.fields.items():
+                value = resource.__dict__.get(name)
+                if field.is_related and isinstance(value, BaseResource) and value._state.adding:
+                    raise ValueError(f"{resource!r} refers to the unsaved {value!r}")
+            data = resource._metadata.serializer.validate(resource.__dict__)
+        elif resource._state.changes:
+            data = resource._metadata.serializer.validate(resource._state.changes, partial=True)
+        else:
+            # No tracked changes, e.g. a resource built with its id: send it
+            # whole, as `save()` does.
+            data = resource._validate_data(resource.__dict__, partial=resource._state.loaded is not None)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The write-behind queue is closed")
+            write = self.pending.get(self._keys.get(id(resource)))
+            if write is None and not adding:
+                write = self.pending.get(f"{resource._endpoint}/{resource.id}")
+            if write is None:
+                if not adding and not data:
+                    future = Future()
+                    future.set_result(resource)
+                    return future
+                key = f"new/{uuid.uuid4().hex}" if adding else f"{resource._endpoint}/{resource.id}"
+                write = _Write(key, type(resource), CREATE if adding else UPDATE, resource.id, {}, resource)
+                self.pending[key] = write
+            self._keys[id(resource)] = write.key
+            write.resource = resource
+            if write.action == CREATE:
+                write.data = data
+            else:
+                write.data.update(data)
+            resource._state.changes = {}
+            self._spool(write.record(data))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._condition.notify_all()
+        return write.future
+
+    def _wait_for_create(self, resource: BaseResource):
+        # A new resource saved again while its creation is in flight becomes an
+        # update once it has an id, instead of being created twice.
+        with self._condition:
+            write = self._in_flight.get(id(resource))
+        if write is not None:
+            write.future.exception()
+
+    def flush(self, timeout: Optional[float] = None) -> List[Future]:
+        """Send the pending writes now and wait for them. Returns their futures."""
+        with self._flushing:
+            with self._condition:
+                batch = list(self.pending.values())
+                self.pending = {}
+                self._keys = {}
+                self._oldest = None
+                self._in_flight = {id(write.resource): write for write in batch if write.action == CREATE and write.resource is not None}
+            try:
+                self._send(batch)
+            finally:
+                with self._condition:
+                    self._in_flight = {}
+        futures = [write.future for write in batch]
+        for future in futures:
+            future.exception(timeout)
+        return futures
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush the pending writes and stop the background thread."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self.flush(timeout)
+        self.detach()
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if len(self.pending) >= self.batch_size:
+                        break
+                    if self._oldest is not None:
+                        remaining = self._oldest + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+            self.flush()
+
+    def _send(self, batch: List[_Write]):
+        if not batch:
+            return
+        for write, error in zip(batch, self._executor.map(self._write, batch)):
+            if error is None:
+                write.future.set_result(write.resource)
+            else:
+                write.future.set_exception(error)
+        with self._condition:
+            # Writes rejected by the API are dropped; writes that could not be
+            # sent, e.g. on connection errors, stay in the spool for the next queue.
+            unsent = [write for write in batch if write.future.exception() is not None and not isinstance(write.future.exception(), APIError)]
+            self._rewrite_spool(unsent + list(self.pending.values()))
+
+    def _write(self, write: _Write) -> Optional[Exception]:
+        api = write.model_class._api
+        try:
+            if write.action == CREATE:
+                response = api.post(write.model_class._endpoint, data=encode(write.data))
+            else:
+                response = api.patch(f"{write.model_class._endpoint}/{write.id}", data=encode(write.data))
+            resource = write.resource
+            if resource is not None and not resource._state.changes and id(resource) not in self._keys:
+                # Updates the resource and its cache entry.
+                resource._saved(response)
+            else:
+                if resource is None:
+                    # Replayed from the spool.
+                    write.resource = write.model_class(**response.json())
+                else:
+                    # The resource changed since it was queued: keep the newer
+                    # values and only take the id assigned on creation.
+                    if write.action == CREATE:
+                        resource.__dict__["id"] = response.json().get("id")
+                        resource._state.adding = False
+                    resource._notify("saved")
+                if api.cache is not None:
+                    api.cache.invalidate(write.resource)
+        except Exception as e:
+            return e
+        return None
+
+    def _spool(self, record: Dict):
+        if not self.spool_path:
+            return
+        with open(self.spool_path, "a") as f:
+            f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_spool(self, writes: List[_Write]):
+        """Replace the spool with the writes that are still pending."""
+        if not self.spool_path:
+            return
+        atomic_write(self.spool_path, "".join(
+            json.dumps(write.record(write.data), separators=(",", ":"), default=str) + "\n"
+            for write in writes
+        ))
+
+    def _replay(self):
+        """Queue the writes left in the spool by a previous queue."""
+        if not os.path.exists(self.spool_path):
+            return
+        api = self.client or UnoletAPI
+        with open(self.spool_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash while it was being written.
+                    continue
+                write = self.pending.get(record["key"])
+                if write is None:
+                    model_class = api.resource(record["model"])
+                    write = _Write(record["key"], model_class, record["action"], record["id"], {})
+                    self.pending[write.key] = write
+                if write.action == CREATE:
+                    write.data = record["data"]
+                else:
+                    write.data.update(record["data"])
+        if self.pending:
+            self._oldest = time.monotonic()
@@ -0,0 +1,286 @@
+"""
+Compact binary snapshots of resources and result sets.
+
+`to_bytes()` turns a resource, `ResourceList` or `Pagination` into a snapshot
+that `from_bytes()` loads back without any request, e.g. to share fetched data
+between workers or keep it in a local cache. Compared to pickling resources, a
+snapshot holds field values only: no `State`, no copy of the raw API data, and
+nested resources are stored as their values too.
+
+Format (version 1):
+
+    - The magic bytes `UNOS` and a version byte, then a `marshal` encoded
+      document with the kind of snapshot, the model, the result set attributes
+      (`count`, `next`, ...) and one row per resource.
+    - A row is a list of values in the order of `Metadata.fields`. Values are
+      stored in their parsed form: decimals as strings, dates as ordinals,
+      datetimes in ISO format, related resources as `("R", model, row)` and
+      undefined values as `...`. Sparse resources are stored as
+      `("S", mask, row)`, where the bits of `mask` mark the fields not loaded.
+    - Every model in the snapshot is keyed by a hash of its metadata
+      (`Metadata.schema_key`). Loading a snapshot taken with different metadata
+      raises `ValueError`. With `schema=True`, the default for result sets, the
+      metadata itself is included, and classes whose metadata is not loaded yet
+      get it from the snapshot instead of from an OPTIONS request.
+
+`marshal` is fast and compact but its format may change between Python
+versions, and it is not meant for untrusted data: snapshots are for processes
+running the same Python version.
+
+Example:
+    from unolet import Invoice
+    from unolet.models import Pagination
+
+    data = Invoice.find(page=1).to_bytes()
+    page = Pagination.from_bytes(data, Invoice)
+"""
+
+import marshal
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from unolet.fields import Undefined, field_kind
+
+
+MAGIC = b"UNOS"
+VERSION = 1
+
+RESOURCE = "resource"
+LIST = "list"
+PAGINATION = "pagination"
+
+_NOT_LOADED = object()
+
+
+def _encode_decimal(value):
+    return str(value) if value.__class__ is Decimal else value
+
+
+def _encode_date(value):
+    return value.toordinal() if value.__class__ is date else value
+
+
+def _encode_datetime(value):
+    return value.isoformat() if value.__class__ is datetime else value
+
+
+def _decode_decimal(value):
+    return Decimal(value) if value.__class__ is str else value
+
+
+def _decode_date(value):
+    return date.fromordinal(value) if value.__class__ is int else value
+
+
+def _decode_datetime(value):
+    return datetime.fromisoformat(value) if value.__class__ is str else value
+
+
+# kind: (type stored as a primitive, encoder, primitive type, decoder)
+_TYPED = {
+    "decimal": (Decimal, _encode_decimal, str, _decode_decimal),
+    "date": (date, _encode_date, int, _decode_date),
+    "datetime": (datetime, _encode_datetime, str, _decode_datetime),
+}
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+class _Writer:
+    """Encodes resources into rows, collecting the schemas of their models."""
+    def __init__(self, schema: bool):
+        self.schema = schema
+        self.schemas: Dict[str, tuple] = {}
+
+    def add_schema(self, model_class: type):
+        metadata = model_class._metadata
+        if model_class.__name__ not in self.schemas:
+            self.schemas[model_class.__name__] = (metadata.schema_key, list(metadata.fields), metadata.data if self.schema else None)
+
+    def row(self, resource):
+        metadata = type(resource)._metadata
+        self.add_schema(type(resource))
+        values = resource.__dict__
+        row = []
+        mask = 0
+        for index, (name, typed) in enumerate(metadata.snapshot_fields):
+            value = values.get(name, _NOT_LOADED)
+            if value is _NOT_LOADED:
+                mask |= 1 << index
+                row.append(None)
+            elif value is Undefined:
+                row.append(...)
+            elif typed is not None and value.__class__ is typed[0]:
+                row.append(typed[1](value))
+            elif typed is not None and value is not None:
+                # Another type than the field holds: keep it apart.
+                row.append(("V", self.value(value)))
+            else:
+                row.append(self.value(value))
+        if mask:
+            return ("S", mask, row)
+        return row
+
+    def value(self, value):
+        if isinstance(value, _PRIMITIVES):
+            return value
+        if value is Undefined:
+            return ...
+        if isinstance(value, Decimal):
+            return ("D", str(value))
+        if isinstance(value, datetime):
+            return ("T", value.isoformat())
+        if isinstance(value, date):
+            return ("d", value.toordinal())
+        if isinstance(value, list):
+            return ("L", [self.value(item) for item in value])
+        if isinstance(value, dict):
+            return ("M", {key: self.value(item) for key, item in value.items()})
+        if getattr(type(value), "_metadata", None) is not None:
+            return ("R", type(value).__name__, self.row(value))
+        raise TypeError(f"Cannot snapshot {type(value).__name__} values")
+
+
+class _Reader:
+    """Decodes rows into resources of the classes of `api`."""
+    def __init__(self, api, schemas: Dict[str, tuple]):
+        from unolet.models import State
+
+        self.api = api
+        self.schemas = schemas
+        self.classes: Dict[str, type] = {}
+        self.state_class = State
+
+    def model_class(self, name: str, model_class: Optional[type] = None) -> type:
+        """Resolve, and check the metadata of, the class of model `name`."""
+        if name in self.classes:
+            return self.classes[name]
+        model_class = model_class or self.api.resource(name)
+        key, names, data = self.schemas[name]
+        if model_class._metadata is None and data is not None:
+            from unolet.models import Metadata
+            model_class._metadata = Metadata(data)
+        model_class._initialize_metadata()
+        if model_class._metadata.schema_key != key or list(model_class._metadata.fields) != names:
+            raise ValueError(f"The snapshot of {name} was taken with different metadata")
+        self.classes[name] = model_class
+        return model_class
+
+    def resource(self, model_class: type, row):
+        mask = 0
+        if row.__class__ is tuple:
+            _, mask, row = row
+        data = {}
+        for index, ((name, typed), value) in enumerate(zip(model_class._metadata.snapshot_fields, row)):
+            if mask and mask >> index & 1:
+                continue
+            kind = value.__class__
+            if kind is tuple:
+                value = self.value(value)
+            elif value is ...:
+                value = Undefined
+            elif typed is not None and kind is typed[2]:
+                value = typed[3](value)
+            data[name] = value
+
+        instance = model_class.__new__(model_class)
+        state = self.state_class({})
+        if mask:
+            state.loaded = frozenset(data)
+        if data.get("id") is None or data["id"] is Undefined:
+            data["id"] = None
+            state.adding = True
+        instance.__dict__["_state"] = state
+        instance.__dict__.update(data)
+        return instance
+
+    def value(self, value):
+        if value.__class__ is not tuple:
+            return Undefined if value is ... else value
+        tag = value[0]
+        if tag == "R":
+            return self.resource(self.model_class(value[1]), value[2])
+        if tag == "D":
+            return Decimal(value[1])
+        if tag == "T":
+            return datetime.fromisoformat(value[1])
+        if tag == "d":
+            return date.fromordinal(value[1])
+        if tag == "L":
+            return [self.value(item) for item in value[1]]
+        if tag == "M":
+            return {key: self.value(item) for key, item in value[1].items()}
+        if tag == "V":
+            return self.value(value[1])
+        raise ValueError(f"Unknown snapshot value tag {tag!r}")
+
+
+def snapshot_fields(metadata) -> List[tuple]:
+    """`(name, codec)` of every field in the order of rows; `codec` is `None` for untyped fields."""
+    return [(name, _TYPED.get(field_kind(field))) for name, field in metadata.fields.items()]
+
+
+def dumps(kind: str, model_class: type, resources, schema: bool = True, **attributes) -> bytes:
+    """
+    Encode resources of `model_class` as a snapshot.
+
+    Args:
+        kind (str): `RESOURCE`, `LIST` or `PAGINATION`.
+        model_class (type): The resource class.
+        resources (Iterable[BaseResource]): The resources.
+        schema (bool): Include the metadata of the models.
+        **attributes: Attributes of the result set, e.g. `count`.
+    """
+    model_class._initialize_metadata()
+    writer = _Writer(schema)
+    writer.add_schema(model_class)
+    rows = [writer.row(resource) for resource in resources]
+    document = {
+        "kind": kind,
+        "model": model_class.__name__,
+        "schemas": writer.schemas,
+        "rows": rows,
+        "attributes": attributes,
+    }
+    return MAGIC + bytes([VERSION]) + marshal.dumps(document, 4)
+
+
+def loads(data: bytes, model_class: Optional[type] = None, kind: Optional[str] = None) -> Dict:
+    """
+    Decode a snapshot into resources of `model_class`, and of the classes of
+    its client for nested resources.
+
+    Args:
+        data (bytes): The snapshot.
+        model_class (type, optional): The resource class. Defaults to the class
+            of the default client named in the snapshot.
+        kind (str, optional): The expected kind of snapshot.
+
+    Returns:
+        dict: The `model_class`, the result set `attributes` and the decoded
+        `resources`.
+
+    Raises:
+        ValueError: The data is not a snapshot of `model_class` (or of `kind`),
+        or was taken with different metadata.
+    """
+    if len(data) < 5 or data[:4] != MAGIC:
+        raise ValueError("Not a unolet snapshot")
+    if data[4] != VERSION:
+        raise ValueError(f"Unsupported snapshot version {data[4]}")
+    try:
+        document = marshal.loads(data[5:])
+    except (EOFError, TypeError, ValueError) as e:
+        raise ValueError(f"Corrupt snapshot: {e}")
+    if model_class is None:
+        from unolet.api import UnoletAPI
+        model_class = UnoletAPI.resource(document["model"])
+    if kind is not None and document["kind"] != kind:
+        raise ValueError(f"Expected a {kind} snapshot, got a {document['kind']} snapshot")
+    if document["model"] != model_class.__name__:
+        raise ValueError(f"Expected a snapshot of {model_class.__name__}, got one of {document['model']}")
+    reader = _Reader(model_class._api, document["schemas"])
+    model_class = reader.model_class(model_class.__name__, model_class)
+    resources = [reader.resource(model_class, row) for row in document["rows"]]
+    return {"model_class": model_class, "attributes": document["attributes"], "resources": resources}
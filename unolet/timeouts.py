@@ -0,0 +1,235 @@
+"""
+Timeouts, deadlines and hedged requests.
+
+Three settings bound how long the client waits for the API:
+
+    - `Client(timeout=...)` is the timeout of every request of the client,
+      so a stalled connection raises `Timeout` instead of hanging. With
+      `requests`, it bounds the connection and each read of the response.
+    - `timeout=` on `find()`, `get()`, `stream()` and `aggregate()` is a
+      deadline for the whole call: every page, lazy load and prefetch it
+      makes, including `Pagination.next()`, shares the same budget.
+    - `deadline()` applies a deadline to every request sent inside a block,
+      e.g. a checkout that loads, saves and commits a `UnitOfWork`.
+
+Each request gets the client timeout capped by what is left of the deadline,
+and `Timeout` is raised once the deadline has passed.
+
+`Hedging` cuts the tail latency of GET requests, which are idempotent: when
+the response to a GET takes longer than a percentile of the recent
+latencies, a second attempt is sent and the first response to arrive is
+used. With the default 95th percentile, about one GET in twenty is sent
+twice.
+
+Example:
+    from unolet import Client
+    from unolet.timeouts import Hedging, deadline
+
+    client = Client("[TOKEN]", "https://unolet.app", timeout=5, hedging=Hedging(percentile=95))
+
+    # At most 10 seconds for every page of the query
+    for movement in client.Movement.stream(date="2024-01-31", timeout=10):
+        ...
+
+    with deadline(2.0):
+        invoice = client.Invoice.get(123)
+        invoice.save()
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional, Union
+
+from unolet.exceptions import Timeout
+
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("unolet_deadline", default=None)
+
+
+class Deadline:
+    """
+    A point in time after which no more requests are sent.
+
+    Args:
+        timeout (float): Seconds from now.
+    """
+    __slots__ = ("timeout", "expires")
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires = time.monotonic() + timeout
+
+    def __repr__(self):
+        return f"<Deadline timeout={self.timeout} remaining={self.remaining():.3f}>"
+
+    @classmethod
+    def after(cls, timeout: Union[float, "Deadline", None]) -> Optional["Deadline"]:
+        """Return a deadline `timeout` seconds from now; deadlines and `None` are returned as they are."""
+        if timeout is None or isinstance(timeout, Deadline):
+            return timeout
+        return cls(timeout)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires <= time.monotonic()
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the innermost `deadline()` block, if any."""
+    return _current.get()
+
+
+@contextmanager
+def deadline(timeout: Union[float, Deadline, None]):
+    """
+    Bound the requests sent inside the block by a deadline.
+
+    Nested blocks cannot extend the deadline of the enclosing one.
+
+    Args:
+        timeout (float | Deadline | None): Seconds from now, or a deadline.
+            `None` leaves the requests unbounded, as outside the block.
+
+    Yields:
+        Deadline: The deadline in effect, or `None`.
+    """
+    limit = Deadline.after(timeout)
+    current = _current.get()
+    if limit is None or (current is not None and current.expires <= limit.expires):
+        yield current
+        return
+    token = _current.set(limit)
+    try:
+        yield limit
+    finally:
+        _current.reset(token)
+
+
+def request_timeout(timeout: Optional[float], limit: Optional[Deadline]) -> Optional[float]:
+    """
+    Return the timeout of a request: `timeout`, capped by what is left of `limit`.
+
+    Raises:
+        Timeout: The deadline has passed.
+    """
+    if limit is None:
+        return timeout
+    remaining = limit.remaining()
+    if remaining <= 0:
+        raise Timeout(f"Deadline of {limit.timeout}s exceeded")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+class Hedging:
+    """
+    Policy of hedged GET requests, for `Client(hedging=...)`.
+
+    A client learns the latency of its GET requests. Once `min_samples` are
+    known, a GET that has not been answered after the `percentile` of the last
+    `window` latencies is sent again, and the first response is used. The
+    slower attempt runs to completion in the background.
+
+    Args:
+        percentile (float): Percentile of the latencies to wait for before
+            sending the second attempt.
+        min_delay (float): Lower bound of that wait, in seconds.
+        window (int): Number of recent latencies the percentile is taken from.
+        min_samples (int): Latencies needed before requests are hedged.
+        max_workers (int): Threads sending the attempts.
+
+    Attributes:
+        hedged (int): Requests sent a second time.
+        won (int): Second attempts that were answered first.
+    """
+    def __init__(self, percentile: float = 95.0, min_delay: float = 0.01, window: int = 1000, min_samples: int = 20, max_workers: int = 32):
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.hedged = 0
+        self.won = 0
+        self._latencies = deque(maxlen=window)
+        self._recorded = 0
+        self._delay: Optional[float] = None
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before sending the second attempt, `None` until enough latencies are known."""
+        return self._delay
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+            self._recorded += 1
+            # Sorting the window is cheap, but not worth doing for every sample.
+            if len(self._latencies) >= self.min_samples and (self._delay is None or self._recorded % 16 == 0):
+                ordered = sorted(self._latencies)
+                index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+                self._delay = max(self.min_delay, ordered[index])
+
+    def send(self, attempt: Callable):
+        """
+        Call `attempt`, and call it again if it is slower than the delay.
+
+        Args:
+            attempt (Callable): Sends the request and returns the response.
+
+        Returns:
+            The first response. An attempt that raises is only used when both do.
+        """
+        delay = self._delay
+        if delay is None:
+            return self._timed(attempt)
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        executor = self._get_executor()
+        first = executor.submit(self._timed, attempt)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        second = executor.submit(self._timed, attempt)
+        with self._lock:
+            self.hedged += 1
+        pending = {first, second}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self.won += 1
+                    return future.result()
+            if not pending:
+                return first.result()
+
+    def _timed(self, attempt: Callable):
+        start = time.perf_counter()
+        response = attempt()
+        self.record(time.perf_counter() - start)
+        return response
+
+    def _get_executor(self):
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="unolet-hedging")
+        return self._executor
+
+    def close(self):
+        """Stop the threads once the attempts in flight are done."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,432 @@
+"""
+HTTP transports used by `Client` to talk to the Unolet API.
+
+A transport receives fully built requests (method, URL, headers, query
+parameters and JSON body) and returns a response object exposing
+`status_code`, `url`, `headers`, `content`, `json()` and `raise_for_status()`.
+
+Available transports:
+    - RequestsTransport: HTTP/1.1 through a pooled `requests.Session` (default).
+    - HTTP2Transport: HTTP/2 through `httpx`, multiplexing concurrent requests
+      over a single connection.
+    - InMemoryTransport: serves an in-memory dataset without any network,
+      for tests and benchmarks.
+
+Example:
+    from unolet import Unolet
+    from unolet.transports import HTTP2Transport
+
+    Unolet.connect("your_token_here", "https://unolet.app", transport=HTTP2Transport())
+"""
+
+import json
+import re
+import threading
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from unolet.exceptions import Timeout
+
+
+class Response:
+    """
+    Transport independent HTTP response.
+
+    Mirrors the subset of `requests.Response` used by the library.
+    """
+    def __init__(self, status_code: int, content: bytes = b"", headers: Optional[Dict] = None, url: str = ""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    def __repr__(self):
+        return f"<Response [{self.status_code}]>"
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        """Raise `requests.HTTPError` for 4xx and 5xx responses."""
+        if not self.ok:
+            import requests
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.HTTPError(f"{self.status_code} {kind} Error for url: {self.url}", response=self)
+
+
+class BaseTransport:
+    """
+    Base class for all transports.
+
+    Args:
+        max_concurrency (int): Maximum number of requests in flight for
+            `request_many`.
+    """
+    def __init__(self, max_concurrency: int = 10):
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def request(self, method: str, url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None, data=None, timeout: Optional[float] = None):
+        """
+        Send a single request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            headers (dict, optional): Request headers.
+            params (dict, optional): Query string parameters.
+            data (any, optional): Body, sent as JSON. `bytes` are sent as they
+                are, as already encoded JSON.
+            timeout (float, optional): Seconds to wait for the server. Only
+                passed by the client when one is set.
+
+        Returns:
+            The response object.
+
+        Raises:
+            Timeout: The server did not answer within `timeout`.
+        """
+        raise NotImplementedError
+
+    def request_many(self, requests: List[Dict]) -> List:
+        """
+        Send several requests concurrently.
+
+        Args:
+            requests (List[dict]): Keyword arguments for `request`, one dict
+                per request.
+
+        Returns:
+            list: The responses, in the same order as `requests`.
+        """
+        if len(requests) <= 1:
+            return [self.request(**kwargs) for kwargs in requests]
+        return list(self._get_executor().map(lambda kwargs: self.request(**kwargs), requests))
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` in the threads of the transport.
+
+        The threads are those of `request_many`, so the connections they open
+        are reused by later calls.
+
+        Returns:
+            concurrent.futures.Future: The future of the call.
+        """
+        return self._get_executor().submit(fn, *args, **kwargs)
+
+    def _get_executor(self):
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="unolet-transport")
+        return self._executor
+
+    def close(self):
+        """Release the resources held by the transport."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class RequestsTransport(BaseTransport):
+    """
+    HTTP/1.1 transport backed by a `requests.Session`.
+
+    The session keeps connections alive between requests. `requests.Session` is
+    not guaranteed to be thread safe, so each thread gets its own session.
+    """
+    def __init__(self, max_concurrency: int = 10):
+        super().__init__(max_concurrency)
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        import requests
+
+        body = {"data": data} if isinstance(data, bytes) else {"json": data}
+        try:
+            return self.session.request(method, url, headers=headers, params=params, timeout=timeout, **body)
+        except requests.Timeout as e:
+            raise Timeout(f"{method} {url} timed out after {timeout}s") from e
+
+    def close(self):
+        super().close()
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+
+class HTTP2Transport(BaseTransport):
+    """
+    HTTP/2 transport backed by `httpx`.
+
+    Concurrent requests from `request_many` (or from several threads) share a
+    single multiplexed connection per host once HTTP/2 is negotiated; servers
+    that only speak HTTP/1.1 get a regular connection pool. Requires `httpx`
+    with HTTP/2 support (`pip install unolet[http2]`).
+
+    Args:
+        max_concurrency (int): Maximum number of streams in flight for
+            `request_many`.
+        http1 (bool): Allow falling back to HTTP/1.1 when the server does not
+            negotiate HTTP/2. Set to `False` to speak HTTP/2 with prior
+            knowledge to cleartext (`http://`) servers.
+        **client_options: Extra keyword arguments for `httpx.Client`.
+    """
+    def __init__(self, max_concurrency: int = 100, http1: bool = True, **client_options):
+        super().__init__(max_concurrency)
+        try:
+            import httpx
+            import h2  # noqa: F401
+        except ImportError as e:
+            raise ImportError("HTTP2Transport requires httpx with HTTP/2 support: pip install unolet[http2]") from e
+        client_options.setdefault("timeout", None)
+        self.client = httpx.Client(http2=True, http1=http1, **client_options)
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        import httpx
+
+        body = {"content": data} if isinstance(data, bytes) else {"json": data}
+        if timeout is not None:
+            body["timeout"] = timeout
+        try:
+            response = self.client.request(method, url, headers=headers, params=params, **body)
+        except httpx.TimeoutException as e:
+            raise Timeout(f"{method} {url} timed out after {timeout}s") from e
+        return Response(response.status_code, response.content, dict(response.headers), str(response.url))
+
+    def close(self):
+        super().close()
+        self.client.close()
+
+
+class InMemoryTransport(BaseTransport):
+    """
+    Transport serving an in-memory copy of the Unolet API.
+
+    Implements the REST conventions of the API (OPTIONS metadata, paginated
+    lists with `field`, `field__gt`, `field__gte`, `field__lt`, `field__lte`
+    and `field__in` filters and `ordering`, `fields` projection, detail,
+    create, update and delete) over plain dictionaries. Fixed responses can be registered with
+    `add_route`.
+
+    Args:
+        records (dict, optional): `{endpoint: {id: record}}`.
+        metadata (dict, optional): `{endpoint: options_response}`.
+        page_size (int): Default page size of list responses.
+        max_concurrency (int): Maximum number of requests in flight for
+            `request_many`.
+
+    Attributes:
+        calls (list): `(method, url, params, data)` of every request received.
+    """
+    path_re = re.compile(r"/api/[^/]+/(?P<endpoint>[^/]+)/(?:(?P<id>[^/]+)/)?$")
+    max_page_size = 1000
+    projection_param = "fields"
+
+    def __init__(self, records: Optional[Dict] = None, metadata: Optional[Dict] = None, page_size: int = 100, max_concurrency: int = 10):
+        super().__init__(max_concurrency)
+        self.records = records if records is not None else {}
+        self.metadata = metadata if metadata is not None else {}
+        self.page_size = page_size
+        self.routes = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def add_route(self, method: str, path: str, json=None, status: int = 200):
+        """
+        Register a fixed response for `method` on `path` (e.g. "invoice/1").
+
+        Registered routes take precedence over the in-memory records.
+        """
+        self.routes[(method.upper(), path.strip("/"))] = (status, json)
+
+    def request(self, method, url, headers=None, params=None, data=None, timeout=None):
+        method = method.upper()
+        parsed = urlparse(url)
+        query = dict(parse_qsl(parsed.query))
+        query.update({k: str(v) for k, v in (params or {}).items() if v is not None})
+        if isinstance(data, bytes):
+            data = json.loads(data)
+        with self._lock:
+            self.calls.append((method, url, query, data))
+            status, payload = self.handle(method, parsed, query, data)
+        content = b"" if payload is None else json.dumps(payload).encode()
+        return Response(status, content, {"Content-Type": "application/json"}, url)
+
+    def handle(self, method, url, params, data):
+        """Return the `(status_code, payload)` for a request."""
+        match = self.path_re.search(url.path)
+        if not match:
+            return 404, {"detail": "Not found."}
+        endpoint, pk = match.group("endpoint"), match.group("id")
+
+        path = f"{endpoint}/{pk}" if pk else endpoint
+        if (method, path) in self.routes:
+            return self.routes[(method, path)]
+
+        if method == "OPTIONS":
+            if endpoint not in self.metadata:
+                return 404, {"detail": "Not found."}
+            return 200, self.metadata[endpoint]
+
+        records = self.records.setdefault(endpoint, {})
+        if pk is None:
+            if method == "GET":
+                return 200, self._paginate(url, records, params)
+            if method == "POST":
+                record = dict(data or {})
+                record["id"] = max(records, default=0) + 1
+                records[record["id"]] = record
+                return 201, record
+            return 405, {"detail": f'Method "{method}" not allowed.'}
+
+        pk = int(pk) if pk.isdigit() else pk
+        if pk not in records:
+            return 404, {"detail": "Not found."}
+        if method == "GET":
+            return 200, self._project(records[pk], params.get(self.projection_param))
+        if method in ("PATCH", "PUT"):
+            records[pk].update(data or {})
+            records[pk]["id"] = pk
+            return 200, records[pk]
+        if method == "DELETE":
+            del records[pk]
+            return 204, None
+        return 405, {"detail": f'Method "{method}" not allowed.'}
+
+    def _paginate(self, url, records, params):
+        params = dict(params)
+        page = int(params.pop("page", 1))
+        page_size = min(int(params.pop("page_size", self.page_size)), self.max_page_size)
+        ordering = params.pop("ordering", None)
+        fields = params.pop(self.projection_param, None)
+        rows = list(records.values())
+        for key, value in params.items():
+            name, _, lookup = key.partition("__")
+            rows = [r for r in rows if self._match(r.get(name), lookup or "exact", value)]
+        if ordering:
+            for term in reversed(ordering.split(",")):
+                name = term.lstrip("-")
+                rows.sort(key=lambda r: self._key(r.get(name)), reverse=term.startswith("-"))
+        start = (page - 1) * page_size
+        results = [self._project(row, fields) for row in rows[start:start + page_size]]
+
+        if ordering:
+            params["ordering"] = ordering
+        if fields:
+            params[self.projection_param] = fields
+
+        def page_url(number):
+            query = urlencode({**params, "page": number, "page_size": page_size})
+            return f"{url.scheme}://{url.netloc}{url.path}?{query}"
+
+        return {
+            "count": len(rows),
+            "next": page_url(page + 1) if start + page_size < len(rows) else None,
+            "previous": page_url(page - 1) if page > 1 else None,
+            "results": results,
+        }
+
+    @staticmethod
+    def _project(record, fields):
+        if not fields:
+            return record
+        names = fields.split(",")
+        return {name: record[name] for name in names if name in record}
+
+    @staticmethod
+    def _key(value):
+        """Sort key comparing numbers numerically and everything else as text."""
+        if isinstance(value, dict):
+            value = value.get("id")
+        if value is None:
+            return (0, 0, "")
+        try:
+            return (1, Decimal(str(value)), "")
+        except InvalidOperation:
+            return (2, 0, str(value))
+
+    @classmethod
+    def _match(cls, value, lookup, expected):
+        if isinstance(value, dict):
+            value = value.get("id")
+        if isinstance(value, bool):
+            value = str(value).lower()
+        if lookup == "in":
+            return str(value) in expected.split(",")
+        if lookup == "exact":
+            return str(value) == expected
+        if value is None:
+            return False
+        value, expected = cls._key(value), cls._key(expected)
+        if lookup == "gt":
+            return value > expected
+        if lookup == "gte":
+            return value >= expected
+        if lookup == "lt":
+            return value < expected
+        if lookup == "lte":
+            return value <= expected
+        return False
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "http2": HTTP2Transport,
+    "memory": InMemoryTransport,
+}
+
+
+def get_transport(transport=None, **options) -> BaseTransport:
+    """
+    Return a transport instance.
+
+    Args:
+        transport (str | BaseTransport, optional): A transport instance, or the
+            name of one of `TRANSPORTS`. Defaults to "requests".
+        **options: Arguments of the transport class, e.g. `max_concurrency`,
+            when it is created by name.
+    """
+    if transport is None:
+        transport = "requests"
+    if isinstance(transport, str):
+        try:
+            return TRANSPORTS[transport](**options)
+        except KeyError:
+            raise ValueError(f"Unknown transport {transport!r}, expected one of {sorted(TRANSPORTS)}")
+    return transport
@@ -0,0 +1,206 @@
+"""
+Save a graph of new and changed resources in dependency order.
+
+`UnitOfWork` collects resources, e.g. an invoice, its movements and a new
+customer, and saves them in as few round trips as the dependencies allow:
+
+    - A resource depends on the new resources it refers to through related
+      fields (`movement.document = invoice`). New related resources are
+      added automatically.
+    - Resources are saved level by level: every resource whose dependencies
+      are saved is sent concurrently with the others of its level, so an
+      invoice with 200 lines takes two round trips instead of 201.
+    - Once a resource is created its id is assigned, and the resources that
+      refer to it send that id.
+    - Every resource gets a `WriteResult`. A failed write does not stop the
+      others, but the resources that depend on it are skipped.
+
+Existing resources without changes are not sent.
+
+Example:
+    from unolet import Invoice, Movement
+    from unolet.unit_of_work import UnitOfWork
+
+    invoice = Invoice(person=person, warehouse=warehouse, type=document_type)
+    lines = [Movement(document=invoice, product=p, quantity=1, price=p.price) for p in products]
+
+    with UnitOfWork() as uow:
+        uow.add(invoice, *lines)
+
+    failed = [result for result in uow.results if not result.ok]
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from unolet.exceptions import UnoletError, ValidationError
+from unolet.models import BaseResource
+from unolet.timeouts import deadline
+
+
+CREATE = "create"
+UPDATE = "update"
+UNCHANGED = "unchanged"
+
+
+@dataclass
+class WriteResult:
+    """
+    The outcome of saving one resource.
+
+    Attributes:
+        resource (BaseResource): The resource, updated from the API when saved.
+        action (str): `CREATE`, `UPDATE` or `UNCHANGED`.
+        error (Exception, optional): Why the write failed or was skipped.
+        skipped (bool): The write was not attempted because a dependency failed.
+    """
+    resource: BaseResource
+    action: str
+    error: Optional[Exception] = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _related_resources(resource: BaseResource) -> List[BaseResource]:
+    related = []
+    for name, field in resource._metadata.fields.items():
+        if not field.is_related:
+            continue
+        value = resource.__dict__.get(name)
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, BaseResource):
+                related.append(item)
+    return related
+
+
+class UnitOfWork:
+    """
+    Collects resources and saves them in dependency order.
+
+    Used as a context manager, the unit of work is committed when the block
+    exits without an exception.
+
+    Args:
+        max_concurrency (int): Maximum number of writes in flight. The writes
+            run in the threads of the transport, so its own `max_concurrency`
+            also applies.
+        timeout (float, optional): Deadline of `commit()`, in seconds. Writes
+            not sent by then fail with `Timeout`. See `unolet.timeouts`.
+    """
+    def __init__(self, max_concurrency: int = 10, timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.resources: Dict[int, BaseResource] = {}
+        self.results: List[WriteResult] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+
+    def __len__(self):
+        return len(self.resources)
+
+    def add(self, *resources: BaseResource):
+        """Add resources to save, along with the new resources they refer to."""
+        pending = deque(resources)
+        while pending:
+            resource = pending.popleft()
+            if id(resource) in self.resources:
+                continue
+            self.resources[id(resource)] = resource
+            pending.extend(r for r in _related_resources(resource) if r._state.adding)
+
+    def _levels(self) -> List[List[BaseResource]]:
+        """Group the resources so that each one comes after the new resources it refers to."""
+        dependencies = {
+            key: {id(r) for r in _related_resources(resource) if r._state.adding and id(r) in self.resources and r is not resource}
+            for key, resource in self.resources.items()
+        }
+        levels = []
+        done = set()
+        while len(done) < len(dependencies):
+            level = [key for key, needs in dependencies.items() if key not in done and needs <= done]
+            if not level:
+                raise ValueError("The resources refer to each other in a cycle")
+            levels.append([self.resources[key] for key in level])
+            done.update(level)
+        return levels
+
+    def _write(self, resource: BaseResource, action: str) -> WriteResult:
+        try:
+            body = resource._save_body()
+            response = resource.create(body) if action == CREATE else resource.update(body)
+            resource._saved(response)
+        except Exception as e:
+            return WriteResult(resource, action, error=e)
+        return WriteResult(resource, action)
+
+    def _send(self, writes: List[tuple]) -> Dict[int, WriteResult]:
+        """Run `(key, resource, action)` writes in the threads of their transports."""
+        results = {}
+        pending = {}
+        for key, resource, action in writes:
+            if len(pending) >= self.max_concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+            # The writes run in the deadline of the caller.
+            future = resource._api.get_transport().submit(copy_context().run, self._write, resource, action)
+            pending[future] = key
+        for future, key in pending.items():
+            results[key] = future.result()
+        return results
+
+    def commit(self) -> List[WriteResult]:
+        """
+        Save the resources.
+
+        Returns:
+            List[WriteResult]: One result per resource, in the order they were
+            added.
+        """
+        results: Dict[int, WriteResult] = {}
+        failed = set()
+        for key, resource in self.resources.items():
+            # Report invalid resources before anything is sent.
+            try:
+                resource._save_body()
+            except ValidationError as e:
+                action = CREATE if resource._state.adding else UPDATE
+                results[key] = WriteResult(resource, action, error=e)
+                failed.add(key)
+
+        with deadline(self.timeout):
+            for level in self._levels():
+                writes = []
+                for resource in level:
+                    key = id(resource)
+                    if key in failed:
+                        continue
+                    action = CREATE if resource._state.adding else UPDATE
+                    blocked = [r for r in _related_resources(resource) if id(r) in failed and r._state.adding]
+                    if blocked:
+                        error = UnoletError(f"Not saved because {blocked[0]!r} could not be saved")
+                        results[key] = WriteResult(resource, action, error=error, skipped=True)
+                        failed.add(key)
+                    elif action == UPDATE and not resource._state.changes:
+                        results[key] = WriteResult(resource, UNCHANGED)
+                    else:
+                        writes.append((key, resource, action))
+                for key, result in self._send(writes).items():
+                    results[key] = result
+                    if not result.ok:
+                        failed.add(key)
+
+        self.results = [results[key] for key in self.resources]
+        self.resources = {}
+        return self.results
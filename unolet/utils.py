@@ -1,6 +1,9 @@
 import datetime
+import os
+import tempfile
+from decimal import Decimal, ROUND_HALF_EVEN
 
-from dateutil import parser
+_isoparse = None
 
 
 def is_string_decimal(string):
@@ -12,8 +15,55 @@ def is_string_decimal(string):
 
 
 def string_to_date(string):
-    return parser.isoparse(string)
+    global _isoparse
+    if _isoparse is None:
+        # dateutil is imported on first use to keep `import unolet` fast.
+        from dateutil.parser import isoparse as _isoparse
+    return _isoparse(string)
 
 
 def date_to_string(date):
-    return date.isoformat()
\ No newline at end of file
+    return date.isoformat()
+
+
+def related_id(value):
+    """Return the id of a related value: a raw `{"id": ...}` dict, a resource or the id itself."""
+    if isinstance(value, dict):
+        return value.get("id")
+    return getattr(value, "id", value)
+
+
+def scaled_int(value, scale):
+    """
+    Return a decimal value as an integer number of `10 ** -scale` units.
+
+    Plain decimal strings are converted without building a `Decimal`; other
+    values go through `Decimal` and are rounded half to even.
+    """
+    if isinstance(value, str) and "e" not in value and "E" not in value:
+        whole, _, fraction = value.partition(".")
+        if len(fraction) <= scale:
+            return int(whole + fraction.ljust(scale, "0"))
+    return int(Decimal(str(value)).scaleb(scale).to_integral_value(ROUND_HALF_EVEN))
+
+
+def atomic_write(path, text):
+    """
+    Replace the file at `path` with `text`, all at once.
+
+    The text is written to a temporary file of the same directory, flushed to
+    disk and moved over `path`, so readers and a crashed process see either
+    the old content or the new one, never part of it.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}-", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise